@@ -0,0 +1,66 @@
+"""
+Compares the scalar and batch body valuation paths in pioneer.body_calc.
+
+Usage: python benchmarks/body_calc_benchmark.py [--bodies N] [--repeat N]
+"""
+import argparse
+import random
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from pioneer import body_calc  # noqa: E402
+
+PLANET_CLASSES = [
+    'Metal rich body', 'High metal content body', 'Rocky body', 'Icy body', 'Rocky ice body', 'Earthlike body',
+    'Water world', 'Ammonia world', 'Water giant', 'Sudarsky class I gas giant', 'Sudarsky class II gas giant',
+    'Sudarsky class III gas giant', 'Helium rich gas giant',
+]
+
+
+def generate_bodies(count: int, seed: int = 0) -> list[tuple]:
+    rng = random.Random(seed)
+    bodies = []
+    for _ in range(count):
+        k, kt, tm = body_calc.get_planetclass_k(rng.choice(PLANET_CLASSES), rng.random() < 0.2)
+        bodies.append((k, kt, tm, rng.uniform(0.0001, 4000), rng.random() < 0.7, rng.random() < 0.8,
+                       rng.random() < 0.9))
+    return bodies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--bodies', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    bodies = generate_bodies(args.bodies)
+    columns = list(zip(*bodies))
+
+    scalar = [body_calc.get_body_value(*body) for body in bodies]
+    batch = body_calc.get_body_values(*columns)
+    if [tuple(row) for row in zip(*batch)] != scalar:
+        sys.exit('Batch results differ from the scalar path')
+
+    numpy_module = body_calc.get_numpy()
+    timings = {
+        'scalar': min(timeit.repeat(lambda: [body_calc.get_body_value(*body) for body in bodies],
+                                    number=1, repeat=args.repeat)),
+    }
+    body_calc.numpy = None
+    timings['batch (pure Python)'] = min(timeit.repeat(lambda: body_calc.get_body_values(*columns),
+                                                       number=1, repeat=args.repeat))
+    body_calc.numpy = numpy_module
+    if numpy_module is not None:
+        timings['batch (NumPy)'] = min(timeit.repeat(lambda: body_calc.get_body_values(*columns),
+                                                     number=1, repeat=args.repeat))
+
+    print(f'{args.bodies} bodies, best of {args.repeat}')
+    for name, seconds in timings.items():
+        print(f'{name:>20}: {seconds * 1000:9.2f} ms  ({seconds / args.bodies * 1e6:.3f} us/body)')
+
+
+if __name__ == '__main__':
+    main()
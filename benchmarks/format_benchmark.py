@@ -0,0 +1,122 @@
+"""
+Compares pioneer.format_util.Formatter against the original locale.format_string based implementation, checking
+that both produce identical output under several locale conventions before timing them.
+
+Usage: python benchmarks/format_benchmark.py [--values N] [--repeat N]
+"""
+import argparse
+import locale
+import random
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from pioneer.format_util import Formatter  # noqa: E402
+
+# Monetary conventions of a few representative locales, so the check doesn't depend on the locales installed
+CONVENTIONS = {
+    'C': {'mon_thousands_sep': '', 'mon_decimal_point': '', 'mon_grouping': []},
+    'en_US': {'mon_thousands_sep': ',', 'mon_decimal_point': '.', 'mon_grouping': [3, 3, 0]},
+    'de_DE': {'mon_thousands_sep': '.', 'mon_decimal_point': ',', 'mon_grouping': [3, 3, 0]},
+    'fr_FR': {'mon_thousands_sep': ' ', 'mon_decimal_point': ',', 'mon_grouping': [3, 0]},
+    'en_IN': {'mon_thousands_sep': ',', 'mon_decimal_point': '.', 'mon_grouping': [3, 2, 0]},
+    'sv_SE': {'mon_thousands_sep': ' ', 'mon_decimal_point': ',', 'mon_grouping': [3, 3, 0]},
+    'limited': {'mon_thousands_sep': "'", 'mon_decimal_point': '.', 'mon_grouping': [3, locale.CHAR_MAX]},
+}
+
+
+class LocaleFormatter:
+    """
+    The previous implementation, used as the reference output.
+    """
+
+    def __init__(self, shorten=True):
+        self.shorten = shorten
+
+    def format_unit(self, num, unit, space=True):
+        if num > 999999:
+            s = locale.format_string('%.1f M', num / 1000000.0, grouping=True, monetary=True)
+        elif num > 999:
+            s = locale.format_string('%.1f k', num / 1000.0, grouping=True, monetary=True)
+        else:
+            s = locale.format_string('%.0f ', num, grouping=True, monetary=True)
+        if not space:
+            s = s.replace(' ', '')
+        s += unit
+        return s
+
+    def format_credits(self, credits, space=True):
+        if self.shorten:
+            return self.format_unit(credits, 'Cr', space)
+        return locale.format_string('%d Cr', credits, grouping=True, monetary=True)
+
+    def format_ls(self, ls, space=True):
+        return self.format_unit(ls, 'ls', space)
+
+
+def generate_values(count: int, seed: int = 0) -> list[int | float]:
+    rng = random.Random(seed)
+    values: list[int | float] = [0, 1, 999, 999.4, 999.5, 1000, 999949, 999950, 999999, 1000000, 999999999,
+                                 1234567890123, -1, -999, -1000, -1234567, 0.5, 1.5, 2.5]
+    for _ in range(count):
+        magnitude = 10 ** rng.randint(0, 10)
+        values.append(rng.randint(0, magnitude))
+        values.append(rng.uniform(0, magnitude) * 1.25)
+    return values
+
+
+def format_all(formatter, values: list[int | float]) -> list[str]:
+    results = []
+    for value in values:
+        for shorten in (True, False):
+            formatter.shorten = shorten
+            results.append(formatter.format_credits(value))
+            results.append(formatter.format_credits(value, False))
+        results.append(formatter.format_ls(value))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--values', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    values = generate_values(args.values)
+    localeconv = locale.localeconv
+    try:
+        for name, conventions in CONVENTIONS.items():
+            locale.localeconv = lambda: {**localeconv(), **conventions}
+            expected = format_all(LocaleFormatter(), values)
+            actual = format_all(Formatter(), values)
+            mismatches = [(value, e, a) for value, e, a
+                          in zip([value for value in values for _ in range(5)], expected, actual) if e != a]
+            if len(expected) != len(actual) or mismatches:
+                sys.exit(f'{name}: output differs from locale.format_string, e.g. {mismatches[:3]}')
+            print(f'{name:>8}: {len(expected)} outputs match')
+
+        locale.localeconv = lambda: {**localeconv(), **CONVENTIONS['en_US']}
+        reference = LocaleFormatter()
+        timings = {
+            'locale.format_string': min(timeit.repeat(lambda: format_all(reference, values),
+                                                      number=1, repeat=args.repeat)),
+            'Formatter (cold)': min(timeit.repeat(lambda: format_all(Formatter(), values),
+                                                  number=1, repeat=args.repeat)),
+        }
+        formatter = Formatter()
+        format_all(formatter, values)
+        timings['Formatter (cached)'] = min(timeit.repeat(lambda: format_all(formatter, values),
+                                                          number=1, repeat=args.repeat))
+    finally:
+        locale.localeconv = localeconv
+
+    calls = len(values) * 5
+    print(f'{calls} calls, best of {args.repeat}')
+    for name, seconds in timings.items():
+        print(f'{name:>20}: {seconds * 1000:9.2f} ms  ({seconds / calls * 1e6:.3f} us/call)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,774 @@
+"""
+Support for running Pioneer outside EDMC: stand-ins for the EDMC modules the plugins import, a plugin host which
+loads Pioneer and ExploData and feeds them journal and dashboard events through their EDMC hooks, and a generator of
+synthetic journal events.
+
+The ExploData plugin is not part of this repository. Point the scripts at an ExploData plugin folder (the one
+containing its load.py, named ExploData as Pioneer imports it by that name) with --explodata or the EXPLODATA_PATH
+environment variable.
+
+Without a display, Tk is run as a plain Tcl interpreter: no widgets are built, and display refreshes run the
+valuation and text rendering stages of update_display only.
+"""
+import importlib.machinery
+import importlib.util
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+import tkinter as tk
+import types
+from datetime import datetime, timedelta
+from pathlib import Path
+from tkinter import ttk
+from typing import Any, Callable, Iterable, Iterator
+
+SRC_PATH = Path(__file__).resolve().parent.parent / 'src'
+sys.path.insert(0, str(SRC_PATH))
+
+from pioneer.status_flags import StatusFlags  # noqa: E402
+
+GAME_VERSION = '4.0.0.1904'
+GAME_BUILD = 'r303145/r0 '
+
+
+def get_explodata_path(path: str | None) -> Path:
+    """
+    :param path: ExploData plugin folder given on the command line, if any
+    :return: The ExploData plugin folder
+    """
+
+    path = path or os.environ.get('EXPLODATA_PATH')
+    if not path:
+        sys.exit('The ExploData plugin folder is required: pass --explodata or set EXPLODATA_PATH')
+    plugin_path = Path(path).resolve()
+    if not (plugin_path / 'load.py').exists():
+        sys.exit(f'{plugin_path} is not an ExploData plugin folder (no load.py)')
+    if plugin_path.name != 'ExploData':
+        sys.exit(f'{plugin_path} must be named ExploData, as Pioneer imports it by that name')
+    return plugin_path
+
+
+# EDMC module stand-ins
+
+class Config:
+    """
+    In-memory stand-in for EDMC's config object.
+    """
+
+    def __init__(self, app_dir: Path):
+        self.app_dir_path = app_dir
+        self.app_dir = str(app_dir)
+        self.plugin_dir_path = app_dir / 'plugins'
+        self.plugin_dir = str(self.plugin_dir_path)
+        self.internal_plugin_dir_path = self.plugin_dir_path
+        self.internal_plugin_dir = self.plugin_dir
+        self.default_journal_dir_path = app_dir / 'journals'
+        self.default_journal_dir = str(self.default_journal_dir_path)
+        self.shutting_down = False
+        self._settings: dict[str, Any] = {}
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._settings.get(key, default)
+
+    def get_str(self, key: str, *, default: str | None = None) -> str | None:
+        return str(self._settings[key]) if key in self._settings else default
+
+    def get_int(self, key: str, *, default: int = 0) -> int:
+        return int(self._settings[key]) if key in self._settings else default
+
+    def get_bool(self, key: str, *, default: bool | None = None) -> bool | None:
+        return bool(self._settings[key]) if key in self._settings else default
+
+    def get_list(self, key: str, *, default: list | None = None) -> list | None:
+        return list(self._settings[key]) if key in self._settings else default
+
+    def set(self, key: str, val: Any) -> None:
+        self._settings[key] = val
+
+    def delete(self, key: str, *, suppress: bool = False) -> None:
+        self._settings.pop(key, None)
+
+    def save(self) -> None:
+        pass
+
+
+class Theme:
+    """
+    Stand-in for EDMC's theme object. Theming is a no-op.
+    """
+
+    def register(self, widget: tk.Misc) -> None:
+        pass
+
+    def register_alternate(self, *args, **kwargs) -> None:
+        pass
+
+    def button_bind(self, *args, **kwargs) -> None:
+        pass
+
+    def update(self, widget: tk.Misc) -> None:
+        pass
+
+
+class HyperlinkLabel(tk.Label):
+    """
+    Stand-in for EDMC's HyperlinkLabel: a plain label which remembers its URL.
+    """
+
+    def __init__(self, master: tk.Misc | None = None, **kw):
+        self.url = kw.pop('url', None)
+        kw.pop('popup_copy', None)
+        kw.pop('underline', None)
+        super().__init__(master, **kw)
+
+
+class Plugin:
+    """
+    Stand-in for EDMC's plug.Plugin record.
+    """
+
+    def __init__(self, name: str, module: types.ModuleType | None, folder: str | None = None):
+        self.name = name
+        self.module = module
+        self.folder = folder
+
+
+def install_edmc_modules(app_dir: Path, log_level: int = logging.WARNING) -> Config:
+    """
+    Register stand-ins for the EDMC modules imported by Pioneer and ExploData: config, theme, plug, myNotebook,
+    ttkHyperlinkLabel and EDMCLogging.
+
+    :param app_dir: Directory used as the EDMC application directory, holding the plugin databases
+    :param log_level: Level of plugin log messages written to stderr
+    :return: The config stand-in
+    """
+
+    logging.basicConfig(format='%(asctime)s %(levelname)s %(name)s: %(message)s', level=log_level)
+    config = Config(app_dir)
+
+    def module(name: str, **attributes) -> None:
+        stand_in = types.ModuleType(name)
+        stand_in.__dict__.update(attributes)
+        sys.modules[name] = stand_in
+
+    module('config', config=config, appname='EDMarketConnector', applongname='E:D Market Connector',
+           appcmdname='EDMC', appversion=lambda: '5.12.0', user_agent='EDMC-benchmark')
+    module('theme', theme=Theme())
+    module('plug', PLUGINS=[], Plugin=Plugin, show_error=lambda err: logging.getLogger('EDMC').error(err))
+    module('myNotebook', Notebook=ttk.Notebook, Frame=ttk.Frame, Label=tk.Label, Entry=ttk.Entry,
+           EntryMenu=ttk.Entry, Button=ttk.Button, ColoredButton=tk.Button, Checkbutton=ttk.Checkbutton,
+           Radiobutton=ttk.Radiobutton, OptionMenu=ttk.OptionMenu)
+    module('ttkHyperlinkLabel', HyperlinkLabel=HyperlinkLabel)
+    module('EDMCLogging',
+           get_plugin_logger=lambda plugin_name, loglevel=logging.DEBUG: logging.getLogger(f'EDMC.{plugin_name}'),
+           get_main_logger=lambda: logging.getLogger('EDMC'))
+    return config
+
+
+def create_root() -> tuple[tk.Tk, bool]:
+    """
+    Create the Tk root, falling back to a Tcl interpreter without widgets if there is no display. Either way, it is
+    made the default root so Tk variables can be created.
+
+    :return: Tuple of the root and whether widgets are available
+    """
+
+    try:
+        root = tk.Tk()
+        root.withdraw()
+        return root, True
+    except tk.TclError:
+        root = tk.Tcl()
+        tk._default_root = root
+        return root, False
+
+
+def load_plugin(plugin_dir: Path) -> types.ModuleType:
+    """
+    Load a plugin's load.py the way EDMC does, with the plugin folder and its parent importable.
+
+    :param plugin_dir: Plugin folder
+    :return: The plugin module
+    """
+
+    for path in (plugin_dir.parent, plugin_dir):
+        if str(path) not in sys.path:
+            sys.path.insert(0, str(path))
+    name = f'plugin_{plugin_dir.name}'
+    loader = importlib.machinery.SourceFileLoader(name, str(plugin_dir / 'load.py'))
+    spec = importlib.util.spec_from_loader(name, loader)
+    plugin = importlib.util.module_from_spec(spec)
+    sys.modules[name] = plugin
+    loader.exec_module(plugin)
+    return plugin
+
+
+# Timing
+
+class EventRecorder:
+    """
+    Records the latency and query count of plugin hook calls, keyed by hook and the event being processed.
+    """
+
+    def __init__(self):
+        self.enabled: bool = False
+        self.event: str = ''
+        self.sequence: int = 0  # Index of the event being processed, for the trace
+        self.samples: dict[tuple[str, str], list[tuple[float, int | None]]] = {}
+        self.trace: list[tuple[int, str, str, float, int | None]] | None = None  # Every call, if enabled
+        self.query_stats: Callable[[str], int | None] = lambda hook: None
+
+    def wrap(self, hook: str, function: Callable) -> Callable:
+        """
+        :param hook: Hook name to record the calls under
+        :param function: The hook function
+        :return: Wrapped function recording each call while enabled
+        """
+
+        def wrapper(*args, **kwargs) -> Any:
+            if not self.enabled:
+                return function(*args, **kwargs)
+            start_time = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.record(hook, time.perf_counter() - start_time, self.query_stats(hook))
+
+        return wrapper
+
+    def record(self, hook: str, seconds: float, statements: int | None = None) -> None:
+        self.samples.setdefault((hook, self.event), []).append((seconds, statements))
+        if self.trace is not None:
+            self.trace.append((self.sequence, hook, self.event, seconds * 1000, statements))
+
+    def get_report(self) -> dict[str, dict[str, dict[str, float]]]:
+        """
+        :return: Dict of hook to event to count, p50, p95, max and mean statements, with durations in milliseconds
+        """
+
+        report: dict[str, dict[str, dict[str, float]]] = {}
+        for (hook, event), samples in sorted(self.samples.items()):
+            durations = sorted(seconds * 1000 for seconds, _ in samples)
+            statements = [count for _, count in samples if count is not None]
+            report.setdefault(hook, {})[event] = {
+                'count': len(durations),
+                'p50': get_percentile(durations, 50),
+                'p95': get_percentile(durations, 95),
+                'max': durations[-1],
+                'statements': statistics.fmean(statements) if statements else None,
+            }
+        return report
+
+
+def get_percentile(samples: list[float], percentile: float) -> float:
+    """
+    :param samples: Sorted samples
+    :param percentile: Percentile, from 0 to 100
+    :return: Nearest-rank percentile
+    """
+
+    rank = max(1, -(-len(samples) * percentile // 100))
+    return samples[int(rank) - 1]
+
+
+def format_report(report: dict[str, dict[str, dict[str, float]]]) -> str:
+    """
+    :param report: Report from EventRecorder.get_report
+    :return: The report as a table
+    """
+
+    lines = [f'{"Hook":<30} {"Event":<26} {"Count":>6} {"p50 ms":>9} {"p95 ms":>9} {"max ms":>9} {"Queries":>8}']
+    for hook, events in report.items():
+        for event, stats in events.items():
+            statements = f'{stats["statements"]:.1f}' if stats['statements'] is not None else '-'
+            lines.append(f'{hook:<30} {event:<26} {stats["count"]:>6} {stats["p50"]:>9.3f} {stats["p95"]:>9.3f} '
+                         f'{stats["max"]:>9.3f} {statements:>8}')
+    return '\n'.join(lines)
+
+
+# Plugin host
+
+class GameState:
+    """
+    The subset of EDMC's monitor state passed to journal_entry, tracked from the journal events.
+    """
+
+    def __init__(self):
+        self.cmdr: str | None = None
+        self.station: str | None = None
+        self.state: dict[str, Any] = {
+            'GameVersion': GAME_VERSION, 'GameBuild': GAME_BUILD, 'Odyssey': True, 'Horizons': True,
+            'Captain': None, 'SystemName': None, 'SystemAddress': None, 'StarPos': None, 'Body': None,
+            'BodyID': None, 'BodyType': None, 'StationName': None, 'StationType': None, 'MarketID': None,
+        }
+
+    def update(self, entry: dict[str, Any]) -> None:
+        match entry['event']:
+            case 'Fileheader':
+                self.state['GameVersion'] = entry.get('gameversion', GAME_VERSION)
+                self.state['GameBuild'] = entry.get('build', GAME_BUILD)
+                self.state['Odyssey'] = entry.get('Odyssey', False)
+            case 'LoadGame':
+                self.cmdr = entry['Commander']
+                self.state['Odyssey'] = entry.get('Odyssey', False)
+                self.state['Horizons'] = entry.get('Horizons', False)
+            case 'Commander':
+                self.cmdr = entry['Name']
+            case 'Location' | 'FSDJump' | 'CarrierJump':
+                self.state['SystemName'] = entry['StarSystem']
+                self.state['SystemAddress'] = entry['SystemAddress']
+                self.state['StarPos'] = tuple(entry['StarPos'])
+                self.state['Body'] = entry.get('Body')
+                self.state['BodyID'] = entry.get('BodyID')
+                self.state['BodyType'] = entry.get('BodyType')
+                self.station = entry.get('StationName') if entry.get('Docked') else None
+            case 'Docked':
+                self.station = entry['StationName']
+            case 'Undocked':
+                self.station = None
+            case 'ApproachBody':
+                self.state['Body'] = entry['Body']
+                self.state['BodyID'] = entry['BodyID']
+            case 'LeaveBody':
+                self.state['Body'] = None
+                self.state['BodyID'] = None
+        self.state['StationName'] = self.station
+
+
+class PluginHost:
+    """
+    Loads ExploData and Pioneer and feeds them events through their EDMC hooks, in EDMC's plugin order. Display
+    refreshes are run synchronously after each event so their cost is attributed to it.
+    """
+
+    def __init__(self, explodata_path: Path, app_dir: Path, log_level: int = logging.WARNING,
+                 settings: dict[str, Any] | None = None, load_pioneer: bool = True):
+        """
+        :param explodata_path: ExploData plugin folder
+        :param app_dir: EDMC application directory to keep the databases in
+        :param log_level: Level of plugin log messages written to stderr
+        :param settings: Initial EDMC config settings, such as Pioneer preferences
+        :param load_pioneer: Whether to load Pioneer. If not, only ExploData is run, e.g. to populate a database.
+        """
+
+        self.config = install_edmc_modules(app_dir, log_level)
+        for key, value in (settings or {}).items():
+            self.config.set(key, value)
+        self.root, self.has_display = create_root()
+        self.recorder = EventRecorder()
+        self.game = GameState()
+        self.explodata = load_plugin(explodata_path)
+        self.plugins = [('ExploData', self.explodata)]
+        self.pioneer: types.ModuleType | None = None
+        self.this = None
+        if load_pioneer:
+            self.load_pioneer()
+        for name, plugin in self.plugins:
+            plugin.plugin_start3(str(explodata_path if name == 'ExploData' else SRC_PATH))
+        if self.this and (self.this.migration_failed or self.this.db_mismatch):
+            raise RuntimeError('Pioneer failed to initialize its database')
+        if self.has_display:
+            for _, plugin in self.plugins:
+                if hasattr(plugin, 'plugin_app'):
+                    frame = plugin.plugin_app(self.root)
+                    if isinstance(frame, tk.Misc):
+                        frame.grid()
+        elif self.this:
+            self.pioneer.parse_config()
+            self.this.display_scheduler.bind(self.root, self.pioneer.update_display)
+
+    def load_pioneer(self) -> None:
+        self.pioneer = load_plugin(SRC_PATH)
+        self.this = self.pioneer.this
+        self.plugins.append(('Pioneer', self.pioneer))
+
+        # Replace the module functions before the hooks run, so callbacks registered with ExploData and the display
+        # scheduler reach the wrapped versions
+        self.this.query_counter.budget = 0
+        self.recorder.query_stats = self.get_query_count
+        self.pioneer.process_data_event = self.recorder.wrap('Pioneer.process_data_event',
+                                                             self.pioneer.process_data_event)
+        if not self.has_display:
+            self.pioneer.update_display = self.this.query_counter.counted('update_display')(self.update_valuation)
+        self.pioneer.update_display = self.recorder.wrap('Pioneer.update_display', self.pioneer.update_display)
+        self.pioneer.version_check = lambda: None
+
+    def get_query_count(self, hook: str) -> int | None:
+        """
+        :param hook: Hook name
+        :return: Statements executed by the hook's last call, if it is a Pioneer hook with a query counter scope
+        """
+
+        plugin, _, name = hook.partition('.')
+        stats = self.this.query_counter.last.pop(name, None) if plugin == 'Pioneer' and self.this else None
+        return stats.statements if stats else None
+
+    def update_valuation(self, changes) -> None:
+        """
+        The valuation and text rendering stages of update_display, used as the display refresh without widgets.
+
+        :param changes: The display inputs which have changed
+        """
+
+        this = self.this
+        system_status = self.pioneer.get_system_status()
+        if system_status and changes & self.pioneer.DisplayChange.VALUATION:
+            this.system_totals = self.pioneer.calc_system_value()
+            self.pioneer.calc_counts()
+            this.display_text = self.pioneer.get_display_text(system_status)
+            this.total_text = self.pioneer.get_total_text(*this.system_totals)
+
+    def journal_entry(self, entry: dict[str, Any]) -> None:
+        """
+        Pass a journal event to each plugin, then run any display refresh it scheduled.
+
+        :param entry: Journal event
+        """
+
+        self.game.update(entry)
+        self.recorder.event = entry['event']
+        args = (self.game.cmdr, False, self.game.state['SystemName'], self.game.station, entry, self.game.state)
+        for name, plugin in self.plugins:
+            if hasattr(plugin, 'journal_entry'):
+                self.recorder.wrap(f'{name}.journal_entry', plugin.journal_entry)(*args)
+        self.settle()
+
+    def dashboard_entry(self, entry: dict[str, Any]) -> None:
+        """
+        Pass a Status.json update to each plugin, then run any display refresh it scheduled.
+
+        :param entry: Status entry
+        """
+
+        self.recorder.event = 'Status'
+        for name, plugin in self.plugins:
+            if hasattr(plugin, 'dashboard_entry'):
+                self.recorder.wrap(f'{name}.dashboard_entry', plugin.dashboard_entry)(self.game.cmdr, False, entry)
+        self.settle()
+
+    def settle(self) -> None:
+        """
+        Run pending display refreshes and wait for database worker jobs, delivering their results.
+        """
+
+        if not self.this:
+            self.root.update()
+            return
+        self.this.display_scheduler.flush()
+        worker = self.this.db_worker
+        while worker.is_running() and worker.is_pending('unsold'):
+            time.sleep(0.001)
+            self.root.update()
+        self.root.update()
+        self.this.display_scheduler.flush()
+
+    def full_refresh(self) -> int | None:
+        """
+        Run a display refresh with all inputs marked as changed.
+
+        :return: Statements executed by the refresh, if recorded
+        """
+
+        self.recorder.event = 'full refresh'
+        self.this.display_scheduler.schedule(self.pioneer.DisplayChange.ALL)
+        self.settle()
+        samples = self.recorder.samples.get(('Pioneer.update_display', self.recorder.event))
+        return samples[-1][1] if samples else None
+
+    def replay(self, entries: Iterable[dict[str, Any]]) -> None:
+        """
+        :param entries: Journal and Status events, told apart by the 'Status' event name
+        """
+
+        for entry in entries:
+            if entry['event'] == 'Status':
+                self.dashboard_entry(entry)
+            else:
+                self.journal_entry(entry)
+
+    def get_output(self) -> dict[str, Any]:
+        """
+        :return: Pioneer's current rendered text and totals
+        """
+
+        this = self.this
+        return {
+            'system': this.system.name if this.system else None,
+            'display_text': this.display_text,
+            'body_text': this.values_label_text.get(),
+            'total_text': this.total_text,
+            'system_totals': list(this.system_totals),
+            'unsold_totals': list(this.unsold_ledger.get_totals()),
+        }
+
+    def stop(self) -> None:
+        for _, plugin in reversed(self.plugins):
+            if hasattr(plugin, 'plugin_stop'):
+                plugin.plugin_stop()
+        self.config.shutting_down = True
+        self.root.destroy()
+
+
+# Synthetic journal events
+
+PLANET_CLASSES = [
+    ('Icy body', 30, 0.0), ('Rocky body', 15, 0.05), ('High metal content body', 20, 0.15),
+    ('Metal rich body', 3, 0.0), ('Rocky ice body', 8, 0.05), ('Water world', 3, 0.4), ('Earthlike body', 0.5, 0.0),
+    ('Ammonia world', 0.5, 0.0), ('Sudarsky class I gas giant', 8, 0.0), ('Sudarsky class II gas giant', 4, 0.0),
+    ('Sudarsky class III gas giant', 3, 0.0), ('Gas giant with water based life', 1, 0.0), ('Water giant', 1, 0.0),
+]  # Class, weight, terraformable probability
+
+STAR_TYPES = [('M', 'Va', 0.4), ('K', 'Vab', 0.8), ('G', 'V', 1.0), ('F', 'V', 1.4), ('A', 'Vab', 2.2),
+              ('B', 'IV', 6.0), ('L', 'V', 0.08), ('T', 'V', 0.05), ('DA', 'VII', 0.6), ('N', 'VII', 1.6)]
+
+
+class SyntheticSystem:
+    """
+    A generated star system and the Scan events of its bodies and belt clusters.
+    """
+
+    def __init__(self, name: str, address: int, position: tuple[float, float, float], scans: list[dict[str, Any]],
+                 body_count: int, non_body_count: int):
+        self.name = name
+        self.address = address
+        self.position = position
+        self.scans = scans
+        self.body_count = body_count
+        self.non_body_count = non_body_count
+
+    @property
+    def main_star(self) -> dict[str, Any]:
+        return self.scans[0]
+
+    @property
+    def planets(self) -> list[dict[str, Any]]:
+        return [scan for scan in self.scans if 'PlanetClass' in scan]
+
+
+class SyntheticJournal:
+    """
+    Generates journal and Status events for a commander exploring synthetic systems. Deterministic for a given seed.
+    """
+
+    def __init__(self, seed: int = 0, commander: str = 'Benchmark', start: datetime = datetime(2024, 1, 1)):
+        self.rng = random.Random(seed)
+        self.commander = commander
+        self.time = start
+        self.system_index = 0
+        self.system: SyntheticSystem | None = None
+
+    def _event(self, event: str, seconds: float = 5, **fields) -> dict[str, Any]:
+        self.time += timedelta(seconds=seconds)
+        return {'timestamp': self.time.strftime('%Y-%m-%dT%H:%M:%SZ'), 'event': event, **fields}
+
+    def make_system(self, body_count: int, prefix: str = 'Synthetic') -> SyntheticSystem:
+        """
+        Generate a system with the given number of stars and planets, plus a belt cluster for each belt.
+
+        :param body_count: Number of stars and planets
+        :param prefix: Sector name prefix
+        :return: The system
+        """
+
+        rng = self.rng
+        index = self.system_index
+        self.system_index += 1
+        name = f'{prefix} Sector {chr(65 + index % 26)}{chr(65 + index // 26 % 26)}-{chr(65 + index // 676 % 26)} ' \
+               f'd{index % 100}-{index}'
+        address = 1_000_000_000 + index
+        position = (index * 7.5 % 2000 - 1000, index * 3.25 % 200 - 100, index * 11.0 % 4000 - 2000)
+        star_count = max(1, min(body_count, 1 + int(body_count * rng.uniform(0, 0.1))))
+        planet_count = body_count - star_count
+        star_names = [name] if star_count == 1 else [f'{name} {chr(65 + star)}' for star in range(star_count)]
+
+        scans: list[dict[str, Any]] = []
+        clusters: list[dict[str, Any]] = []
+        body_id = 0
+        for star, star_name in enumerate(star_names):
+            star_type, luminosity, mass = STAR_TYPES[0 if star == 0 and rng.random() < 0.5
+                                                     else rng.randrange(len(STAR_TYPES))]
+            rings = []
+            if rng.random() < 0.3:
+                belt_name = f'{star_name} A Belt'
+                rings.append({'Name': belt_name, 'RingClass': 'eRingClass_Rocky', 'MassMT': 1e12,
+                              'InnerRad': 1e9, 'OuterRad': 2e9})
+            scans.append({
+                'ScanType': 'AutoScan' if star == 0 else 'Detailed', 'BodyName': star_name, 'BodyID': body_id,
+                'StarSystem': name, 'SystemAddress': address,
+                'DistanceFromArrivalLS': 0.0 if star == 0 else rng.uniform(1000, 200000),
+                'StarType': star_type, 'Subclass': rng.randrange(10), 'StellarMass': mass * rng.uniform(0.8, 1.2),
+                'Radius': mass * 6.9e8, 'AbsoluteMagnitude': rng.uniform(-2, 15), 'Age_MY': rng.randrange(10, 13000),
+                'SurfaceTemperature': rng.uniform(500, 20000), 'Luminosity': luminosity, 'RotationPeriod': 1e5,
+                'AxialTilt': 0.0, 'Rings': rings, 'WasDiscovered': rng.random() < 0.2, 'WasMapped': False,
+            })
+            if rings:
+                body_id += 1
+                clusters.append({
+                    'ScanType': 'Detailed', 'BodyName': f'{rings[0]["Name"]} Cluster 1', 'BodyID': body_id,
+                    'Parents': [{'Ring': body_id - 1}, {'Star': body_id - 1}], 'StarSystem': name,
+                    'SystemAddress': address, 'DistanceFromArrivalLS': scans[-1]['DistanceFromArrivalLS'] + 5,
+                    'WasDiscovered': False, 'WasMapped': False,
+                })
+            body_id += 1
+
+        classes, weights, terraformable = zip(*[(c, w, t) for c, w, t in PLANET_CLASSES])
+        planet_number = 0
+        moon = 0
+        star = 0
+        for _ in range(planet_count):
+            if planet_number == 0 or moon >= 4 or rng.random() < 0.6:
+                star = rng.randrange(star_count)
+                planet_number += 1
+                moon = 0
+                planet_name = f'{star_names[star]} {planet_number}'
+            else:
+                planet_name = f'{star_names[star]} {planet_number} {chr(97 + moon)}'
+                moon += 1
+            planet_class = rng.choices(range(len(classes)), weights)[0]
+            was_discovered = rng.random() < 0.2
+            scans.append({
+                'ScanType': 'Detailed', 'BodyName': planet_name, 'BodyID': body_id, 'Parents': [{'Star': star}],
+                'StarSystem': name, 'SystemAddress': address, 'DistanceFromArrivalLS': rng.uniform(5, 250000),
+                'TidalLock': rng.random() < 0.5,
+                'TerraformState': 'Terraformable' if rng.random() < terraformable[planet_class] else '',
+                'PlanetClass': classes[planet_class], 'Atmosphere': '', 'AtmosphereType': 'None', 'Volcanism': '',
+                'MassEM': rng.uniform(0.0001, 3000), 'Radius': rng.uniform(2e5, 7e7),
+                'SurfaceGravity': rng.uniform(0.1, 30), 'SurfaceTemperature': rng.uniform(20, 2000),
+                'SurfacePressure': 0.0, 'Landable': rng.random() < 0.4, 'SemiMajorAxis': rng.uniform(1e8, 1e12),
+                'Eccentricity': rng.random() * 0.2, 'OrbitalInclination': rng.uniform(-10, 10),
+                'Periapsis': rng.uniform(0, 360), 'OrbitalPeriod': rng.uniform(1e4, 1e9),
+                'AscendingNode': rng.uniform(-180, 180), 'MeanAnomaly': rng.uniform(0, 360),
+                'RotationPeriod': rng.uniform(1e4, 1e7), 'AxialTilt': rng.uniform(-3, 3),
+                'WasDiscovered': was_discovered, 'WasMapped': was_discovered and rng.random() < 0.3,
+            })
+            body_id += 1
+        return SyntheticSystem(name, address, position, scans[:star_count] + clusters + scans[star_count:],
+                               body_count, len(clusters))
+
+    def start_session(self, system: SyntheticSystem) -> list[dict[str, Any]]:
+        """
+        :param system: System the commander starts in
+        :return: Events of a game start
+        """
+
+        self.system = system
+        return [
+            self._event('Fileheader', part=1, language='English/UK', Odyssey=True, gameversion=GAME_VERSION,
+                        build=GAME_BUILD),
+            self._event('Commander', FID='F0000001', Name=self.commander),
+            self._event('LoadGame', FID='F0000001', Commander=self.commander, Horizons=True, Odyssey=True,
+                        Ship='DiamondBackXL', ShipID=1, GameMode='Solo', Credits=100_000_000, Loan=0,
+                        gameversion=GAME_VERSION, build=GAME_BUILD),
+            self._event('Location', Docked=False, StarSystem=system.name, SystemAddress=system.address,
+                        StarPos=list(system.position), Body=system.main_star['BodyName'], BodyID=0,
+                        BodyType='Star', Population=0),
+        ]
+
+    def jump(self, system: SyntheticSystem) -> list[dict[str, Any]]:
+        """
+        :param system: Destination
+        :return: Events of a hyperspace jump
+        """
+
+        self.system = system
+        return [
+            self._event('StartJump', 20, JumpType='Hyperspace', StarSystem=system.name,
+                        SystemAddress=system.address, StarClass=system.main_star['StarType']),
+            self._event('FSDJump', 15, StarSystem=system.name, SystemAddress=system.address,
+                        StarPos=list(system.position), Body=system.main_star['BodyName'], BodyID=0,
+                        BodyType='Star', Population=0, JumpDist=50.0, FuelUsed=5.0, FuelLevel=20.0),
+        ]
+
+    def explore(self, map_fraction: float = 0.3, efficient_fraction: float = 0.8) -> list[dict[str, Any]]:
+        """
+        :param map_fraction: Fraction of planets to map
+        :param efficient_fraction: Fraction of mapped planets mapped efficiently
+        :return: Events of honking, fully scanning and mapping the current system
+        """
+
+        system = self.system
+        events = [
+            self._event('Scan', 1, **system.main_star),
+            self._event('FSSDiscoveryScan', 5, Progress=1.0 / system.body_count, BodyCount=system.body_count,
+                        NonBodyCount=system.non_body_count, SystemName=system.name, SystemAddress=system.address),
+        ]
+        events += [self._event('Scan', 3, **scan) for scan in system.scans[1:]]
+        events.append(self._event('FSSDiscoveryScan', 1, Progress=1.0, BodyCount=system.body_count,
+                                  NonBodyCount=system.non_body_count, SystemName=system.name,
+                                  SystemAddress=system.address))
+        events.append(self._event('FSSAllBodiesFound', 1, SystemName=system.name, SystemAddress=system.address,
+                                  Count=system.body_count))
+        for planet in system.planets:
+            if self.rng.random() < map_fraction:
+                target = self.rng.randrange(3, 12)
+                events.append(self._event(
+                    'SAAScanComplete', 120, BodyName=planet['BodyName'], SystemAddress=system.address,
+                    BodyID=planet['BodyID'],
+                    ProbesUsed=target if self.rng.random() < efficient_fraction else target + 3,
+                    EfficiencyTarget=target,
+                ))
+        return events
+
+    def sell(self, systems: list[SyntheticSystem]) -> list[dict[str, Any]]:
+        """
+        :param systems: Systems to sell the data of
+        :return: A universal cartographics sale
+        """
+
+        return [self._event('MultiSellExplorationData', 60,
+                            Discovered=[{'SystemName': system.name, 'NumBodies': system.body_count}
+                                        for system in systems],
+                            BaseValue=1_000_000 * len(systems), Bonus=0, TotalEarnings=1_000_000 * len(systems))]
+
+    def die(self) -> list[dict[str, Any]]:
+        """
+        :return: Events of the commander's ship being destroyed and rebought
+        """
+
+        return [
+            self._event('Died', 60, KillerName='Thargoid', KillerShip='scout_hq', KillerRank='Elite'),
+            self._event('Resurrect', 30, Option='rebuy', Cost=10_000_000, Bankrupt=False),
+        ]
+
+    def status(self, analysis_mode: bool = True, body: dict[str, Any] | None = None,
+               gui_focus: int = 0) -> dict[str, Any]:
+        """
+        :param analysis_mode: HUD analysis mode
+        :param body: Scan of the targeted body, if any
+        :param gui_focus: Focused GUI panel
+        :return: A Status.json update
+        """
+
+        flags = StatusFlags.IN_SHIP | StatusFlags.SUPERCRUISE | StatusFlags.SHIELDS_UP
+        if analysis_mode:
+            flags |= StatusFlags.IS_ANALYSIS_MODE
+        entry = self._event('Status', 1, Flags=flags.value, Flags2=0, GuiFocus=gui_focus, Fuel={'FuelMain': 20.0},
+                            Cargo=0.0, LegalState='Clean', Balance=100_000_000)
+        if body:
+            entry['Destination'] = {'System': self.system.address, 'Body': body['BodyID'], 'Name': body['BodyName']}
+        return entry
+
+
+def read_journals(paths: Iterable[Path]) -> Iterator[dict[str, Any]]:
+    """
+    :param paths: Journal files, or directories of them, read in the given order. Files within a directory are read
+                  in name order, which is chronological for the game's journal names.
+    :return: Iterator of journal events
+    """
+
+    for path in paths:
+        files = sorted(path.glob('Journal*.log')) if path.is_dir() else [path]
+        for file_path in files:
+            with open(file_path, 'r', encoding='utf-8') as file:
+                for number, line in enumerate(file, 1):
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        logging.getLogger('EDMC').warning(f'Skipping invalid journal line {file_path}:{number}')
@@ -0,0 +1,138 @@
+"""
+Replays Elite Dangerous journals through ExploData and Pioneer without EDMC, recording the latency of every hook call
+and Pioneer's rendered text and totals. The text and totals are captured on leaving each system and at the end, so
+two runs can be compared to check that a change kept the output stable.
+
+Status.json updates aren't part of the journal. To replay dashboard_entry as well, pass files of Status entries, one
+JSON object per line, with --status; they are merged with the journal events by timestamp.
+
+Usage: python benchmarks/journal_replay.py --explodata PATH JOURNAL [JOURNAL ...] [--status FILE ...]
+                                           [--output FILE] [--expected FILE] [--trace FILE]
+"""
+import argparse
+import heapq
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Iterator
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import harness  # noqa: E402
+
+
+def read_events(journals: list[Path], status_files: list[Path]) -> Iterator[dict[str, Any]]:
+    """
+    :param journals: Journal files or directories
+    :param status_files: Files of Status entries
+    :return: Journal and Status events in timestamp order
+    """
+
+    if not status_files:
+        return harness.read_journals(journals)
+    return heapq.merge(harness.read_journals(journals), harness.read_journals(status_files),
+                       key=lambda entry: entry.get('timestamp', ''))
+
+
+def replay(host: harness.PluginHost, events: Iterator[dict[str, Any]], limit: int | None) -> dict[str, Any]:
+    """
+    :param host: Plugin host
+    :param events: Events to replay
+    :param limit: Maximum number of events to replay
+    :return: Dict of the event count, elapsed time, per-system outputs and final output
+    """
+
+    systems = []
+    count = 0
+    start_time = time.perf_counter()
+    for count, entry in enumerate(events, 1):
+        if limit is not None and count > limit:
+            count -= 1
+            break
+        if entry.get('event') == 'StartJump' and entry.get('JumpType') == 'Hyperspace' and host.this.system:
+            systems.append(host.get_output())
+        host.recorder.sequence = count
+        if entry.get('event') == 'Status':
+            host.dashboard_entry(entry)
+        elif 'event' in entry:
+            host.journal_entry(entry)
+        if count % 10000 == 0:
+            print(f'{count} events ({time.perf_counter() - start_time:.0f} s)', file=sys.stderr)
+    return {
+        'events': count,
+        'elapsed': time.perf_counter() - start_time,
+        'systems': systems,
+        'final': host.get_output(),
+    }
+
+
+def compare_outputs(result: dict[str, Any], expected: dict[str, Any]) -> list[str]:
+    """
+    :param result: Replay result
+    :param expected: Result of an earlier replay of the same journals
+    :return: Descriptions of the differences in output
+    """
+
+    differences = []
+    if len(result['systems']) != len(expected['systems']):
+        differences.append(f'{len(result["systems"])} systems visited, expected {len(expected["systems"])}')
+    outputs = list(zip(result['systems'], expected['systems'])) + [(result['final'], expected['final'])]
+    for index, (output, expected_output) in enumerate(outputs):
+        for key in expected_output:
+            if output.get(key) != expected_output[key]:
+                label = 'final state' if index == len(outputs) - 1 else f'system {index + 1}'
+                differences.append(f'{label} ({expected_output["system"]}): {key} differs\n'
+                                   f'  expected: {expected_output[key]!r}\n  actual:   {output.get(key)!r}')
+    return differences
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('journals', type=Path, nargs='+', help='Journal files or directories of them')
+    parser.add_argument('--explodata', help='ExploData plugin folder (default: $EXPLODATA_PATH)')
+    parser.add_argument('--status', type=Path, nargs='*', default=[], help='Files of Status entries')
+    parser.add_argument('--app-dir', type=Path, help='Application directory to keep the databases in, instead of a '
+                                                     'temporary one')
+    parser.add_argument('--limit', type=int, help='Stop after this many events')
+    parser.add_argument('--output', type=Path, help='Write the timings and outputs as JSON')
+    parser.add_argument('--expected', type=Path, help='Compare the outputs against an earlier --output')
+    parser.add_argument('--trace', type=Path, help='Write the duration of every hook call as JSON lines')
+    args = parser.parse_args()
+    explodata_path = harness.get_explodata_path(args.explodata)
+
+    with tempfile.TemporaryDirectory(prefix='pioneer-replay-') as temp_dir:
+        app_dir = args.app_dir or Path(temp_dir)
+        app_dir.mkdir(parents=True, exist_ok=True)
+        host = harness.PluginHost(explodata_path, app_dir)
+        host.recorder.enabled = True
+        if args.trace:
+            host.recorder.trace = []
+        result = replay(host, read_events(args.journals, args.status), args.limit)
+        result['report'] = host.recorder.get_report()
+        host.stop()
+
+    print(harness.format_report(result['report']))
+    print(f'\n{result["events"]} events in {result["elapsed"]:.1f} s, {len(result["systems"])} systems')
+    print(result['final']['total_text'])
+
+    if args.trace:
+        with open(args.trace, 'w', encoding='utf-8') as file:
+            for sequence, hook, event, duration, statements in host.recorder.trace:
+                file.write(json.dumps({'index': sequence, 'event': event, 'hook': hook, 'ms': round(duration, 4),
+                                       'queries': statements}) + '\n')
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(result, file, indent=2)
+    if args.expected:
+        with open(args.expected, 'r', encoding='utf-8') as file:
+            differences = compare_outputs(result, json.load(file))
+        if differences:
+            print(f'\n{len(differences)} output differences:\n' + '\n'.join(differences[:20]))
+            sys.exit(1)
+        print('\nOutput matches the expected run')
+
+
+if __name__ == '__main__':
+    main()
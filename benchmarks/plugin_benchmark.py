@@ -0,0 +1,204 @@
+"""
+Measures the per-event latency of Pioneer's EDMC hooks outside EDMC. Each scenario builds a fresh ExploData database
+by playing a synthetic commander history (past systems, sales and deaths), then explores systems of a given size while
+timing journal_entry, process_data_event, dashboard_entry and the resulting display refreshes.
+
+Scenarios run in separate processes, as the plugins keep module-level state. Results can be written as JSON and
+compared against a baseline to flag regressions. The number of queries of a full display refresh is also checked
+against the smallest system size, to catch queries issued per body.
+
+Usage: python benchmarks/plugin_benchmark.py --explodata PATH [--sizes 10 100 500] [--histories sold unsold died]
+                                             [--output FILE] [--baseline FILE] [--tolerance 0.25]
+"""
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import harness  # noqa: E402
+
+HISTORIES = {
+    'sold': 'All past systems sold',
+    'unsold': 'No past systems sold',
+    'died': 'Past systems partially sold, then lost to a ship destruction, followed by unsold systems',
+}
+
+
+def build_history(host: harness.PluginHost, journal: harness.SyntheticJournal, history: str, systems: int) -> None:
+    """
+    Play the commander's past exploration, unmeasured.
+
+    :param host: Plugin host
+    :param journal: Event generator
+    :param history: History kind, one of HISTORIES
+    :param systems: Number of past systems
+    """
+
+    host.replay(journal.start_session(journal.make_system(5)))
+    unsold: list[harness.SyntheticSystem] = []
+    for index in range(systems):
+        system = journal.make_system(journal.rng.randrange(5, 40))
+        host.replay(journal.jump(system))
+        host.replay(journal.explore())
+        unsold.append(system)
+        if history == 'sold' and len(unsold) == 10:
+            host.replay(journal.sell(unsold))
+            unsold = []
+        elif history == 'died' and index == systems // 2:
+            host.replay(journal.sell(unsold[:len(unsold) // 2]))
+            host.replay(journal.die())
+            unsold = []
+    if history == 'sold' and unsold:
+        host.replay(journal.sell(unsold))
+
+
+def run_scenario(explodata_path: Path, size: int, history: str, history_systems: int, systems: int,
+                 seed: int) -> dict[str, Any]:
+    """
+    :param explodata_path: ExploData plugin folder
+    :param size: Number of bodies in each measured system
+    :param history: History kind, one of HISTORIES
+    :param history_systems: Number of past systems
+    :param systems: Number of measured systems
+    :param seed: Random seed
+    :return: Scenario results
+    """
+
+    with tempfile.TemporaryDirectory(prefix='pioneer-benchmark-') as app_dir:
+        host = harness.PluginHost(explodata_path, Path(app_dir))
+        journal = harness.SyntheticJournal(seed)
+        build_history(host, journal, history, history_systems)
+
+        host.recorder.enabled = True
+        refresh_queries = []
+        measured = []
+        for _ in range(systems):
+            system = journal.make_system(size)
+            measured.append(system)
+            host.replay(journal.jump(system))
+            host.dashboard_entry(journal.status(analysis_mode=True))
+            for event in journal.explore():
+                host.journal_entry(event)
+                if event['event'] == 'Scan' and journal.rng.random() < 0.2:
+                    host.dashboard_entry(journal.status(analysis_mode=True, body=event))
+            host.dashboard_entry(journal.status(analysis_mode=False, gui_focus=6))
+            host.dashboard_entry(journal.status(analysis_mode=True))
+
+            # Warm refresh first, so the count excludes one-off work such as loading the unsold ledger
+            host.full_refresh()
+            refresh_queries.append(host.full_refresh())
+        host.replay(journal.sell(measured))
+        host.recorder.enabled = False
+
+        report = host.recorder.get_report()
+        host.stop()
+    return {
+        'size': size,
+        'history': history,
+        'display': host.has_display,
+        'report': report,
+        'refresh_queries': max((count for count in refresh_queries if count is not None), default=None),
+    }
+
+
+def compare(results: list[dict[str, Any]], baseline: list[dict[str, Any]], tolerance: float) -> list[str]:
+    """
+    :param results: Scenario results
+    :param baseline: Baseline scenario results
+    :param tolerance: Allowed relative increase of the median latency
+    :return: Descriptions of regressions
+    """
+
+    regressions = []
+    baseline_reports = {(scenario['size'], scenario['history']): scenario['report'] for scenario in baseline}
+    for scenario in results:
+        base_report = baseline_reports.get((scenario['size'], scenario['history']), {})
+        for hook, events in scenario['report'].items():
+            for event, stats in events.items():
+                base = base_report.get(hook, {}).get(event)
+                if base and stats['p50'] > base['p50'] * (1 + tolerance):
+                    regressions.append(f'{scenario["size"]} bodies, {scenario["history"]}: {hook} {event} p50 '
+                                       f'{base["p50"]:.3f} -> {stats["p50"]:.3f} ms')
+    return regressions
+
+
+def check_queries(results: list[dict[str, Any]]) -> list[str]:
+    """
+    :param results: Scenario results
+    :return: Descriptions of scenarios whose full refresh ran more queries than the smallest size of the same history
+    """
+
+    failures = []
+    for history in {scenario['history'] for scenario in results}:
+        scenarios = sorted((scenario for scenario in results if scenario['history'] == history
+                            and scenario['refresh_queries'] is not None), key=lambda scenario: scenario['size'])
+        for scenario in scenarios[1:]:
+            if scenario['refresh_queries'] > scenarios[0]['refresh_queries']:
+                failures.append(f'{history}: full refresh ran {scenario["refresh_queries"]} queries with '
+                                f'{scenario["size"]} bodies, {scenarios[0]["refresh_queries"]} with '
+                                f'{scenarios[0]["size"]}')
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--explodata', help='ExploData plugin folder (default: $EXPLODATA_PATH)')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 500])
+    parser.add_argument('--histories', nargs='+', choices=HISTORIES, default=list(HISTORIES))
+    parser.add_argument('--history-systems', type=int, default=50, help='Past systems explored before measuring')
+    parser.add_argument('--systems', type=int, default=3, help='Systems explored per scenario')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', type=Path, help='Write the results as JSON')
+    parser.add_argument('--baseline', type=Path, help='Compare against results written with --output')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed relative p50 increase')
+    parser.add_argument('--scenario', nargs=2, metavar=('SIZE', 'HISTORY'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    explodata_path = harness.get_explodata_path(args.explodata)
+
+    if args.scenario:
+        result = run_scenario(explodata_path, int(args.scenario[0]), args.scenario[1], args.history_systems,
+                              args.systems, args.seed)
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(result, file)
+        return
+
+    results = []
+    for history in args.histories:
+        for size in args.sizes:
+            with tempfile.TemporaryDirectory(prefix='pioneer-benchmark-') as output_dir:
+                output = Path(output_dir) / 'result.json'
+                process = subprocess.run(
+                    [sys.executable, __file__, '--explodata', str(explodata_path), '--scenario', str(size), history,
+                     '--history-systems', str(args.history_systems), '--systems', str(args.systems),
+                     '--seed', str(args.seed), '--output', str(output)]
+                )
+                if process.returncode:
+                    sys.exit(f'Scenario {size} bodies, {history} failed')
+                with open(output, 'r', encoding='utf-8') as file:
+                    result = json.load(file)
+            results.append(result)
+            print(f'\n{size} bodies, {HISTORIES[history].lower()}'
+                  f'{"" if result["display"] else " (no display: valuation and text only)"}')
+            print(harness.format_report(result['report']))
+            print(f'Full refresh queries: {result["refresh_queries"]}')
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=2)
+
+    failures = check_queries(results)
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as file:
+            failures += compare(results, json.load(file), args.tolerance)
+    if failures:
+        print('\n' + '\n'.join(failures))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,256 @@
+"""
+Measures how unsold value recalculation scales with the size of the ExploData database. Databases of increasing
+size are generated by playing a long synthetic career through ExploData: systems of varied size, sales at irregular
+intervals, occasional ship losses and a final stretch of unsold systems. Each size is then loaded into a fresh Pioneer
+instance which times:
+
+- full: rebuilding the unsold ledger from scratch
+- sync: syncing an up to date ledger with the database, as done after journal parsing or a setting change
+- idle: get_unsold_data with nothing to revalue
+- get_system_value: valuing a single system, loaded from the database
+
+A log-log slope is fitted per measurement: 0 is constant time, 1 linear in the number of bodies.
+
+Generation runs once per seed and is cached, as the largest databases take a while to build.
+
+Usage: python benchmarks/unsold_scaling_benchmark.py --explodata PATH [--sizes 10000 100000 1000000]
+                                                     [--max-sell-events N] [--output FILE]
+"""
+import argparse
+import json
+import math
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import harness  # noqa: E402
+
+LEDGER_FILE = 'pioneer_unsold.json'
+METADATA_FILE = 'scaling.json'
+
+
+def is_sqlite(path: Path) -> bool:
+    with open(path, 'rb') as file:
+        return file.read(16) == b'SQLite format 3\x00'
+
+
+def snapshot(app_dir: Path, destination: Path) -> None:
+    """
+    Copy the application directory, using SQLite's backup API for databases so open connections don't matter.
+    Pioneer's unsold ledger is left out, so each measurement starts without one.
+
+    :param app_dir: Application directory
+    :param destination: Directory to copy it to
+    """
+
+    for path in app_dir.rglob('*'):
+        target = destination / path.relative_to(app_dir)
+        if path.is_dir():
+            target.mkdir(parents=True, exist_ok=True)
+        elif path.name == LEDGER_FILE or path.name.endswith(('-wal', '-shm', '-journal')):
+            continue
+        elif is_sqlite(path):
+            target.parent.mkdir(parents=True, exist_ok=True)
+            source, copy = sqlite3.connect(path), sqlite3.connect(target)
+            try:
+                source.backup(copy)
+            finally:
+                source.close()
+                copy.close()
+        else:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(path, target)
+
+
+def generate(explodata_path: Path, cache_dir: Path, sizes: list[int], seed: int, unsold_systems: int) -> None:
+    """
+    Play a synthetic career through ExploData, snapshotting the application directory as each size is reached.
+
+    :param explodata_path: ExploData plugin folder
+    :param cache_dir: Directory to store the snapshots in, one subdirectory per size
+    :param sizes: Database sizes in bodies
+    :param seed: Random seed
+    :param unsold_systems: Number of systems explored after the last sale
+    """
+
+    with tempfile.TemporaryDirectory(prefix='pioneer-scaling-') as app_dir:
+        host = harness.PluginHost(explodata_path, Path(app_dir), load_pioneer=False)
+        journal = harness.SyntheticJournal(seed)
+        rng = journal.rng
+        host.replay(journal.start_session(journal.make_system(5)))
+
+        pending = sorted(sizes)
+        bodies = 0
+        explored: list[harness.SyntheticSystem] = []
+        next_sale = rng.randint(20, 150)
+        start_time = time.perf_counter()
+        while pending:
+            system = journal.make_system(min(300, max(1, int(rng.lognormvariate(2.3, 0.8)))))
+            host.replay(journal.jump(system))
+            host.replay(journal.explore(map_fraction=0.1))
+            explored.append(system)
+            bodies += system.body_count
+
+            # Sell regularly until the final stretch before the next snapshot
+            if len(explored) >= next_sale and bodies < pending[0] - unsold_systems * 15:
+                host.replay(journal.sell(explored))
+                explored = []
+                next_sale = rng.randint(20, 150)
+            if rng.random() < 1 / 3000:
+                host.replay(journal.die())
+                explored = []
+
+            if bodies >= pending[0]:
+                size = pending.pop(0)
+                destination = cache_dir / str(size)
+                shutil.rmtree(destination, ignore_errors=True)
+                snapshot(Path(app_dir), destination)
+                with open(destination / METADATA_FILE, 'w', encoding='utf-8') as file:
+                    json.dump({'size': size, 'bodies': bodies, 'systems': journal.system_index,
+                               'commander': journal.commander, 'time': journal.time.isoformat()}, file)
+                print(f'Generated {bodies} bodies in {journal.system_index} systems '
+                      f'({time.perf_counter() - start_time:.0f} s)', file=sys.stderr)
+        host.stop()
+
+
+def measure(explodata_path: Path, snapshot_dir: Path, max_sell_events: int, repeat: int,
+            samples: int) -> dict[str, Any]:
+    """
+    :param explodata_path: ExploData plugin folder
+    :param snapshot_dir: Snapshot of the application directory to measure
+    :param max_sell_events: Pioneer's sell event cutoff setting
+    :param repeat: Number of runs of each unsold measurement
+    :param samples: Number of systems to time get_system_value on
+    :return: Dict of the snapshot metadata and the durations of each measurement, in milliseconds
+    """
+
+    with open(snapshot_dir / METADATA_FILE, 'r', encoding='utf-8') as file:
+        metadata = json.load(file)
+    with tempfile.TemporaryDirectory(prefix='pioneer-scaling-') as app_dir:
+        shutil.copytree(snapshot_dir, app_dir, dirs_exist_ok=True)
+        host = harness.PluginHost(explodata_path, Path(app_dir),
+                                  settings={'pioneer_max_sell_events': max_sell_events})
+        pioneer, this = host.pioneer, host.this
+        journal = harness.SyntheticJournal(metadata['size'], metadata['commander'],
+                                           datetime.fromisoformat(metadata['time']))
+        host.replay(journal.start_session(journal.make_system(5, prefix='Measurement')))
+        this.db_worker.stop()  # Recalculate inline, so it can be timed
+
+        def timed(function) -> float:
+            start_time = time.perf_counter()
+            function()
+            return (time.perf_counter() - start_time) * 1000
+
+        def full() -> None:
+            this.unsold_ledger.invalidate()
+            this.recalculate_unsold = True
+            pioneer.get_unsold_data()
+
+        def sync() -> None:
+            this.recalculate_unsold = True
+            pioneer.get_unsold_data()
+
+        results: dict[str, list[float]] = {'full': [], 'sync': [], 'idle': []}
+        for _ in range(repeat):
+            results['full'].append(timed(full))
+            results['sync'].append(timed(sync))
+            results['idle'].append(timed(pioneer.get_unsold_data))
+        unsold_systems = this.unsold_ledger.get_count()
+
+        session = this.sql_session
+        system_ids = session.scalars(pioneer.select(pioneer.System.id).order_by(pioneer.func.random())
+                                     .limit(samples)).all()
+        results['get_system_value'] = []
+        for system_id in system_ids:
+            session.expire_all()
+            system = session.get(pioneer.System, system_id)
+            results['get_system_value'].append(
+                timed(lambda: pioneer.get_system_value(system, session, this.commander.id)))
+        host.stop()
+    return {**metadata, 'unsold_systems': unsold_systems, 'timings': results}
+
+
+def fit_slope(sizes: list[int], durations: list[float]) -> float | None:
+    """
+    :param sizes: Database sizes
+    :param durations: Median durations at each size
+    :return: Least-squares slope of log(duration) against log(size)
+    """
+
+    points = [(math.log(size), math.log(duration)) for size, duration in zip(sizes, durations) if duration > 0]
+    if len(points) < 2:
+        return None
+    mean_x = statistics.fmean(x for x, _ in points)
+    mean_y = statistics.fmean(y for _, y in points)
+    variance = sum((x - mean_x) ** 2 for x, _ in points)
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / variance if variance else None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--explodata', help='ExploData plugin folder (default: $EXPLODATA_PATH)')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 30_000, 100_000, 300_000, 1_000_000])
+    parser.add_argument('--max-sell-events', type=int, default=5, help='Pioneer\'s sell event cutoff setting')
+    parser.add_argument('--unsold-systems', type=int, default=500, help='Systems explored after the last sale')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--samples', type=int, default=200, help='Systems to time get_system_value on')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--cache-dir', type=Path, default=Path(tempfile.gettempdir()) / 'pioneer-unsold-scaling')
+    parser.add_argument('--regenerate', action='store_true', help='Ignore cached databases')
+    parser.add_argument('--output', type=Path, help='Write the results as JSON')
+    parser.add_argument('--measure', type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    explodata_path = harness.get_explodata_path(args.explodata)
+
+    if args.measure:
+        result = measure(explodata_path, args.measure, args.max_sell_events, args.repeat, args.samples)
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(result, file)
+        return
+
+    cache_dir = args.cache_dir / f'seed-{args.seed}-unsold-{args.unsold_systems}'
+    # Histories depend on the sizes generated together, so a missing size regenerates all of them
+    if args.regenerate or not all((cache_dir / str(size) / METADATA_FILE).exists() for size in args.sizes):
+        generate(explodata_path, cache_dir, args.sizes, args.seed, args.unsold_systems)
+
+    results = []
+    for size in sorted(args.sizes):
+        with tempfile.TemporaryDirectory(prefix='pioneer-scaling-') as output_dir:
+            output = Path(output_dir) / 'result.json'
+            process = subprocess.run(
+                [sys.executable, __file__, '--explodata', str(explodata_path), '--measure', str(cache_dir / str(size)),
+                 '--max-sell-events', str(args.max_sell_events), '--repeat', str(args.repeat),
+                 '--samples', str(args.samples), '--output', str(output)]
+            )
+            if process.returncode:
+                sys.exit(f'Measurement of {size} bodies failed')
+            with open(output, 'r', encoding='utf-8') as file:
+                results.append(json.load(file))
+
+    measurements = list(results[0]['timings'])
+    print(f'Median ms, sell event cutoff {args.max_sell_events}')
+    print(f'{"Bodies":>9} {"Systems":>8} {"Unsold":>7} ' + ' '.join(f'{name:>16}' for name in measurements))
+    medians = {name: [statistics.median(result['timings'][name]) for result in results] for name in measurements}
+    for index, result in enumerate(results):
+        print(f'{result["bodies"]:>9} {result["systems"]:>8} {result["unsold_systems"]:>7} '
+              + ' '.join(f'{medians[name][index]:>16.3f}' for name in measurements))
+    slopes = {name: fit_slope([result['bodies'] for result in results], medians[name]) for name in measurements}
+    print(f'{"Slope":>26} ' + ' '.join(f'{slope:>16.2f}' if slope is not None else f'{"-":>16}'
+                                       for slope in slopes.values()))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump({'max_sell_events': args.max_sell_events, 'results': results, 'slopes': slopes}, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
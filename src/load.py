@@ -3,23 +3,27 @@
 # Source: https://github.com/Silarn/EDMC-Pioneer
 # Inspired by Economical Cartographics: https://github.com/n-st/EDMC-EconomicalCartographics
 # Licensed under the [GNU Public License (GPL)](http://www.gnu.org/licenses/gpl-2.0.html) version 2 or later.
+import time
+
+import_start_time = time.perf_counter()
+
 import logging
 import os
 import re
 from datetime import datetime
+from functools import partial
 
-import requests
 import semantic_version
 import sys
-from traceback import print_exc
+import threading
 from typing import Any, MutableMapping, Mapping
 
 import tkinter as tk
-from tkinter import ttk, colorchooser as tkColorChooser, Widget as tkWidget
+from tkinter import ttk, colorchooser as tkColorChooser
 
 from ttkHyperlinkLabel import HyperlinkLabel
-from sqlalchemy import select, desc, asc
-from sqlalchemy.orm import Session
+from sqlalchemy import select, union_all, func, null, or_
+from sqlalchemy.orm import Session, selectinload
 
 import myNotebook as nb
 import plug
@@ -29,29 +33,29 @@ from EDMCLogging import get_plugin_logger
 
 import ExploData
 from ExploData.explo_data import db
-from ExploData.explo_data.db import System, Commander, SystemStatus, Metadata, StarRing, Death, Resurrection, \
-    SystemSale, PlanetStatus, StarStatus, Planet, Star
-from ExploData.explo_data.RegionMap import findRegion
+from ExploData.explo_data.db import System, Commander, SystemStatus, Metadata, StarRing, PlanetStatus, StarStatus, \
+    Planet, Star
 from ExploData.explo_data.body_data.struct import PlanetData, StarData, load_planets, load_stars, get_main_star, \
     NonBodyData, load_non_bodies
 from ExploData.explo_data.journal_parse import register_event_callbacks, parse_journals, register_journal_callbacks
-import ExploData.explo_data.edsm_parse
-from ExploData.explo_data.edsm_parse import register_edsm_callbacks
 
 import pioneer.const
-from pioneer.body_calc import get_body_value, get_star_value, get_starclass_k, get_planetclass_k
+from pioneer.body_calc import get_body_values, get_cached_body_value, get_cached_star_value, get_numpy, \
+    get_star_values, get_starclass_k, get_planetclass_k
 from pioneer.data import BodyValueData
+from pioneer.display import DisplayChange
 from pioneer.globals import pioneer_globals
 from pioneer.status_flags import StatusFlags
 from pioneer.util import get_star_label, get_body_shorthand
+from pioneer.valuation import BodyInput, BodyValuation, SystemInput, SystemValuation, efficiency_bonus, value_system
 from pioneer.tooltip import Tooltip
 
 
 __version__ = pioneer.const.plugin_version
 
-efficiency_bonus = 1.25
 this = pioneer_globals
 logger = get_plugin_logger(this.NAME)
+this.startup_timings['import'] = time.perf_counter() - import_start_time
 
 
 def plugin_start3(plugin_dir: str) -> str:
@@ -63,12 +67,18 @@ def plugin_start3(plugin_dir: str) -> str:
     :return: The plugin's canonical name
     """
 
+    start_time = time.perf_counter()
     this.migration_failed = db.init()
+    this.startup_timings['db init'] = time.perf_counter() - start_time
+    this.unsold_ledger.path = config.app_dir_path / 'pioneer_unsold.json'
     if not this.migration_failed:
+        start_time = time.perf_counter()
         this.sql_session = Session(db.get_engine())
         db_version: Metadata = this.sql_session.scalar(select(Metadata).where(Metadata.key == 'version'))
         if db_version.value.isdigit() and int(db_version.value) != pioneer.const.db_version:
             this.db_mismatch = True
+        this.startup_timings['session'] = time.perf_counter() - start_time
+        this.query_counter.attach(db.get_engine())
 
         if not this.db_mismatch:
             register_event_callbacks(
@@ -84,24 +94,46 @@ def plugin_stop() -> None:
     EDMC plugin stop function. Closes open threads and database sessions for clean shutdown.
     """
 
+    this.display_scheduler.cancel()
+    this.db_worker.stop()
+    this.unsold_ledger.save()
+    if this.sql_session:
+        this.sql_session.commit()
+    this.query_counter.detach()
+
     if this.overlay.available():
         this.overlay.disconnect()
 
 
-def version_check() -> str:
-    try:
-        req = requests.get(url='https://api.github.com/repos/Silarn/EDMC-Pioneer/releases/latest')
-        data = req.json()
-        if req.status_code != requests.codes.ok:
-            raise requests.RequestException
-    except requests.RequestException | requests.JSONDecodeError:
-        print_exc()
-        return ''
+def version_check() -> None:
+    """
+    Check for a newer plugin release on a background thread. The update link is added when the result arrives.
+    """
 
-    version = semantic_version.Version(data['tag_name'][1:])
-    if version > this.VERSION:
-        return str(version)
-    return ''
+    def check() -> None:
+        from pioneer.version_check import get_latest_version  # Imports requests, so kept off the startup path
+        this.latest_version = get_latest_version(cache_path=config.app_dir_path / 'pioneer_version.json')
+        try:
+            this.frame.event_generate('<<PioneerVersionCheck>>', when='tail')
+        except (tk.TclError, RuntimeError):
+            pass
+
+    this.frame.bind('<<PioneerVersionCheck>>', version_check_end)
+    threading.Thread(target=check, name='Pioneer version check', daemon=True).start()
+
+
+def version_check_end(event: tk.Event) -> None:
+    """
+    Event handler for version check completion. Shows the update link if a newer version is available.
+
+    :param event: Required to process the event. Unused.
+    """
+
+    if this.latest_version and this.latest_version > this.VERSION:
+        text = 'Version {} is now available'.format(this.latest_version)
+        url = 'https://github.com/Silarn/EDMC-Pioneer/releases/tag/v{}'.format(this.latest_version)
+        this.update_button = HyperlinkLabel(this.frame, text=text, url=url)
+        this.update_button.grid(row=3, columnspan=2, sticky=tk.N)
 
 
 def plugin_app(parent: tk.Frame) -> tk.Frame:
@@ -113,6 +145,7 @@ def plugin_app(parent: tk.Frame) -> tk.Frame:
     :return: Plugin's main TKinter frame
     """
 
+    start_time = time.perf_counter()
     this.parent = parent
     this.frame = tk.Frame(parent)
     this.frame.grid_columnconfigure(0, weight=1)
@@ -132,7 +165,8 @@ def plugin_app(parent: tk.Frame) -> tk.Frame:
         parse_config()
         if not len(sorted(plug.PLUGINS, key=lambda item: item.name == 'BioScan')):  # type: list[plug.Plugin]
             register_journal_callbacks(this.frame, 'pioneer', journal_start, journal_update, journal_end)
-        register_edsm_callbacks(this.frame,'pioneer', edsm_start, edsm_end)
+        from ExploData.explo_data import edsm_parse  # Not needed if the database failed to load
+        edsm_parse.register_edsm_callbacks(this.frame,'pioneer', edsm_start, edsm_end)
         this.label = tk.Label(this.frame)
         this.label.grid(row=0, column=0, sticky=tk.N)
         this.view_button = tk.Button(this.frame, text='🔼', command=toggle_view)
@@ -153,18 +187,16 @@ def plugin_app(parent: tk.Frame) -> tk.Frame:
         this.values_label = ttk.Label(this.scrollable_frame, textvariable=this.values_label_text,
                                       wraplength=360, justify=tk.LEFT)
         this.values_label.pack(fill=tk.BOTH, side=tk.LEFT)
+        this.values_label.bind('<Configure>', resize_scroll_canvas)
+        this.label.bind('<Configure>', resize_scroll_canvas)
+        this.scrollbar.bind('<Configure>', resize_scroll_canvas)
         this.scroll_canvas.grid(row=1, column=0, sticky=tk.EW)
         this.scroll_canvas.grid_rowconfigure(1, weight=0)
         this.scrollbar.grid(row=1, column=1, sticky=tk.NSEW)
         this.total_label = tk.Label(this.frame, textvariable=this.total_label_text)
         this.total_label.grid(row=2, column=0, columnspan=2, sticky=tk.N)
         this.journal_label = tk.Label(this.frame, text='Journal Parsing')
-        update = version_check()
-        if update != '':
-            text = 'Version {} is now available'.format(update)
-            url = 'https://github.com/Silarn/EDMC-Pioneer/releases/tag/v{}'.format(update)
-            this.update_button = HyperlinkLabel(this.frame, text=text, url=url)
-            this.update_button.grid(row=3, columnspan=2, sticky=tk.N)
+        version_check()
         this.copy_button = tk.Label(this.frame, text='Export', fg='white', cursor='hand2')
         this.copy_button.grid(row=4, columnspan=2, sticky=tk.EW)
         this.copy_button.bind('<Button-1>', lambda e: export_text())
@@ -172,9 +204,15 @@ def plugin_app(parent: tk.Frame) -> tk.Frame:
             this.edsm_button = tk.Label(this.frame, text='Fetch EDSM Data', fg='white', cursor='hand2')
             this.edsm_button.grid(row=3, columnspan=2, sticky=tk.EW)
             this.edsm_button.bind('<Button-1>', lambda e: edsm_fetch())
+        this.display_scheduler.bind(this.frame, update_display)
+        this.db_worker.start(this.frame, db.get_engine())
         this.started = True
         update_display()
         theme.register(this.values_label)
+    this.startup_timings['widgets'] = time.perf_counter() - start_time
+    logger.debug('Startup timings: {}'.format(
+        ', '.join(f'{stage} {seconds * 1000:.1f} ms' for stage, seconds in this.startup_timings.items())
+    ))
     return this.frame
 
 
@@ -334,6 +372,31 @@ def plugin_prefs(parent: ttk.Notebook, cmdr: str, is_beta: bool) -> nb.Frame:
         width=8, validate='all', validatecommand=(vcmd, '%P')
     ).grid(row=0, column=4, sticky=tk.W)
 
+    # Performance timing
+    ttk.Separator(frame).grid(row=45, columnspan=3, pady=y_padding * 2, sticky=tk.EW)
+    nb.Checkbutton(
+        frame,
+        text='Record performance timings',
+        variable=this.record_timings
+    ).grid(row=46, column=0, padx=x_button_padding, sticky=tk.W)
+    nb.Button(frame, text='Write Timings to Log', command=log_span_timings) \
+        .grid(row=46, column=1, sticky=tk.W)
+    query_budget_label = nb.Label(frame, text='Query budget: (?)')
+    query_budget_label.grid(row=47, column=0, padx=x_padding, sticky=tk.W)
+    nb.EntryMenu(frame, textvariable=this.query_budget,
+                 validate='all', validatecommand=(vcmd, '%P')).grid(row=47, column=1, sticky=tk.W)
+    Tooltip(
+        query_budget_label,
+        text='Maximum number of database queries for a display refresh or journal event.\n\n' +
+        'Refreshes and events going over the budget are logged. Set to 0 to disable.',
+        waittime=1000
+    )
+    nb.Label(frame, text=f'{this.span_timer.format_stats()}\n'
+                         f'Display refreshes merged: {this.display_scheduler.merged}\n\n'
+                         f'{this.query_counter.format_stats()}',
+             font='TkFixedFont', justify=tk.LEFT) \
+        .grid(row=48, columnspan=3, padx=x_padding, pady=y_padding, sticky=tk.W)
+
     ttk.Separator(frame, orient=tk.HORIZONTAL).grid(row=55, columnspan=3, pady=y_padding * 2, sticky=tk.EW)
 
     nb.Button(frame, text='Start / Stop Journal Parsing', command=parse_journals) \
@@ -347,15 +410,28 @@ def prefs_changed(cmdr: str, is_beta: bool) -> None:
     this.formatter.set_shorten(this.shorten_values.get())
     config.set('pioneer_details', this.show_details.get())
     config.set('pioneer_biological', this.show_biological.get())
+    if config.get_bool(key='pioneer_star_descriptors', default=False) != this.show_descriptors.get():
+        get_star_label.cache_clear()
     config.set('pioneer_star_descriptors', this.show_descriptors.get())
     config.set('pioneer_carrier_values', this.show_carrier_values.get())
     config.set('pioneer_map_counter', this.show_map_counter.get())
+    if config.get_int(key='pioneer_max_sell_events', default=5) != this.max_sell_events.get() and this.commander:
+        this.unsold_ledger.load(this.commander.id, this.max_sell_events.get())
+        this.recalculate_unsold = True
     config.set('pioneer_max_sell_events', this.max_sell_events.get())
+    if not this.use_overlay.get() and config.get_bool(key='pioneer_overlay', default=False) \
+            and this.overlay.available():
+        this.overlay.clear('pioneer_text')
+        this.overlay.disconnect()
     config.set('pioneer_overlay', this.use_overlay.get())
     config.set('pioneer_overlay_color', this.overlay_color.get())
     config.set('pioneer_overlay_anchor_x', this.overlay_anchor_x.get())
     config.set('pioneer_overlay_anchor_y', this.overlay_anchor_y.get())
-    update_display()
+    config.set('pioneer_timings', this.record_timings.get())
+    this.span_timer.enabled = this.record_timings.get()
+    config.set('pioneer_query_budget', this.query_budget.get())
+    this.query_counter.budget = this.query_budget.get()
+    update_display(DisplayChange.SETTINGS | DisplayChange.OVERLAY | DisplayChange.LAYOUT)
 
 
 def parse_config() -> None:
@@ -372,6 +448,10 @@ def parse_config() -> None:
     this.overlay_color = tk.StringVar(value=config.get_str(key='pioneer_overlay_color', default='#ffffff'))
     this.overlay_anchor_x = tk.IntVar(value=config.get_int(key='pioneer_overlay_anchor_x', default=1000))
     this.overlay_anchor_y = tk.IntVar(value=config.get_int(key='pioneer_overlay_anchor_y', default=225))
+    this.record_timings = tk.BooleanVar(value=config.get_bool(key='pioneer_timings', default=False))
+    this.span_timer.enabled = this.record_timings.get()
+    this.query_budget = tk.IntVar(value=config.get_int(key='pioneer_query_budget', default=100))
+    this.query_counter.budget = this.query_budget.get()
 
 
 def journal_start(event: tk.Event) -> None:
@@ -411,381 +491,331 @@ def journal_end(event: tk.Event) -> None:
         this.journal_label['text'] = 'Error During Journal Parse\nPlease Submit a Report'
     else:
         this.journal_label.grid_remove()
-        this.bodies = load_planets(this.system, this.sql_session) | load_stars(this.system, this.sql_session)
-        this.non_bodies = load_non_bodies(this.system, this.sql_session)
-        for body in this.bodies.values():
-            process_body_values(body)
-        update_display()
+        if this.commander:
+            this.loss_timeline.load(this.commander.id, this.sql_session)
+            this.sale_index.load(this.commander.id, this.sql_session)
+            this.unsold_ledger.invalidate()
+            this.recalculate_unsold = True
+        reload_system_data()
+        update_display(DisplayChange.BODIES | DisplayChange.SALES)
 
 
 def edsm_fetch() -> None:
-    ExploData.explo_data.edsm_parse.edsm_fetch(this.system.name)
+    from ExploData.explo_data import edsm_parse
+    edsm_parse.edsm_fetch(this.system.name)
 
 
 def edsm_start(event: tk.Event) -> None:
     this.fetched_edsm = True
-    update_display()
+    update_display(DisplayChange.LAYOUT)
 
 
 def edsm_end(event: tk.Event) -> None:
     reload_system_data()
-    update_display()
+    update_display(DisplayChange.BODIES)
 
 
-def calc_system_value() -> tuple[int, int, int, int]:
-    global efficiency_bonus
+def get_current_system_size(*args, **kwargs) -> int:
+    """
+    Span size function for spans working on the current system.
+
+    :return: Number of known bodies in the current system
+    """
+
+    return len(this.bodies)
+
+
+def log_span_timings() -> None:
+    """
+    Write the recorded span timings to the EDMC log.
+    """
+
+    logger.info(f'Span timings (display refreshes merged: {this.display_scheduler.merged}):\n'
+                f'{this.span_timer.format_stats()}')
 
-    this.overlay_local_text = ''
+
+@this.span_timer.timed('calc_system_value', size=get_current_system_size)
+def calc_system_value() -> tuple[int, int, int, int]:
+    this.star_text = ''
+    this.body_texts = {}
     this.body_sale_status = {}
-    have_belts = this.belt_count == this.belts_found
-    bodies_sold = 0
-    bodies_lost = 0
+    this.valuation = None
+    this.lost_map_count = 0
     if not this.main_star_name and not len(this.bodies):
         this.values_label_text.set('No scans detected.\nHonk or check nav beacon data.')
         return 0, 0, 0, 0
-    honk_sum, min_honk_sum = 0, 0
-    bodies_text = ''
-    sold: list[SystemSale] = this.sql_session.scalars(select(SystemSale).where(SystemSale.commander_id == this.commander.id)
-                                                      .where(SystemSale.systems.like(f'%{this.system.name}%'))).all()
-    main_star = get_main_star(this.system, this.sql_session)
-    main_star_lost = False
-    main_star_sold = False
-    if main_star:
-        main_star_status = this.sql_session.scalar(select(StarStatus).where(StarStatus.commander_id == this.commander.id)
-                                                   .where(StarStatus.star_id == main_star.id))
-        if main_star_status and main_star_status.scanned_at:
-            death = this.sql_session.scalar(select(Death).where(Death.commander_id == this.commander.id)
-                                             .where(Death.in_ship).where(Death.died_at > main_star_status.scanned_at)
-                                             .order_by(asc(Death.died_at)))
-            resurrection = this.sql_session.scalar(select(Resurrection).where(Resurrection.commander_id == this.commander.id)
-                                                   .where(Resurrection.type.not_in(['escape', 'rejoin', 'handin', 'recover']))
-                                                   .where(Resurrection.resurrected_at > main_star_status.scanned_at)
-                                                   .order_by(asc(Resurrection.resurrected_at)))
-            lost_at = None
-            if death and resurrection:
-                lost_at = death.died_at if death.died_at < resurrection.resurrected_at else resurrection.resurrected_at
-            elif death:
-                lost_at = death.died_at
-            elif resurrection:
-                lost_at = resurrection.resurrected_at
-            for sale in sold:
-                if lost_at:
-                    if main_star_status.scanned_at < sale.sold_at < lost_at:
-                        main_star_sold = True
-                        bodies_sold += 1
-                        break
-                if main_star_status.scanned_at < sale.sold_at:
-                    main_star_sold = True
-                    bodies_sold += 1
-                    break
-            if lost_at and not main_star_sold:
-                main_star_lost = True
-                bodies_lost += 1
-    max_value_sum = this.main_star_value if not main_star_lost else 0
-    min_max_value_sum = this.main_star_value if not main_star_lost else 0
-    value_sum = this.main_star_value if not main_star_lost else 0
-    min_value_sum = this.main_star_value if not main_star_lost else 0
-    for body_name, body_data in sorted(this.bodies.items(), key=lambda item: item[1].get_id()):
-        is_range = this.body_values[body_name].get_mapped_values()[1] != \
-                   this.body_values[body_name].get_mapped_values()[0]
-        scanned_at = body_data.scanned_at(this.commander.id)
-        lost = False
-        body_sold = False
-        if scanned_at:
-            death = this.sql_session.scalar(select(Death).where(Death.commander_id == this.commander.id)
-                                             .where(Death.in_ship).where(Death.died_at > scanned_at)
-                                             .order_by(asc(Death.died_at)))
-            resurrection = this.sql_session.scalar(select(Resurrection).where(Resurrection.commander_id == this.commander.id)
-                                                   .where(Resurrection.type.not_in(['escape', 'rejoin', 'handin', 'recover']))
-                                                   .where(Resurrection.resurrected_at > scanned_at)
-                                                   .order_by(asc(Resurrection.resurrected_at)))
-            lost_at = None
-            if death and resurrection:
-                lost_at = death.died_at if death.died_at < resurrection.resurrected_at else resurrection.resurrected_at
-            elif death:
-                lost_at = death.died_at
-            elif resurrection:
-                lost_at = resurrection.resurrected_at
-            for sale in sold:
-                if lost_at:
-                    if scanned_at < sale.sold_at < lost_at:
-                        body_sold = True
-                        bodies_sold += 1
-                        break
-                if scanned_at < sale.sold_at:
-                    body_sold = True
-                    bodies_sold += 1
-                    break
-            if lost_at and not body_sold:
-                lost = True
-                bodies_lost += 1
-
-        body_text = '{} - {}{}{}{}{}{}{}{}{}:'.format(
-            body_name,
-            body_data.get_type() if type(body_data) is PlanetData else
-            get_star_label(body_data.get_type(),
-                           body_data.get_subclass(),
-                           body_data.get_luminosity(),
-                           this.show_descriptors.get()),
-            ' \N{DECIDUOUS TREE}' if type(body_data) is PlanetData and body_data.is_terraformable() else '',
-            ' \N{SUNSET OVER BUILDINGS}' if type(body_data) is PlanetData and not body_data.was_discovered(this.commander.id)
-                              and body_data.was_mapped(this.commander.id) else '',
-            ' \N{COMPASS}' if body_data.get_scan_state(this.commander.id) < 2 else '',
-            ' \N{COLLISION SYMBOL}' if lost else '',
-            ' \N{HEAVY DOLLAR SIGN}' if body_sold else '',
-            ' \N{WHITE EXCLAMATION MARK ORNAMENT}\N{FOOT}' if type(body_data) is PlanetData and body_data.was_footfalled(this.commander.id) is True else
-                ' \N{FOOT}' if type(body_data) is PlanetData and  body_data.footfall(this.commander.id) else '',
-            ' \N{WHITE EXCLAMATION MARK ORNAMENT}\N{LEFT-POINTING MAGNIFYING GLASS}' if body_data.was_discovered(this.commander.id) else '',
-            ' \N{WHITE EXCLAMATION MARK ORNAMENT}\N{WORLD MAP}\N{VARIATION SELECTOR-16}' if type(body_data) is PlanetData and body_data.was_mapped(this.commander.id) else ''
-        ) + '\n'
-        if type(body_data) is PlanetData and body_data.is_mapped(this.commander.id):
-            efficiency = efficiency_bonus if body_data.was_efficient(this.commander.id) else 1
-            mapped_at = body_data.mapped_at(this.commander.id)
-            map_lost = False
-            map_sold = False
-            death = this.sql_session.scalar(select(Death).where(Death.commander_id == this.commander.id)
-                                             .where(Death.in_ship).where(Death.died_at > mapped_at)
-                                             .order_by(asc(Death.died_at)))
-            resurrection = this.sql_session.scalar(select(Resurrection).where(Resurrection.commander_id == this.commander.id)
-                                                   .where(Resurrection.type.not_in(['escape', 'rejoin', 'handin', 'recover']))
-                                                   .where(Resurrection.resurrected_at > mapped_at)
-                                                   .order_by(asc(Resurrection.resurrected_at)))
-            map_lost_at = None
-            if death and resurrection:
-                map_lost_at = death.died_at if death.died_at < resurrection.resurrected_at else resurrection.resurrected_at
-            elif death:
-                map_lost_at = death.died_at
-            elif resurrection:
-                map_lost_at = resurrection.resurrected_at
-            for sale in sold:
-                if map_lost_at:
-                    if mapped_at < sale.sold_at < map_lost_at:
-                        map_sold = True
-                        # bodies_sold += 1
-                        break
-                if mapped_at < sale.sold_at:
-                    map_sold = True
-                    # bodies_sold += 1
-                    break
-            if map_lost_at and not map_sold:
-                map_lost = True
-                # bodies_lost += 1
-            this.body_sale_status[this.bodies[body_name].get_id()] = (sold, lost, map_sold, map_lost)
-            if map_lost:
-                min_value = this.body_values[body_name].get_base_values()[1] \
-                    if (body_data.get_scan_state(this.commander.id) > 1 and
-                        body_data.is_discovered(this.commander.id)) else 0
-                max_value = this.body_values[body_name].get_base_values()[0] \
-                    if (body_data.get_scan_state(this.commander.id) > 1 and
-                        body_data.is_discovered(this.commander.id)) else 0
-                min_mapped_value = int(this.body_values[body_name].get_mapped_values()[1] * efficiency_bonus)
-                max_mapped_value = int(this.body_values[body_name].get_mapped_values()[0] * efficiency_bonus)
-                val_text = '{} - {}'.format(
-                    this.formatter.format_credits(min_value), this.formatter.format_credits(max_value)
-                ) if is_range else '{}'.format(this.formatter.format_credits(max_value))
-                lost_val_text = '{} - {}'.format(
-                    this.formatter.format_credits(min_mapped_value-min_value),
-                    this.formatter.format_credits(max_mapped_value-max_value)
-                ) if is_range else '{}'.format(
-                    this.formatter.format_credits(max_mapped_value-max_value)
-                )
-                max_val_text = '{} - {}'.format(
-                    this.formatter.format_credits(min_mapped_value),
-                    this.formatter.format_credits(max_mapped_value)
-                ) if is_range else '{}'.format(
-                    this.formatter.format_credits(max_mapped_value)
-                )
-                body_text += 'Current Value: {}{}\n'.format(val_text, ' (Lost)' if lost else '')
-                body_text += '  Mapped{}\N{COLLISION SYMBOL}\n'.format(
-                    ' (Efficient)' if body_data.was_efficient(this.commander.id) else ''
-                )
-                body_text += '  Lost: {}\n'.format(lost_val_text)
-                if this.show_carrier_values.get() and not lost:
-                    body_text += 'Carrier Value: {}{} ({} -> carrier)\n'.format(
-                        'Up to ' if is_range else '',
-                        this.formatter.format_credits(int(max_value * .75)),
-                        this.formatter.format_credits(int(max_value * .125))
-                    )
-                body_text += 'Max Value: {}\n'.format(max_val_text)
-                if not lost:
-                    max_value_sum += max_mapped_value
-                    min_max_value_sum += min_mapped_value
-                    value_sum += max_value
-                    min_value_sum += min_value
-            else:
-                val_text = '{} - {}'.format(
-                    this.formatter.format_credits(this.body_values[body_name].get_mapped_values()[1] * efficiency),
-                    this.formatter.format_credits(this.body_values[body_name].get_mapped_values()[0] * efficiency)) \
-                    if is_range else \
-                    '{}'.format(this.formatter.format_credits(
-                        this.body_values[body_name].get_mapped_values()[0] * efficiency
-                    ))
-                body_text += 'Current Value (Max): {}{}\n'.format(val_text, ' (Lost)' if lost else '')
-                body_text += '  Mapped{}{}\n'.format(
-                    ' (Efficient)' if body_data.was_efficient(this.commander.id) else '',
-                    ' \N{HEAVY DOLLAR SIGN}' if body_sold else ''
-                )
-                if this.show_carrier_values.get() and not lost:
-                    body_text += 'Carrier Value: {}{} ({} -> carrier)\n'.format(
-                        'Up to ' if is_range else '',
-                        this.formatter.format_credits(
-                            int(this.body_values[body_name].get_mapped_values()[0] * efficiency * .75)),
-                        this.formatter.format_credits(
-                            int(this.body_values[body_name].get_mapped_values()[0] * efficiency * .125))
-                    )
-                max_value_sum += this.body_values[body_name].get_mapped_values()[0] * efficiency
-                min_max_value_sum += this.body_values[body_name].get_mapped_values()[1] * efficiency
-                value_sum += this.body_values[body_name].get_mapped_values()[0] * efficiency
-                min_value_sum += this.body_values[body_name].get_mapped_values()[1] * efficiency
-        elif type(body_data) is PlanetData:
-            this.body_sale_status[this.bodies[body_name].get_id()] = (sold, lost, False, False)
-            min_value = this.body_values[body_name].get_base_values()[1] \
-                if (body_data.get_scan_state(this.commander.id) > 1 and
-                    body_data.is_discovered(this.commander.id)) else 0
-            max_value = this.body_values[body_name].get_base_values()[0] \
-                if (body_data.get_scan_state(this.commander.id) > 1 and
-                    body_data.is_discovered(this.commander.id)) else 0
-            min_mapped_value = int(this.body_values[body_name].get_mapped_values()[1] * efficiency_bonus)
-            max_mapped_value = int(this.body_values[body_name].get_mapped_values()[0] * efficiency_bonus)
-            val_text = '{} - {}'.format(
-                this.formatter.format_credits(min_value), this.formatter.format_credits(max_value)
-            ) if is_range else '{}'.format(this.formatter.format_credits(max_value))
-            max_val_text = '{} - {}'.format(
-                this.formatter.format_credits(min_mapped_value),
-                this.formatter.format_credits(max_mapped_value)
-            ) if is_range else '{}'.format(
-                this.formatter.format_credits(max_mapped_value)
-            )
-            body_text += 'Current Value: {}{}\n'.format(val_text, ' (Lost)' if lost else '')
-            if this.show_carrier_values.get() and not lost:
-                body_text += 'Carrier Value: {}{} ({} -> carrier)\n'.format(
-                    'Up to ' if is_range else '',
-                    this.formatter.format_credits(int(max_value * .75)),
-                    this.formatter.format_credits(int(max_value * .125))
-                )
-            body_text += 'Max Value: {}\n'.format(max_val_text)
-            if not lost:
-                max_value_sum += max_mapped_value
-                min_max_value_sum += min_mapped_value
-                value_sum += max_value
-                min_value_sum += min_value
-        else:
-            this.body_sale_status[this.bodies[body_name].get_id()] = (sold, lost, False, False)
-            min_value = this.body_values[body_name].get_base_values()[1] \
-                if (body_data.get_scan_state(this.commander.id) > 1
-                    and body_data.is_discovered(this.commander.id)) else 0
-            max_value = this.body_values[body_name].get_base_values()[0] \
-                if (body_data.get_scan_state(this.commander.id) > 1
-                    and body_data.is_discovered(this.commander.id)) else 0
-            val_text = '{} - {}'.format(
-                this.formatter.format_credits(min_value),
-                this.formatter.format_credits(max_value)
-            ) if is_range else '{}'.format(
-                this.formatter.format_credits(max_value)
-            )
-            body_text += 'Current Value (Max): {}{}\n'.format(val_text, ' (Lost)' if lost else '')
-            if this.show_carrier_values.get() and not lost:
-                body_text += 'Carrier Value: {}{} ({} -> carrier)\n'.format(
-                    'Up to ' if is_range else '',
-                    this.formatter.format_credits(int(max_value * .75)),
-                    this.formatter.format_credits(int(max_value * .125))
-                )
-            if not lost:
-                max_value_sum += max_value
-                min_max_value_sum += min_value
-                value_sum += max_value
-                min_value_sum += min_value
-        min_honk_value = this.body_values[body_name].get_honk_values()[1] \
-            if (body_data.get_scan_state(this.commander.id) > 1
-                and body_data.is_discovered(this.commander.id)) else 0
-        max_honk_value = this.body_values[body_name].get_honk_values()[0] \
-            if (body_data.get_scan_state(this.commander.id) > 1
-                and body_data.is_discovered(this.commander.id)) else 0
-        if get_system_status().honked:
-            if max_honk_value != min_honk_value:
-                body_text += 'Honk Value: {} - {}'.format(
-                    this.formatter.format_credits(min_honk_value),
-                    this.formatter.format_credits(max_honk_value)) + '\n'
-            else:
-                body_text += 'Honk Value: {}'.format(
-                    this.formatter.format_credits(max_honk_value)
-                ) + '\n'
-            if not lost:
-                value_sum += max_honk_value if this.main_star_value else 0
-                min_value_sum += min_honk_value if this.main_star_value else 0
-                honk_sum += max_honk_value
-                min_honk_sum += min_honk_value
-        if not lost:
-            max_value_sum += max_honk_value if this.main_star_value else 0
-            min_max_value_sum += min_honk_value if this.main_star_value else 0
-        if body_data.get_name() == this.current_body_name:
-            this.overlay_local_text += '\n' + body_text
-        bodies_text += body_text
-        bodies_text += '------------------' + '\n'
+    bodies = sorted(this.bodies.items(), key=lambda item: item[1].get_id())
+    valuation = value_system(
+        get_system_input(),
+        [get_body_input(body_name, body_data, this.body_values[body_name]) for body_name, body_data in bodies],
+        partial(this.sale_index.first_sale_after, this.system.name),
+        this.loss_timeline.first_loss_after
+    )
+    this.valuation = valuation
+    this.body_sale_status = valuation.get_sale_status()
+    this.lost_map_count = sum(result.map_lost for result in valuation.bodies)
+    status = get_system_status()
+
+    body_fragments = []
+    for (body_name, body_data), result in zip(bodies, valuation.bodies):
+        signature = get_body_signature(body_data, result, status.honked)
+        body_text = this.body_fragments.get(result.body_id, signature)
+        if body_text is None:
+            body_text = get_body_text(body_data, result, status.honked)
+            this.body_fragments.set(result.body_id, signature, body_text)
+        this.body_texts[body_data.get_name()] = body_text
+        body_fragments.append(body_text)
+        body_fragments.append('------------------' + '\n')
+    bodies_text = ''.join(body_fragments)
     if this.main_star_name:
-        star_text = '{}{}{}:\n   {}\n   {} + {} = {}\n'.format(
-            this.main_star_name,
-            '\N{COLLISION SYMBOL}' if main_star_lost else '',
-            '\N{HEAVY DOLLAR SIGN}' if main_star_sold else '',
-            this.main_star_type,
-            this.formatter.format_credits(this.main_star_value),
-            this.formatter.format_credits(honk_sum) if honk_sum == min_honk_sum else '{} to {}{}'.format(
-                this.formatter.format_credits(min_honk_sum),
-                this.formatter.format_credits(honk_sum),
-                ' (Lost)' if main_star_lost else ''
-            ),
-            (this.formatter.format_credits(
-                this.main_star_value + honk_sum)) if honk_sum == min_honk_sum else '{} to {}'.format(
-                this.formatter.format_credits(this.main_star_value + min_honk_sum),
-                this.formatter.format_credits(this.main_star_value + honk_sum)
-            ))
-        if this.show_carrier_values.get() and not main_star_lost:
-            is_range = honk_sum != min_honk_sum
-            star_text += '   Carrier: {}{} ({} -> carrier)\n'.format(
-                'Up to ' if is_range else '',
-                this.formatter.format_credits(int((this.main_star_value + honk_sum) * .75)),
-                this.formatter.format_credits(int((this.main_star_value + honk_sum) * .125))
-            )
-        values_label_text = star_text
-        this.overlay_local_text = star_text + this.overlay_local_text
+        this.star_text = get_star_text(valuation)
+        values_label_text = this.star_text
     else:
         values_label_text = 'No main star info\nCheck for nav beacon data\n'
     values_label_text += '------------------' + '\n'
     values_label_text += bodies_text
+    if valuation.scan_bonus_earned:
+        values_label_text += 'Fully Scanned Bonus: {}'.format(
+            this.formatter.format_credits(valuation.scan_bonus)
+        ) + '\n'
+    if valuation.map_bonus_earned:
+        values_label_text += 'Fully Mapped Bonus: {}'.format(
+            this.formatter.format_credits(valuation.map_bonus)) + '\n'
+    if values_label_text != this.values_label_text.get():
+        this.values_label_text.set(values_label_text)
+    return valuation.get_totals()
+
+
+def get_system_input() -> SystemInput:
+    """
+    Snapshot the current system's state for valuation.
+
+    :return: System valuation input
+    """
+
     status = get_system_status()
-    if not this.system_was_scanned and not this.is_nav_beacon and not this.system_has_undiscovered and not bodies_lost:
-        total_bodies = this.non_body_count + this.system.body_count
-        if status.fully_scanned and have_belts:
-            values_label_text += 'Fully Scanned Bonus: {}'.format(
-                this.formatter.format_credits(total_bodies * 1000)
+    get_cached_main_star()
+    return SystemInput(
+        main_star_value=this.main_star_value,
+        main_star_scanned_at=this.main_star_scanned_at,
+        honked=status.honked,
+        fully_scanned=status.fully_scanned,
+        have_belts=this.belt_count == this.belts_found,
+        was_scanned=this.system_was_scanned,
+        was_mapped=this.system_was_mapped,
+        is_nav_beacon=this.is_nav_beacon,
+        has_undiscovered=this.system_has_undiscovered,
+        total_bodies=this.non_body_count + this.system.body_count
+    )
+
+
+def get_cached_main_star() -> Star | None:
+    """
+    Get the current system's main star. The star and the commander's scan time of it are looked up once per system,
+    and only looked up again after invalidate_main_star.
+
+    :return: The main star, if known
+    """
+
+    if not this.main_star_loaded:
+        this.main_star = get_main_star(this.system, this.sql_session) if this.system else None
+        this.main_star_scanned_at = None
+        if this.main_star and this.commander:
+            main_star_status = this.sql_session.scalar(
+                select(StarStatus).where(StarStatus.commander_id == this.commander.id)
+                .where(StarStatus.star_id == this.main_star.id)
+            )
+            if main_star_status:
+                this.main_star_scanned_at = main_star_status.scanned_at
+        this.main_star_loaded = True
+    return this.main_star
+
+
+def invalidate_main_star() -> None:
+    """
+    Clear the cached main star, typically on system change or when a star at distance 0 is scanned.
+    """
+
+    this.main_star = None
+    this.main_star_scanned_at = None
+    this.main_star_loaded = False
+
+
+def get_body_input(body_name: str, body_data: PlanetData | StarData, body_values: BodyValueData) -> BodyInput:
+    """
+    Snapshot a body's state for valuation.
+
+    :param body_name: Body name, without the system prefix
+    :param body_data: Body data
+    :param body_values: Calculated body values
+    :return: Body valuation input
+    """
+
+    is_planet = type(body_data) is PlanetData
+    mapped = is_planet and body_data.is_mapped(this.commander.id)
+    return BodyInput(
+        name=body_name,
+        body_id=body_data.get_id(),
+        is_planet=is_planet,
+        scan_state=body_data.get_scan_state(this.commander.id),
+        discovered=body_data.is_discovered(this.commander.id),
+        mapped=mapped,
+        efficient=is_planet and body_data.was_efficient(this.commander.id),
+        scanned_at=body_data.scanned_at(this.commander.id),
+        mapped_at=body_data.mapped_at(this.commander.id) if mapped else None,
+        values=body_values
+    )
+
+
+def format_credit_range(values: tuple[float, float], is_range: bool) -> str:
+    """
+    :param values: Tuple of max and min values
+    :param is_range: Whether to display both values
+    :return: Formatted value or 'min - max' range
+    """
+
+    if is_range:
+        return '{} - {}'.format(this.formatter.format_credits(values[1]), this.formatter.format_credits(values[0]))
+    return '{}'.format(this.formatter.format_credits(values[0]))
+
+
+def get_body_signature(body_data: PlanetData | StarData, result: BodyValuation, honked: bool) -> tuple:
+    """
+    Build a signature of everything the rendered text of a body depends on, for the body text cache.
+
+    :param body_data: Body data
+    :param result: Valuation of the body
+    :param honked: Whether the system has been honked
+    :return: Hashable body state signature
+    """
+
+    if result.is_planet:
+        body_state = (body_data.get_type(), body_data.is_terraformable(), body_data.was_mapped(this.commander.id),
+                      body_data.was_footfalled(this.commander.id), body_data.footfall(this.commander.id))
+    else:
+        body_state = (body_data.get_type(), body_data.get_subclass(), body_data.get_luminosity(),
+                      this.show_descriptors.get())
+    return (result, honked, this.show_carrier_values.get(), this.formatter.shorten,
+            body_data.get_scan_state(this.commander.id), body_data.was_discovered(this.commander.id), body_state)
+
+
+def get_body_text(body_data: PlanetData | StarData, result: BodyValuation, honked: bool) -> str:
+    """
+    Render the details text of a single body.
+
+    :param body_data: Body data
+    :param result: Valuation of the body
+    :param honked: Whether the system has been honked
+    :return: Body details text
+    """
+
+    is_planet = result.is_planet
+    body_text = '{} - {}{}{}{}{}{}{}{}{}:'.format(
+        result.name,
+        body_data.get_type() if is_planet else
+        get_star_label(body_data.get_type(),
+                       body_data.get_subclass(),
+                       body_data.get_luminosity(),
+                       this.show_descriptors.get()),
+        ' \N{DECIDUOUS TREE}' if is_planet and body_data.is_terraformable() else '',
+        ' \N{SUNSET OVER BUILDINGS}' if is_planet and not body_data.was_discovered(this.commander.id)
+                                        and body_data.was_mapped(this.commander.id) else '',
+        ' \N{COMPASS}' if body_data.get_scan_state(this.commander.id) < 2 else '',
+        ' \N{COLLISION SYMBOL}' if result.lost else '',
+        ' \N{HEAVY DOLLAR SIGN}' if result.sold else '',
+        ' \N{WHITE EXCLAMATION MARK ORNAMENT}\N{FOOT}' if is_planet and body_data.was_footfalled(this.commander.id) is True else
+            ' \N{FOOT}' if is_planet and body_data.footfall(this.commander.id) else '',
+        ' \N{WHITE EXCLAMATION MARK ORNAMENT}\N{LEFT-POINTING MAGNIFYING GLASS}' if body_data.was_discovered(this.commander.id) else '',
+        ' \N{WHITE EXCLAMATION MARK ORNAMENT}\N{WORLD MAP}\N{VARIATION SELECTOR-16}' if is_planet and body_data.was_mapped(this.commander.id) else ''
+    ) + '\n'
+
+    at_max = not is_planet or (result.mapped and not result.map_lost)
+    body_text += 'Current Value{}: {}{}\n'.format(
+        ' (Max)' if at_max else '',
+        format_credit_range(result.value, result.is_range),
+        ' (Lost)' if result.lost else ''
+    )
+    if result.map_lost:
+        body_text += '  Mapped{}\N{COLLISION SYMBOL}\n'.format(' (Efficient)' if result.efficient else '')
+        body_text += '  Lost: {}\n'.format(format_credit_range(result.get_lost_value(), result.is_range))
+    elif result.mapped:
+        body_text += '  Mapped{}{}\n'.format(
+            ' (Efficient)' if result.efficient else '',
+            ' \N{HEAVY DOLLAR SIGN}' if result.sold else ''
+        )
+    if this.show_carrier_values.get() and not result.lost:
+        body_text += 'Carrier Value: {}{} ({} -> carrier)\n'.format(
+            'Up to ' if result.is_range else '',
+            this.formatter.format_credits(int(result.value[0] * .75)),
+            this.formatter.format_credits(int(result.value[0] * .125))
+        )
+    if not at_max:
+        body_text += 'Max Value: {}\n'.format(format_credit_range(result.max_value, result.is_range))
+
+    if honked:
+        max_honk_value, min_honk_value = result.honk_value
+        if max_honk_value != min_honk_value:
+            body_text += 'Honk Value: {} - {}'.format(
+                this.formatter.format_credits(min_honk_value),
+                this.formatter.format_credits(max_honk_value)) + '\n'
+        else:
+            body_text += 'Honk Value: {}'.format(
+                this.formatter.format_credits(max_honk_value)
             ) + '\n'
-            value_sum += total_bodies * 1000
-            min_value_sum += total_bodies * 1000
-        max_value_sum += total_bodies * 1000
-        min_max_value_sum += total_bodies * 1000
-    if not this.system_was_mapped and this.planet_count > 0 and not bodies_lost:
-        if status.fully_scanned and this.planet_count == this.map_count:
-            values_label_text += 'Fully Mapped Bonus: {}'.format(
-                this.formatter.format_credits(this.planet_count * 10000)) + '\n'
-            value_sum += this.planet_count * 10000
-            min_value_sum += this.planet_count * 10000
-        max_value_sum += this.planet_count * 10000
-        min_max_value_sum += this.planet_count * 10000
-    this.scroll_canvas.configure(width=100)
-    tkWidget.nametowidget(this.frame, name=this.frame.winfo_parent()).update()
-    label_width = this.values_label.winfo_width()
-    full_width = this.label.winfo_width() - this.scrollbar.winfo_width()
-    final_width = label_width if label_width > full_width else full_width
-    this.scroll_canvas.configure(width=final_width)
-    this.values_label_text.set(values_label_text)
-    return value_sum, min_value_sum, max_value_sum, min_max_value_sum
+    return body_text
+
+
+def get_star_text(valuation: SystemValuation) -> str:
+    """
+    Render the main star details text, including the honk value of the system.
+
+    :param valuation: Valuation of the system
+    :return: Main star details text
+    """
+
+    honk_sum, min_honk_sum = valuation.honk_sum, valuation.min_honk_sum
+    star_text = '{}{}{}:\n   {}\n   {} + {} = {}\n'.format(
+        this.main_star_name,
+        '\N{COLLISION SYMBOL}' if valuation.main_star_lost else '',
+        '\N{HEAVY DOLLAR SIGN}' if valuation.main_star_sold else '',
+        this.main_star_type,
+        this.formatter.format_credits(this.main_star_value),
+        this.formatter.format_credits(honk_sum) if honk_sum == min_honk_sum else '{} to {}{}'.format(
+            this.formatter.format_credits(min_honk_sum),
+            this.formatter.format_credits(honk_sum),
+            ' (Lost)' if valuation.main_star_lost else ''
+        ),
+        (this.formatter.format_credits(
+            this.main_star_value + honk_sum)) if honk_sum == min_honk_sum else '{} to {}'.format(
+            this.formatter.format_credits(this.main_star_value + min_honk_sum),
+            this.formatter.format_credits(this.main_star_value + honk_sum)
+        ))
+    if this.show_carrier_values.get() and not valuation.main_star_lost:
+        is_range = honk_sum != min_honk_sum
+        star_text += '   Carrier: {}{} ({} -> carrier)\n'.format(
+            'Up to ' if is_range else '',
+            this.formatter.format_credits(int((this.main_star_value + honk_sum) * .75)),
+            this.formatter.format_credits(int((this.main_star_value + honk_sum) * .125))
+        )
+    return star_text
+
 
+@this.span_timer.timed('get_system_value', size=lambda system, *args, **kwargs: system.body_count)
+def get_system_value(system: System, session: Session, commander_id: int,
+                     system_status: SystemStatus | None = None) -> tuple[int, int]:
+    """
+    Value a system from the database, without sale or loss checks. Safe to run on the database worker thread.
 
-def get_system_value(system: System) -> tuple[int, int]:
-    global efficiency_bonus
+    :param system: System to value
+    :param session: Session the system was loaded with
+    :param commander_id: Commander DB ID
+    :param system_status: The commander's status for the system, if already loaded
+    :return: Tuple of max and min system values
+    """
 
-    system_status = this.sql_session.scalar(select(SystemStatus).where(SystemStatus.system_id == system.id)
-                                            .where(SystemStatus.commander_id == this.commander.id))
+    if not system_status:
+        system_status = session.scalar(select(SystemStatus).where(SystemStatus.system_id == system.id)
+                                       .where(SystemStatus.commander_id == commander_id))
 
     if not system_status:
         return 0, 0
@@ -804,52 +834,50 @@ def get_system_value(system: System) -> tuple[int, int]:
     system_was_scanned = False
     system_was_mapped = False
     map_count = 0
-    body_data: PlanetData | StarData
-    for body in bodies:
-        if isinstance(body, Planet):
-            body_data = PlanetData.from_journal(system, body.name, body.body_id, this.sql_session)
-        else:
-            body_data = StarData.from_journal(system, body.name, body.body_id, this.sql_session)
-
-        if body_data.was_discovered(this.commander.id):
+    body_list: list[PlanetData | StarData] = [
+        PlanetData.from_journal(system, body.name, body.body_id, session) if isinstance(body, Planet)
+        else StarData.from_journal(system, body.name, body.body_id, session)
+        for body in bodies
+    ]
+    for body_data, body_values in zip(body_list, calculate_body_values(body_list, commander_id)):
+        if body_data.was_discovered(commander_id):
             system_was_scanned = True
 
-        body_values = calculate_body_values(body_data)
-        if type(body_data) is PlanetData and body_data.is_mapped(this.commander.id):
-            if body_data.was_mapped(this.commander.id):
+        if type(body_data) is PlanetData and body_data.is_mapped(commander_id):
+            if body_data.was_mapped(commander_id):
                 system_was_mapped = True
             map_count += 1
-            efficiency = efficiency_bonus if body_data.was_efficient(this.commander.id) else 1
+            efficiency = efficiency_bonus if body_data.was_efficient(commander_id) else 1
             value_sum += body_values.get_mapped_values()[0] * efficiency
             min_value_sum += body_values.get_mapped_values()[1] * efficiency
         elif type(body_data) is PlanetData:
-            if body_data.was_mapped(this.commander.id):
+            if body_data.was_mapped(commander_id):
                 system_was_mapped = True
             min_value = body_values.get_base_values()[1] \
-                if (body_data.get_scan_state(this.commander.id) > 1 and
-                    body_data.is_discovered(this.commander.id)) else 0
+                if (body_data.get_scan_state(commander_id) > 1 and
+                    body_data.is_discovered(commander_id)) else 0
             max_value = body_values.get_base_values()[0] \
-                if (body_data.get_scan_state(this.commander.id) > 1 and
-                    body_data.is_discovered(this.commander.id)) else 0
+                if (body_data.get_scan_state(commander_id) > 1 and
+                    body_data.is_discovered(commander_id)) else 0
             value_sum += max_value
             min_value_sum += min_value
         else:
-            if body_data.get_distance() == 0 and body_data.get_scan_state(this.commander.id) > 1:
+            if body_data.get_distance() == 0 and body_data.get_scan_state(commander_id) > 1:
                 main_star_scanned = True
             min_value = body_values.get_base_values()[1] \
-                if (body_data.get_scan_state(this.commander.id) > 1
-                    and body_data.is_discovered(this.commander.id)) else 0
+                if (body_data.get_scan_state(commander_id) > 1
+                    and body_data.is_discovered(commander_id)) else 0
             max_value = body_values.get_base_values()[0] \
-                if (body_data.get_scan_state(this.commander.id) > 1
-                    and body_data.is_discovered(this.commander.id)) else 0
+                if (body_data.get_scan_state(commander_id) > 1
+                    and body_data.is_discovered(commander_id)) else 0
             value_sum += max_value
             min_value_sum += min_value
         min_honk_value = body_values.get_honk_values()[1] \
-            if (body_data.get_scan_state(this.commander.id) > 1
-                and body_data.is_discovered(this.commander.id)) else 0
+            if (body_data.get_scan_state(commander_id) > 1
+                and body_data.is_discovered(commander_id)) else 0
         max_honk_value = body_values.get_honk_values()[0] \
-            if (body_data.get_scan_state(this.commander.id) > 1
-                and body_data.is_discovered(this.commander.id)) else 0
+            if (body_data.get_scan_state(commander_id) > 1
+                and body_data.is_discovered(commander_id)) else 0
         if system_status.honked:
             value_sum += max_honk_value if main_star_scanned else 0
             min_value_sum += min_honk_value if main_star_scanned else 0
@@ -894,8 +922,19 @@ def reset() -> None:
     this.map_count = 0
     this.scans = set()
     this.body_sale_status = {}
-
-
+    this.valuation = None
+    this.body_fragments.clear()
+    invalidate_main_star()
+    this.belts = {}
+    this.belt_count = 0
+    this.belts_found = 0
+    this.body_counter.clear()
+    this.lost_map_count = 0
+    this.system_has_undiscovered = False
+    this.is_nav_beacon = False
+
+
+@this.query_counter.counted('journal_entry', detail=lambda cmdr, is_beta, system, station, entry, state: entry['event'])
 def journal_entry(cmdr: str, is_beta: bool, system: str, station: str,
                   entry: MutableMapping[str, Any], state: Mapping[str, Any]) -> str:
     if entry['event'] == 'Harness-Version':
@@ -906,6 +945,7 @@ def journal_entry(cmdr: str, is_beta: bool, system: str, station: str,
     if this.migration_failed:
         return ''
 
+    changes = DisplayChange.NONE
     game_version = semantic_version.Version.coerce(state.get('GameVersion', '0.0.0'))
     odyssey = state.get('Odyssey', False)
     if game_version != this.game_version or odyssey != this.odyssey:
@@ -913,6 +953,7 @@ def journal_entry(cmdr: str, is_beta: bool, system: str, station: str,
         this.odyssey = odyssey
         for body in this.bodies.values():
             process_body_values(body)
+        changes |= DisplayChange.BODIES
 
     system_changed = False
     if not state['StarPos']:
@@ -924,14 +965,19 @@ def journal_entry(cmdr: str, is_beta: bool, system: str, station: str,
             commander = Commander(name=cmdr)
             this.sql_session.add(this.commander)
             this.sql_session.commit()
+        this.unsold_ledger.save()
         this.commander = commander
+        this.loss_timeline.load(this.commander.id, this.sql_session)
+        this.sale_index.load(this.commander.id, this.sql_session)
+        this.unsold_ledger.load(this.commander.id, this.max_sell_events.get())
         this.recalculate_unsold = True
-        this.unsold_systems = {}
         reset()
+        changes |= DisplayChange.ALL
 
     if system and (not this.system or system != this.system.name):
         reset()
         system_changed = True
+        changes |= DisplayChange.ALL
         this.system = this.sql_session.scalar(select(System).where(System.name == system))
         if not this.system:
             this.system = System(name=system)
@@ -939,6 +985,7 @@ def journal_entry(cmdr: str, is_beta: bool, system: str, station: str,
             this.system.x = state['StarPos'][0]
             this.system.y = state['StarPos'][1]
             this.system.z = state['StarPos'][2]
+            from ExploData.explo_data.RegionMap import findRegion  # Large lookup table, only needed for new systems
             sector = findRegion(this.system.x, this.system.y, this.system.z)
             this.system.region = sector[0] if sector is not None else None
         reload_system_data()
@@ -950,7 +997,7 @@ def journal_entry(cmdr: str, is_beta: bool, system: str, station: str,
         case 'StartJump':
             if entry['JumpType'] == 'Hyperspace':
                 reset()
-                update_display()
+                changes |= DisplayChange.BODIES
         case 'Disembark':
             if entry.get('OnPlanet', False):
                 body_short_name = get_body_name(entry['BodyName'])
@@ -959,7 +1006,8 @@ def journal_entry(cmdr: str, is_beta: bool, system: str, station: str,
                 else:
                     this.bodies[body_short_name] = PlanetData.from_journal(this.system, body_short_name,
                                                                            entry['BodyID'], this.sql_session)
-                update_display()
+                count_body(body_short_name, this.bodies[body_short_name])
+                changes |= DisplayChange.BODIES
 
     this.sql_session.commit()
 
@@ -969,9 +1017,9 @@ def journal_entry(cmdr: str, is_beta: bool, system: str, station: str,
         except tk.TclError as ex:
             logger.debug('Couldn\'t reset the scroll pane.', exc_info=ex)
 
-    if this.system:
+    if this.system and changes:
         calc_counts()
-        update_display()
+        this.display_scheduler.schedule(changes)
 
     return ''  # No error
 
@@ -979,19 +1027,24 @@ def journal_entry(cmdr: str, is_beta: bool, system: str, station: str,
 def reload_system_data() -> None:
     this.bodies = load_planets(this.system, this.sql_session) | load_stars(this.system, this.sql_session)
     this.non_bodies = load_non_bodies(this.system, this.sql_session)
+    this.body_counter.clear()
+    this.system_has_undiscovered = False
+    this.is_nav_beacon = False
     for body in this.bodies.values():
         process_body_values(body)
-    main_star = get_main_star(this.system, this.sql_session)
+    invalidate_main_star()
+    main_star = get_cached_main_star()
     if main_star:
         this.main_star_name = 'Main star' if this.system == main_star.name \
             else '{} (Main star)'.format(main_star.name)
         this.main_star_type = get_star_label(main_star.type, main_star.subclass,
                                              main_star.luminosity, this.show_descriptors.get())
         this.bodies.pop(main_star.name, None)
-        process_belts()
-    process_discovery()
+    process_belts(main_star)
 
 
+@this.span_timer.timed('process_data_event', size=get_current_system_size)
+@this.query_counter.counted('process_data_event', detail=lambda entry: entry['event'])
 def process_data_event(entry: Mapping[str, Any]) -> None:
     this.sql_session.commit()
     match entry['event']:
@@ -1006,68 +1059,75 @@ def process_data_event(entry: Mapping[str, Any]) -> None:
                 non_body = NonBodyData.from_journal(this.system, body_short_name, entry['BodyID'], this.sql_session)
                 if body_short_name.find('Belt Cluster') != -1:
                     this.non_bodies[body_short_name] = non_body
+                    index_belt_cluster(non_body.get_name())
             process_body_values(body)
-            process_belts()
-            process_discovery()
+            if type(body) is StarData:
+                if body.get_distance() == 0.0:
+                    invalidate_main_star()
+                    index_star_belts('' if body.get_name() == this.system.name else body.get_name() + ' ',
+                                     body.get_rings())
+                else:
+                    index_star_belts(f'{body.get_name()} ', body.get_rings())
             if body and body.get_scan_state(this.commander.id) > 1:
-                this.unsold_systems[this.system.id] = True
-            update_display()
+                this.unsold_ledger.mark_changed(this.system.id, this.system.name, body.scanned_at(this.commander.id))
+            this.display_scheduler.schedule(DisplayChange.BODIES)
 
         case 'FSSDiscoveryScan':
             if entry['Progress'] == 1.0 and not get_system_status().fully_scanned:
                 get_system_status().fully_scanned = True
                 this.sql_session.commit()
-            update_display()
+            this.display_scheduler.schedule(DisplayChange.BODIES)
 
         case 'FSSAllBodiesFound':
-            process_belts()
-            update_display()
+            this.display_scheduler.schedule(DisplayChange.BODIES)
 
         case 'SAAScanComplete':
             body_short_name = get_body_name(entry['BodyName'])
             if body_short_name.endswith('Ring') or body_short_name.find('Belt Cluster') != -1:
-                process_belts()
                 return
             if body_short_name in this.bodies:
                 this.bodies[body_short_name].refresh()
             else:
                 this.bodies[body_short_name] = PlanetData.from_journal(this.system, body_short_name,
                                                                        entry['BodyID'], this.sql_session)
-            update_display()
+            count_body(body_short_name, this.bodies[body_short_name])
+            this.unsold_ledger.mark_changed(this.system.id, this.system.name,
+                                            this.bodies[body_short_name].scanned_at(this.commander.id))
+            this.display_scheduler.schedule(DisplayChange.BODIES)
 
         case 'SellExplorationData':
-            systems: list[str] = entry['Systems']
-            for system_name in systems:
-                system = this.sql_session.scalar(select(System).where(System.name == system_name))
-                this.unsold_systems[system.id] = (0, 0)
-            update_display()
+            this.sale_index.update(this.sql_session)
+            this.unsold_ledger.remove_names(entry['Systems'])
+            this.unsold_ledger.prune(get_data_cutoff())
+            this.display_scheduler.schedule(DisplayChange.SALES)
 
         case 'MultiSellExplorationData':
-            for system_data in entry['Discovered']:
-                system = this.sql_session.scalar(select(System).where(System.name == system_data['SystemName']))
-                this.unsold_systems[system.id] = (0, 0)
-            update_display()
+            this.sale_index.update(this.sql_session)
+            this.unsold_ledger.remove_names([system_data['SystemName'] for system_data in entry['Discovered']])
+            this.unsold_ledger.prune(get_data_cutoff())
+            this.display_scheduler.schedule(DisplayChange.SALES)
 
         case 'Died' | 'Resurrect':
-            this.recalculate_unsold = True
-            update_display()
+            this.loss_timeline.update(this.sql_session)
+            this.unsold_ledger.prune(get_data_cutoff())
+            this.display_scheduler.schedule(DisplayChange.SALES)
 
     calc_counts()
 
 
 def dashboard_entry(cmdr: str, is_beta: bool, entry: dict[str, Any]) -> str:
     status = StatusFlags(entry['Flags'])
-    update = False
+    changes = DisplayChange.NONE
 
     body_name = get_body_name(entry.get('BodyName', ''))
     body_name = body_name if body_name else get_body_name(entry.get('Destination', {'Name': ''})['Name'])
     if body_name != this.current_body_name:
         this.current_body_name = body_name
-        update = True
+        changes |= DisplayChange.CURRENT_BODY
 
     if this.analysis_mode != (StatusFlags.IS_ANALYSIS_MODE in status):
         this.analysis_mode = (StatusFlags.IS_ANALYSIS_MODE in status)
-        update = True
+        changes |= DisplayChange.OVERLAY
 
     fsd_jump = StatusFlags.FSD_JUMP_IN_PROGRESS in status
     if fsd_jump != this.fsd_jump:
@@ -1075,7 +1135,7 @@ def dashboard_entry(cmdr: str, is_beta: bool, entry: dict[str, Any]) -> str:
             this.fsd_jump = True
         else:
             this.fsd_jump = False
-        update = True
+        changes |= DisplayChange.OVERLAY
 
     in_flight = False
     if StatusFlags.IN_SHIP in status or StatusFlags.IN_FIGHTER in status:
@@ -1086,35 +1146,76 @@ def dashboard_entry(cmdr: str, is_beta: bool, entry: dict[str, Any]) -> str:
 
     if in_flight != this.in_flight:
         this.in_flight = in_flight
-        update = True
+        changes |= DisplayChange.OVERLAY
 
     gui_focus = int(entry.get('GuiFocus', 0))
     if gui_focus != this.gui_focus and ((gui_focus in [0, 2, 9, 10]) != (this.gui_focus in [0, 2, 9, 10])):
-        update = True
+        changes |= DisplayChange.OVERLAY
     this.gui_focus = gui_focus
 
-    if update:
-        update_display()
+    if changes:
+        update_display(changes)
 
     return ''
 
 
 def calc_counts() -> None:
-    this.planet_count = 0
-    this.map_count = 0
     this.non_body_count = len(this.non_bodies)
-    for body in this.bodies.values():
-        if type(body) is PlanetData:
-            this.planet_count += 1
-            if body.is_mapped(this.commander.id) and (body.get_id() in this.body_sale_status
-                                                      and not this.body_sale_status[body.get_id()][3]):
-                this.map_count += 1
+    this.planet_count = this.body_counter.planets
+    this.map_count = this.body_counter.mapped - this.lost_map_count
+    if logger.isEnabledFor(logging.DEBUG):
+        check_counts()
 
     if len(this.bodies) > this.system.body_count and not get_system_status().honked:
         this.system.body_count = len(this.bodies)
         this.sql_session.commit()
 
 
+def count_body(body_name: str, body: PlanetData | StarData) -> None:
+    """
+    Update the body counts and discovery flags after a body is added or changes state.
+
+    :param body_name: Body name, without the system prefix
+    :param body: Body data
+    """
+
+    scan_state = body.get_scan_state(this.commander.id)
+    is_planet = type(body) is PlanetData
+    this.body_counter.update(body_name, (
+        not body.is_discovered(this.commander.id) or scan_state < 2,
+        scan_state == 1,
+        is_planet,
+        is_planet and body.is_mapped(this.commander.id)
+    ))
+    this.system_has_undiscovered = this.body_counter.undiscovered > 0
+    this.is_nav_beacon = this.body_counter.nav_beacon > 0
+
+
+def check_counts() -> None:
+    """
+    Debug check of the incrementally maintained counts against a full recount of the system's bodies.
+    """
+
+    undiscovered = False
+    nav = False
+    planet_count = 0
+    map_count = 0
+    for body in this.bodies.values():
+        if not body.is_discovered(this.commander.id) or body.get_scan_state(this.commander.id) < 2:
+            undiscovered = True
+        if body.get_scan_state(this.commander.id) == 1:
+            nav = True
+        if type(body) is PlanetData:
+            planet_count += 1
+            if body.is_mapped(this.commander.id) and not (body.get_id() in this.body_sale_status
+                                                          and this.body_sale_status[body.get_id()][3]):
+                map_count += 1
+    counted = (this.system_has_undiscovered, this.is_nav_beacon, this.planet_count, this.map_count)
+    expected = (undiscovered, nav, planet_count, map_count)
+    if counted != expected:
+        logger.warning(f'Body counts out of sync: counted {counted}, expected {expected}')
+
+
 def process_body_values(body: PlanetData | StarData | None) -> None:
     if not body:
         return
@@ -1126,9 +1227,8 @@ def process_body_values(body: PlanetData | StarData | None) -> None:
             value = 261790
             honk_value = 0
         else:
-            k = get_starclass_k(body.get_type())
-            value, honk_value = get_star_value(
-                k, body.get_mass(),
+            value, honk_value = get_cached_star_value(
+                body.get_type(), body.get_mass(),
                 not body.was_discovered(this.commander.id) if not unscanned else False
             )
         if body.get_distance() == 0.0:
@@ -1156,11 +1256,10 @@ def process_body_values(body: PlanetData | StarData | None) -> None:
             this.system_was_mapped = True if (body.was_mapped(this.commander.id) or
                                               unscanned) else this.system_was_mapped
 
-            k, kt, tm = get_planetclass_k(body.get_type(), body.is_terraformable())
             value, mapped_value, honk_value, \
                 min_value, min_mapped_value, min_honk_value = \
-                get_body_value(
-                    k, kt, tm, body.get_mass(),
+                get_cached_body_value(
+                    body.get_type(), body.is_terraformable(), body.get_mass(),
                     not body.was_discovered(this.commander.id) if not unscanned else False,
                     not body.was_mapped(this.commander.id) if not unscanned else False,
                     odyssey_bonus)
@@ -1176,132 +1275,268 @@ def process_body_values(body: PlanetData | StarData | None) -> None:
 
     if body.get_distance() > 0.0:
         this.bodies[body.get_name()] = body
+        count_body(body.get_name(), body)
 
 
-def calculate_body_values(body_data: PlanetData | StarData) -> BodyValueData:
-    # undiscovered = not body_data.is_discovered(this.commander.id) or body_data.get_scan_state(this.commander.id) < 2
-    unscanned = body_data.get_scan_state(this.commander.id) == 0
-    body_value = BodyValueData(body_data.get_name(), body_data.get_id())
-    if type(body_data) is StarData:
-        if body_data.get_type() == 'SupermassiveBlackHole':
-            value = 261790
-            honk_value = 0
-        else:
-            k = get_starclass_k(body_data.get_type())
-            value, honk_value = get_star_value(
-                k, body_data.get_mass(),
-                not body_data.was_discovered(this.commander.id) if not unscanned else False
-            )
-        body_value.set_base_values(value, value).set_mapped_values(value, value) \
-            .set_honk_values(honk_value, honk_value)
+def calculate_body_values(bodies: list[PlanetData | StarData], commander_id: int) -> list[BodyValueData]:
+    """
+    Calculate values for a list of bodies, batching the planet and star calculations when NumPy is available and
+    using the memoized per-body calculations otherwise.
+
+    :param bodies: Bodies to value
+    :param commander_id: Commander DB ID
+    :return: Value data for each body, in the same order
+    """
+
+    planets: list[tuple[int, PlanetData]] = []
+    stars: list[tuple[int, StarData]] = []
+    body_values: list[BodyValueData] = []
+    for index, body_data in enumerate(bodies):
+        body_value = BodyValueData(body_data.get_name(), body_data.get_id())
+        body_values.append(body_value)
+        if type(body_data) is PlanetData:
+            planets.append((index, body_data))
+        elif type(body_data) is StarData:
+            if body_data.get_type() == 'SupermassiveBlackHole':
+                body_value.set_base_values(261790, 261790).set_mapped_values(261790, 261790).set_honk_values(0, 0)
+            else:
+                stars.append((index, body_data))
 
-    if type(body_data) is PlanetData:
+    if get_numpy() is None:
+        # Without NumPy the batch functions loop the scalar calculation, which is slower than the memoized path
         odyssey_bonus = this.odyssey or this.game_version.major >= 4
-        odyssey_bonus = False if not body_data.was_discovered(this.commander.id) and body_data.was_mapped(this.commander.id) \
-            else odyssey_bonus
-        k, kt, tm = get_planetclass_k(body_data.get_type(), body_data.is_terraformable())
-        value, mapped_value, honk_value, \
-            min_value, min_mapped_value, min_honk_value = \
-            get_body_value(
-                k, kt, tm, body_data.get_mass(),
-                not body_data.was_discovered(this.commander.id) if not unscanned else False,
-                not body_data.was_mapped(this.commander.id) if not unscanned else False,
-                odyssey_bonus)
+        for index, star in stars:
+            value, honk_value = get_cached_star_value(
+                star.get_type(), star.get_mass(),
+                not star.was_discovered(commander_id) if star.get_scan_state(commander_id) != 0 else False
+            )
+            body_values[index].set_base_values(value, value).set_mapped_values(value, value) \
+                .set_honk_values(honk_value, honk_value)
+        for index, planet in planets:
+            unscanned = planet.get_scan_state(commander_id) == 0
+            value, mapped_value, honk_value, min_value, min_mapped_value, min_honk_value = get_cached_body_value(
+                planet.get_type(), planet.is_terraformable(), planet.get_mass(),
+                not planet.was_discovered(commander_id) if not unscanned else False,
+                not planet.was_mapped(commander_id) if not unscanned else False,
+                False if not planet.was_discovered(commander_id) and planet.was_mapped(commander_id)
+                else odyssey_bonus
+            )
+            body_values[index].set_base_values(value, min_value).set_honk_values(honk_value, min_honk_value)
+            body_values[index].set_mapped_values(mapped_value, min_mapped_value)
+        return body_values
+
+    if stars:
+        values, honk_values = get_star_values(
+            [get_starclass_k(star.get_type()) for _, star in stars],
+            [star.get_mass() for _, star in stars],
+            [not star.was_discovered(commander_id) if star.get_scan_state(commander_id) != 0 else False
+             for _, star in stars]
+        )
+        for (index, _), value, honk_value in zip(stars, values, honk_values):
+            body_values[index].set_base_values(value, value).set_mapped_values(value, value) \
+                .set_honk_values(honk_value, honk_value)
 
-        body_value.set_base_values(value, min_value).set_honk_values(honk_value, min_honk_value)
-        body_value.set_mapped_values(int(mapped_value), int(min_mapped_value))
+    if planets:
+        odyssey_bonus = this.odyssey or this.game_version.major >= 4
+        k_values, kt_values, tm_values = zip(*[
+            get_planetclass_k(planet.get_type(), planet.is_terraformable()) for _, planet in planets
+        ])
+        unscanned = [planet.get_scan_state(commander_id) == 0 for _, planet in planets]
+        columns = get_body_values(
+            k_values, kt_values, tm_values,
+            [planet.get_mass() for _, planet in planets],
+            [not planet.was_discovered(commander_id) if not planet_unscanned else False
+             for (_, planet), planet_unscanned in zip(planets, unscanned)],
+            [not planet.was_mapped(commander_id) if not planet_unscanned else False
+             for (_, planet), planet_unscanned in zip(planets, unscanned)],
+            [False if not planet.was_discovered(commander_id) and planet.was_mapped(commander_id)
+             else odyssey_bonus for _, planet in planets]
+        )
+        for (index, _), value, mapped_value, honk_value, min_value, min_mapped_value, min_honk_value \
+                in zip(planets, *columns):
+            body_values[index].set_base_values(value, min_value).set_honk_values(honk_value, min_honk_value)
+            body_values[index].set_mapped_values(int(mapped_value), int(min_mapped_value))
 
-    return body_value
+    return body_values
 
 
 def get_system_status() -> SystemStatus | None:
     if not this.system:
         this.system_status = None
-    elif this.system_status and (this.system_status.system_id != this.system.id
-                                 or this.system_status.commander_id != this.commander.id):
+    elif this.system_status and this.system_status_key != (this.system.id, this.commander.id):
         this.system_status = None
 
     if not this.system_status and this.system:
-        statuses: list[SystemStatus] = this.system.statuses
-        statuses = list(filter(lambda item: item.commander_id == this.commander.id, statuses))
-        if len(statuses):
-            this.system_status = statuses[0]
-        else:
+        if this.system.id is None:
+            this.sql_session.flush()
+        this.system_status = this.sql_session.scalar(
+            select(SystemStatus).where(SystemStatus.system_id == this.system.id)
+            .where(SystemStatus.commander_id == this.commander.id)
+        )
+        if not this.system_status:
+            # Committed with the next batch of event changes
             this.system_status = SystemStatus(system_id=this.system.id, commander_id=this.commander.id)
-            this.system.statuses.append(this.system_status)
-            this.sql_session.commit()
+            this.sql_session.add(this.system_status)
+        this.system_status_key = (this.system.id, this.commander.id)
     return this.system_status
 
 
-def get_unsold_data() -> str:
-    unsold_text = ''
-    if this.recalculate_unsold:
-        last_death: Death = this.sql_session.scalar(select(Death).where(Death.commander_id == this.commander.id)
-                                                    .where(Death.in_ship == True).order_by(desc(Death.died_at)))
-        last_resurrect: Resurrection = this.sql_session.scalar(select(Resurrection).where(Resurrection.commander_id == this.commander.id)
-                                                               .where(Resurrection.type.not_in(['escape', 'rejoin', 'handin', 'recover']))
-                                                               .order_by(desc(Resurrection.resurrected_at)))
-        recent_sales: list[SystemSale] = this.sql_session.scalars(
-            select(SystemSale).where(SystemSale.commander_id == this.commander.id).order_by(desc(SystemSale.sold_at))
-            .limit(this.max_sell_events.get())
-        ).all()
-        data_cutoff_time = recent_sales[-1].sold_at if len(recent_sales) == this.max_sell_events.get() else datetime.min
-
-        last_data_loss: datetime | None = None
-        if last_death or last_resurrect:
-            last_death_time: datetime = last_death.died_at if last_death else None
-            last_resurrect_time: datetime = last_resurrect.resurrected_at if last_resurrect else None
-            last_data_loss = last_death_time if last_death_time > last_resurrect_time else last_resurrect_time
-        if last_data_loss:
-            if data_cutoff_time > datetime.min:
-                data_cutoff_time = last_data_loss if last_data_loss > data_cutoff_time else data_cutoff_time
-            else:
-                data_cutoff_time = last_data_loss
-
-        logger.debug(f'Cutoff time: {data_cutoff_time}')
-
-        planet_scans: list[PlanetStatus] = this.sql_session.scalars(select(PlanetStatus)
-                                                                    .where(PlanetStatus.commander_id == this.commander.id)
-                                                                    .where(PlanetStatus.scan_state >= 2)
-                                                                    .where(PlanetStatus.scanned_at > data_cutoff_time)).all()
-
-        star_scans: list[StarStatus] = this.sql_session.scalars(select(StarStatus)
-                                                                .where(StarStatus.commander_id == this.commander.id)
-                                                                .where(StarStatus.scan_state >= 2)
-                                                                .where(StarStatus.scanned_at > data_cutoff_time)).all()
-
-        systems: set[int] = set()
-
-        for planet_status in planet_scans:
-            planet_data = this.sql_session.scalar(select(Planet).where(Planet.id == planet_status.planet_id))
-            if planet_data.system_id not in this.unsold_systems:
-                systems.add(planet_data.system_id)
-
-        for star_status in star_scans:
-            star_data = this.sql_session.scalar(select(Star).where(Star.id == star_status.star_id))
-            if star_data.system_id not in this.unsold_systems:
-                systems.add(star_data.system_id)
-        if len(systems) > 0:
-            for system_id in systems:
-                system = this.sql_session.scalar(select(System).where(System.id == system_id))
-                data_sales = this.sql_session.scalar(select(SystemSale).where(SystemSale.commander_id == this.commander.id)
-                                                     .where(SystemSale.systems.like(f'%{system.name}%')))
-                if not data_sales:
-                    this.unsold_systems[system_id] = get_system_value(system)
-                else:
-                    this.unsold_systems[system_id] = (0, 0)
+def get_data_cutoff() -> datetime:
+    """
+    Get the time before which scans are no longer considered unsold: the later of the last data loss and the
+    configured number of sell events.
+
+    :return: Cutoff time
+    """
+
+    data_cutoff_time = this.sale_index.get_sale_cutoff(this.max_sell_events.get()) or datetime.min
+    last_data_loss: datetime | None = this.loss_timeline.last_loss()
+    if last_data_loss and last_data_loss > data_cutoff_time:
+        data_cutoff_time = last_data_loss
+    return data_cutoff_time
+
+
+def request_unsold_values() -> None:
+    """
+    Start revaluing unsold systems on the database worker: a sync with the database if the ledger needs one, plus
+    any systems flagged for revaluation. Runs inline if the worker isn't running.
+    """
+
+    dirty = this.unsold_ledger.get_dirty()
+    if this.db_worker.is_pending('unsold') or not (this.recalculate_unsold or dirty):
+        return
+
+    data_cutoff_time = get_data_cutoff()
+    logger.debug(f'Cutoff time: {data_cutoff_time}')
+    this.unsold_ledger.prune(data_cutoff_time, this.sale_index.was_sold)
+    job = partial(compute_unsold_values, this.commander.id, data_cutoff_time,
+                  this.unsold_ledger.get_watermark(), this.recalculate_unsold, this.unsold_ledger.get_dirty())
+    commander_id, generation, since = \
+        this.commander.id, this.unsold_ledger.generation, this.unsold_ledger.get_change_count()
+    if this.db_worker.is_running():
+        def on_result(result: tuple) -> None:
+            apply_unsold_values(commander_id, generation, since, *result)
+            update_totals()
+
+        this.db_worker.submit('unsold', job, on_result)
+    else:
+        apply_unsold_values(commander_id, generation, since, *job(this.sql_session))
+
+
+def compute_unsold_values(commander_id: int, data_cutoff_time: datetime, watermark: datetime | None, sync: bool,
+                          dirty: list[int], session: Session) \
+        -> tuple[bool, list[tuple[int, str, tuple[int, int], datetime, datetime | None]],
+                 list[tuple[int, str | None, tuple[int, int]]]]:
+    """
+    Value unsold systems. Runs on the database worker thread, so only uses the given session.
+
+    :param commander_id: Commander DB ID
+    :param data_cutoff_time: Scans before this time are no longer unsold
+    :param watermark: Only systems with scans or maps after this time are synced; None for a full rebuild
+    :param sync: Whether to sync the ledger with the database
+    :param dirty: IDs of systems flagged for revaluation
+    :param session: Worker session
+    :return: Tuple of the sync flag, synced systems and revalued systems. Synced systems are tuples of system ID,
+             name, values and latest scan and map times; revalued systems are tuples of system ID, name and values,
+             with a None name if the system no longer exists.
+    """
+
+    synced = []
+    if sync:
+        # Resolve scanned bodies to their systems in the database rather than one query per status row
+        planet_activity = select(Planet.system_id, PlanetStatus.scanned_at, PlanetStatus.mapped_at) \
+            .join(PlanetStatus, PlanetStatus.planet_id == Planet.id) \
+            .where(PlanetStatus.commander_id == commander_id) \
+            .where(PlanetStatus.scan_state >= 2) \
+            .where(PlanetStatus.scanned_at > data_cutoff_time)
+        star_activity = select(Star.system_id, StarStatus.scanned_at, null().label('mapped_at')) \
+            .join(StarStatus, StarStatus.star_id == Star.id) \
+            .where(StarStatus.commander_id == commander_id) \
+            .where(StarStatus.scan_state >= 2) \
+            .where(StarStatus.scanned_at > data_cutoff_time)
+        activity = union_all(planet_activity, star_activity).subquery()
+        system_activity = select(activity.c.system_id,
+                                 func.max(activity.c.scanned_at).label('scanned_at'),
+                                 func.max(activity.c.mapped_at).label('mapped_at')) \
+            .group_by(activity.c.system_id)
+        if watermark:
+            system_activity = system_activity.having(or_(func.max(activity.c.scanned_at) > watermark,
+                                                         func.max(activity.c.mapped_at) > watermark))
+        changed_systems = system_activity.subquery()
+
+        system_statuses: dict[int, SystemStatus] = {
+            status.system_id: status for status in session.scalars(
+                select(SystemStatus).join(changed_systems, changed_systems.c.system_id == SystemStatus.system_id)
+                .where(SystemStatus.commander_id == commander_id)
+            )
+        }
+
+        rows = session.execute(
+            select(System, changed_systems.c.scanned_at, changed_systems.c.mapped_at)
+            .join(changed_systems, changed_systems.c.system_id == System.id)
+            .options(selectinload(System.stars).selectinload(Star.rings), selectinload(System.planets),
+                     selectinload(System.non_bodies))
+            .execution_options(yield_per=500)
+        )
+        for system, scanned_at, mapped_at in rows:
+            synced.append((system.id, system.name,
+                           get_system_value(system, session, commander_id, system_statuses.get(system.id)),
+                           scanned_at, mapped_at))
+
+    synced_ids = {system_id for system_id, *_ in synced}
+    revalued = []
+    for system_id in dirty:
+        if system_id in synced_ids:
+            continue
+        system = session.get(System, system_id)
+        if system:
+            revalued.append((system.id, system.name, get_system_value(system, session, commander_id)))
+        else:
+            revalued.append((system_id, None, (0, 0)))
+    return sync, synced, revalued
+
+
+def apply_unsold_values(commander_id: int, generation: int, since: int, sync: bool,
+                        synced: list[tuple[int, str, tuple[int, int], datetime, datetime | None]],
+                        revalued: list[tuple[int, str | None, tuple[int, int]]]) -> None:
+    """
+    Store the results of compute_unsold_values in the ledger. Results are dropped if the commander changed or the
+    ledger was cleared while they were computed.
+
+    :param commander_id: Commander the values were computed for
+    :param generation: Ledger generation when the values were requested
+    :param since: Ledger change count when the values were requested
+    :param sync: Whether the ledger was synced with the database
+    :param synced: Synced systems
+    :param revalued: Revalued systems
+    """
+
+    if not this.commander or this.commander.id != commander_id or this.unsold_ledger.generation != generation:
+        return
+
+    for system_id, name, values, scanned_at, mapped_at in synced:
+        this.unsold_ledger.advance_watermark(scanned_at)
+        this.unsold_ledger.advance_watermark(mapped_at)
+        if this.sale_index.was_sold(name):
+            this.unsold_ledger.remove(system_id)
+        else:
+            this.unsold_ledger.set_value(system_id, name, values, scanned_at, since)
+    for system_id, name, values in revalued:
+        if name:
+            this.unsold_ledger.set_value(system_id, name, values, since=since)
+        else:
+            this.unsold_ledger.remove(system_id)
+    if sync:
         this.recalculate_unsold = False
+        this.unsold_ledger.save()
 
-    if this.system.id in this.unsold_systems and this.unsold_systems[this.system.id] is True:
-        this.unsold_systems[this.system.id] = get_system_value(this.system)
 
-    total_value_sum = 0
-    min_total_value_sum = 0
+@this.span_timer.timed('get_unsold_data')
+def get_unsold_data() -> str:
+    unsold_text = ''
+    request_unsold_values()
 
-    for system_id, values in this.unsold_systems.items():
-        total_value, min_total_value = values
-        total_value_sum += total_value
-        min_total_value_sum += min_total_value
+    total_value_sum, min_total_value_sum = this.unsold_ledger.get_totals()
 
     if total_value_sum > 0:
         if total_value_sum != min_total_value_sum:
@@ -1322,78 +1557,118 @@ def get_unsold_data() -> str:
     return unsold_text
 
 
-def process_belts() -> None:
-    belt_count = 0
-    belts_found = 0
+def process_belts(main_star: Star | None = None) -> None:
+    """
+    Rebuild the belt index for the current system from its stars and known belt clusters.
+
+    :param main_star: The system's main star, if known
+    """
+
+    this.belts = {}
+    this.belt_count = 0
+    this.belts_found = 0
     for _, star in filter(lambda item: type(item[1]) is StarData, this.bodies.items()):
-        rings: list[StarRing] = star.get_rings()
-        for ring in rings:
-            if ring.name.endswith('Belt'):
-                belt_count += 1
-                for _, non_body in this.non_bodies.items():
-                    if non_body.get_name().startswith(f'{star.get_name()} {ring.name}'):
-                        belts_found += 1
-                        break
-    main_star = get_main_star(this.system, this.sql_session)
+        index_star_belts(f'{star.get_name()} ', star.get_rings())
     if main_star:
-        name_prefix = '' if main_star.name == this.system.name else main_star.name + ' '
-        for ring in main_star.rings:
-            if ring.name.endswith('Belt'):
-                belt_count += 1
-                for _, non_body in this.non_bodies.items():
-                    if non_body.get_name().startswith(f'{name_prefix}{ring.name}'):
-                        belts_found += 1
-                        break
-    this.belt_count = belt_count
-    this.belts_found = belts_found
+        index_star_belts('' if main_star.name == this.system.name else main_star.name + ' ', main_star.rings)
 
 
-def process_discovery() -> None:
-    undiscovered = False
-    nav = False
-    for _, body in this.bodies.items():
-        if not body.is_discovered(this.commander.id):
-            undiscovered = True
-        if body.get_scan_state(this.commander.id) < 2:
-            undiscovered = True
-            if body.get_scan_state(this.commander.id) == 1:
-                nav = True
-        if nav and undiscovered:
-            break
-    this.system_has_undiscovered = undiscovered
-    this.is_nav_beacon = nav
+def index_star_belts(name_prefix: str, rings: list[StarRing]) -> None:
+    """
+    Add a star's asteroid belts to the belt index, checking the known belt clusters once per new belt.
+
+    :param name_prefix: Star name prefix of the star's ring names, empty for a main star named after the system
+    :param rings: The star's rings
+    """
+
+    for ring in rings:
+        if ring.name.endswith('Belt'):
+            belt_name = f'{name_prefix}{ring.name}'
+            if belt_name not in this.belts:
+                found = any(non_body.get_name().startswith(belt_name) for non_body in this.non_bodies.values())
+                this.belts[belt_name] = found
+                this.belt_count += 1
+                this.belts_found += found
+
+
+def index_belt_cluster(name: str) -> None:
+    """
+    Mark the belt containing a newly scanned belt cluster as found.
 
+    :param name: Belt cluster name, without the system prefix
+    """
+
+    belt_name = name[:name.rfind(' Cluster')]
+    if this.belts.get(belt_name) is False:
+        this.belts[belt_name] = True
+        this.belts_found += 1
 
-def update_display() -> None:
-    global efficiency_bonus
+
+@this.span_timer.timed('update_display', size=get_current_system_size)
+@this.query_counter.counted('update_display')
+def update_display(changes: DisplayChange = DisplayChange.ALL) -> None:
+    """
+    Refresh the plugin display. Changes accumulate until a refresh completes, and only the stages they affect are
+    rerun: valuation and text rendering for body, sale and settings changes, the overlay for those plus current
+    body and overlay visibility changes. Widget layout is always reapplied from the cached text.
+
+    :param changes: The display inputs which have changed
+    """
 
     if not this.started:
         return
 
+    this.display_changes |= changes
+    changes = this.display_changes
+
     if not len(sorted(plug.PLUGINS, key=lambda item: item.name == 'BioScan')):  # type: list[plug.Plugin]
         if this.fetched_edsm or not this.system:
             this.edsm_button.grid_remove()
         else:
             this.edsm_button.grid()
     system_status = get_system_status()
-    if not this.display_hidden:
-        if not system_status:
+    if not system_status:
+        if not this.display_hidden:
             this.label['text'] = 'Pioneer: Awaiting Data'
             this.scroll_canvas.grid_remove()
             this.scrollbar.grid_remove()
             this.total_label.grid_remove()
-            return
+        return
+    if not this.display_hidden:
+        this.total_label.grid()
+
+    if changes & DisplayChange.VALUATION:
+        this.system_totals = calc_system_value()
+        calc_counts()
+        this.display_text = get_display_text(system_status)
+        this.total_text = get_total_text(*this.system_totals)
+        this.total_label_text.set(this.total_text)
+
+    if not this.display_hidden:
+        this.label['text'] = this.display_text
+
+    if changes & (DisplayChange.VALUATION | DisplayChange.CURRENT_BODY | DisplayChange.OVERLAY):
+        update_overlay()
+
+    if not this.display_hidden:
+        if this.show_details.get():
+            this.scroll_canvas.grid()
+            this.scrollbar.grid()
         else:
-            if this.show_details.get():
-                this.scroll_canvas.grid()
-                this.scrollbar.grid()
-            else:
-                this.scroll_canvas.grid_remove()
-                this.scrollbar.grid_remove()
-            this.total_label.grid()
+            this.scroll_canvas.grid_remove()
+            this.scrollbar.grid_remove()
 
-    total_value, min_total_value, max_value, min_max_value = calc_system_value()
-    calc_counts()
+    this.display_changes = DisplayChange.NONE
+
+
+def get_display_text(system_status: SystemStatus) -> str:
+    """
+    Build the summary text shown at the top of the pane: system status flags, valuable bodies, biological signals
+    and body counts.
+
+    :param system_status: Current system status
+    :return: Summary text
+    """
 
     valuable_body_names = [
         body_name
@@ -1487,8 +1762,15 @@ def update_display() -> None:
             text += f' (Mapped: {this.map_count}/{this.planet_count})'
     else:
         text = 'Pioneer: Nothing Scanned'
-    if not this.display_hidden:
-        this.label['text'] = text
+    return text
+
+
+def get_total_text(total_value: int, min_total_value: int, max_value: int, min_max_value: int) -> str:
+    """
+    Build the system and unsold value totals text.
+
+    :return: Totals text
+    """
 
     if total_value != min_total_value:
         total_label_text = 'Estimated System Value: {} to {}'.format(
@@ -1520,12 +1802,41 @@ def update_display() -> None:
     if unsold_text:
         total_label_text += f'\n{unsold_text}'
 
-    this.total_label_text.set(total_label_text)
+    return total_label_text
+
+
+def update_totals() -> None:
+    """
+    Rebuild the totals text without revaluing the system, typically when unsold values arrive from the database
+    worker.
+    """
+
+    if not this.started:
+        return
+    this.total_text = get_total_text(*this.system_totals)
+    this.total_label_text.set(this.total_text)
+    update_overlay()
+
+
+def get_overlay_local_text() -> str:
+    """
+    :return: The main star details plus the details of the current body, if known
+    """
+
+    text = this.star_text
+    if this.current_body_name in this.body_texts:
+        text += '\n' + this.body_texts[this.current_body_name]
+    return text
+
 
+def update_overlay() -> None:
     if this.use_overlay.get() and this.overlay.available():
+        this.overlay.start()
         if overlay_should_display():
-            if text:
-                overlay_text = text + ('\n\n' + this.overlay_local_text if this.overlay_local_text else '') + '\n' + total_label_text
+            if this.display_text:
+                overlay_local_text = get_overlay_local_text()
+                overlay_text = this.display_text + ('\n\n' + overlay_local_text if overlay_local_text else '') \
+                    + '\n' + this.total_text
                 this.overlay.display("pioneer_text", overlay_text,
                                      x=this.overlay_anchor_x.get(), y=this.overlay_anchor_y.get(),
                                      color=this.overlay_color.get())
@@ -1536,14 +1847,6 @@ def update_display() -> None:
         else:
             this.overlay.clear("pioneer_text")
 
-    if not this.display_hidden:
-        if this.show_details.get():
-            this.scroll_canvas.grid()
-            this.scrollbar.grid()
-        else:
-            this.scroll_canvas.grid_remove()
-            this.scrollbar.grid_remove()
-
 
 def overlay_should_display() -> bool:
     if not this.analysis_mode or not this.in_flight or this.gui_focus not in [0, 2, 9, 10] or this.fsd_jump:
@@ -1567,7 +1870,23 @@ def toggle_view():
             this.edsm_button.grid_remove()
     else:
         this.total_label.grid()
-    update_display()
+    update_display(DisplayChange.LAYOUT)
+
+
+def resize_scroll_canvas(event: tk.Event) -> None:
+    """
+    Event handler for size changes of the detail text or header labels. Sizes the scroll canvas to fit the wider of
+    the two once Tk has laid them out, rather than forcing a synchronous layout pass on every refresh.
+
+    :param event: Required to process the event. Unused.
+    """
+
+    label_width = this.values_label.winfo_width()
+    full_width = this.label.winfo_width() - this.scrollbar.winfo_width()
+    final_width = label_width if label_width > full_width else full_width
+    if final_width != this.canvas_width:
+        this.canvas_width = final_width
+        this.scroll_canvas.configure(width=final_width)
 
 
 def bind_mousewheel(event: tk.Event) -> None:
@@ -1,47 +1,77 @@
+from functools import lru_cache
+from typing import Sequence
+
+numpy = None  # Imported by get_numpy on first batch calculation
+numpy_checked = False
+
+# Star class constants. White dwarf classes (D*) and everything else are resolved by prefix in get_starclass_k.
+star_class_k: dict[str, float] = {
+    'N': 22628,
+    'H': 22628,
+}
+
+# Planet class constants keyed by (planet class, terraformable): (base k, terraform k, terraform range multiplier)
+# Adapted from MattG's table at https://forums.frontier.co.uk/threads/exploration-value-formulae.232000/
+# Thank you, MattG! :)
+planet_class_k: dict[tuple[str, bool], tuple[int, int, float]] = {
+    ('Metal rich body', False): (21790, 0, 1.0),
+    ('Metal rich body', True): (21790, 0, 1.0),
+    ('Ammonia world', False): (96932, 0, 1.0),
+    ('Ammonia world', True): (96932, 0, 1.0),
+    ('Sudarsky class I gas giant', False): (1656, 0, 1.0),
+    ('Sudarsky class I gas giant', True): (1656, 0, 1.0),
+    ('Sudarsky class II gas giant', False): (9654, 0, 1.0),
+    ('Sudarsky class II gas giant', True): (9654, 100677, .9),
+    ('High metal content body', False): (9654, 0, 1.0),
+    ('High metal content body', True): (9654, 100677, .9),
+    ('Water world', False): (64831, 0, 1.0),
+    ('Water world', True): (64831, 116295, .75),
+    # Natural ELWs seem to get the full terraformable bonus while terraformed get a smaller one
+    ('Earthlike body', False): (64831, 116295, 1.0),
+    ('Earthlike body', True): (64831, 116295, 0.0),
+}
+default_planet_k: dict[bool, tuple[int, int, float]] = {
+    False: (300, 0, 1.0),
+    True: (300, 93328, .9),
+}
+
+
 def get_starclass_k(star_class: str) -> float:
-    if star_class in ['N', 'H']:
-        return 22628
+    k = star_class_k.get(star_class)
+    if k is not None:
+        return k
     elif star_class.startswith('D'):
         return 14057
-    else:
-        return 1200
+    return 1200
 
 
 def get_planetclass_k(planet_class: str, terraformable: bool) -> tuple[int, int, float]:
     """
-        Adapted from MattG's table at https://forums.frontier.co.uk/threads/exploration-value-formulae.232000/
-        Thank you, MattG! :)
+    Look up the base, terraform bonus and terraform range multiplier for a planet class.
     """
-    terraform = 0
-    mult = 1.0  # Multiplier to calculate rough terraform bonus range
-    if planet_class == 'Metal rich body':
-        base = 21790
-    elif planet_class == 'Ammonia world':
-        base = 96932
-    elif planet_class == 'Sudarsky class I gas giant':
-        base = 1656
-    elif planet_class == 'Sudarsky class II gas giant' or planet_class == 'High metal content body':
-        base = 9654
-        if terraformable:
-            terraform = 100677
-            mult = .9
-    elif planet_class == 'Water world':
-        base = 64831
-        if terraformable:
-            terraform = 116295
-            mult = .75
-    elif planet_class == 'Earthlike body':
-        # Natural ELWs seem to get the full terraformable bonus while terraformed get a smaller one
-        base = 64831
-        terraform = 116295
-        mult = 1.0 if not terraformable else 0.0
-    else:
-        base = 300
-        if terraformable:
-            terraform = 93328
-            mult = .9
 
-    return base, terraform, mult
+    terraformable = bool(terraformable)
+    return planet_class_k.get((planet_class, terraformable), default_planet_k[terraformable])
+
+
+@lru_cache(maxsize=4096)
+def get_cached_star_value(star_class: str, mass: float, first_discoverer: bool) -> tuple[int, int]:
+    """
+    Memoized star valuation keyed on the star's attributes rather than its class constant.
+    """
+
+    return get_star_value(get_starclass_k(star_class), mass, first_discoverer)
+
+
+@lru_cache(maxsize=4096)
+def get_cached_body_value(planet_class: str, terraformable: bool, mass: float, first_discoverer: bool,
+                          first_mapper: bool, odyssey_bonus: bool) -> tuple[int, int, int, int, int, int]:
+    """
+    Memoized planet valuation. Repeated recalculation of an unchanged body is a cache hit.
+    """
+
+    k, kt, tm = get_planetclass_k(planet_class, terraformable)
+    return get_body_value(k, kt, tm, mass, first_discoverer, first_mapper, odyssey_bonus)
 
 
 def get_star_value(k: float, mass: float, first_discoverer: bool) -> tuple[int, int]:
@@ -98,3 +128,92 @@ def get_body_value(k: int, kt: int, tm: float, mass: float, first_discoverer: bo
 
     return round(value), round(mapped_value), round(honk_value), \
         round(min_value), round(min_mapped_value), round(min_honk_value)
+
+
+def get_numpy():
+    """
+    Import NumPy on first use rather than at plugin load, as it is slow to import and only used for batches.
+
+    :return: The numpy module, or None if it isn't installed
+    """
+
+    global numpy, numpy_checked
+    if not numpy_checked:
+        numpy_checked = True
+        try:
+            import numpy as numpy_module
+        except ImportError:
+            numpy_module = None
+        numpy = numpy_module
+    return numpy
+
+
+def get_star_values(k: Sequence[float], mass: Sequence[float],
+                    first_discoverer: Sequence[bool]) -> tuple[list[int], list[int]]:
+    """
+    Batch version of get_star_value. Takes equal length sequences and returns the value and honk value columns.
+    """
+
+    numpy = get_numpy() if len(k) else None
+    if numpy is None:
+        results = [get_star_value(*args) for args in zip(k, mass, first_discoverer)]
+        return [result[0] for result in results], [result[1] for result in results]
+
+    k_array = numpy.asarray(k, dtype=numpy.float64)
+    value = k_array + (numpy.asarray(mass, dtype=numpy.float64) * k_array / 66.25)
+    honk_value = value / 3
+    discoverer = numpy.asarray(first_discoverer, dtype=bool)
+    value = numpy.where(discoverer, value * 2.6, value)
+    honk_value = numpy.where(discoverer, honk_value * 2.6, honk_value)
+    return numpy.rint(value).astype(numpy.int64).tolist(), numpy.rint(honk_value).astype(numpy.int64).tolist()
+
+
+def get_body_values(k: Sequence[int], kt: Sequence[int], tm: Sequence[float], mass: Sequence[float],
+                    first_discoverer: Sequence[bool], first_mapper: Sequence[bool],
+                    odyssey_bonus: Sequence[bool]) -> tuple[list[int], list[int], list[int],
+                                                            list[int], list[int], list[int]]:
+    """
+    Batch version of get_body_value. Takes equal length sequences of body parameters and returns the six value
+    columns in the same order as get_body_value. Uses NumPy when it is available and falls back to the scalar
+    calculation otherwise; both paths produce identical results.
+    """
+
+    numpy = get_numpy() if len(k) else None
+    if numpy is None:
+        results = [get_body_value(*args) for args in zip(k, kt, tm, mass, first_discoverer, first_mapper,
+                                                         odyssey_bonus)]
+        return tuple([result[column] for result in results] for column in range(6))
+
+    q = 0.56591828
+    k_array = numpy.asarray(k, dtype=numpy.float64)
+    kt_array = numpy.asarray(kt, dtype=numpy.float64)
+    k_final = k_array + kt_array
+    k_final_min = k_array + (kt_array * numpy.asarray(tm, dtype=numpy.float64))
+    discoverer = numpy.asarray(first_discoverer, dtype=bool)
+    mapper = numpy.asarray(first_mapper, dtype=bool)
+    odyssey = numpy.asarray(odyssey_bonus, dtype=bool)
+
+    mapping_multiplier = numpy.where(discoverer & mapper, 3.699622554, numpy.where(mapper, 8.0956, 10 / 3))
+
+    mass_factor = numpy.asarray(mass, dtype=numpy.float64) ** 0.2
+    value = (k_final + k_final * q * mass_factor)
+    min_value = (k_final_min + k_final_min * q * mass_factor)
+    mapped_value = value * mapping_multiplier
+    min_mapped_value = min_value * mapping_multiplier
+    honk_value = value / 3
+    min_honk_value = min_value / 3
+
+    mapped_bonus = mapped_value * 0.3
+    min_mapped_bonus = min_mapped_value * 0.3
+    mapped_value = numpy.where(odyssey, mapped_value + numpy.where(mapped_bonus > 555, mapped_bonus, 555),
+                               mapped_value)
+    min_mapped_value = numpy.where(odyssey,
+                                   min_mapped_value + numpy.where(min_mapped_bonus > 555, min_mapped_bonus, 555),
+                                   min_mapped_value)
+
+    columns = []
+    for column in (value, mapped_value, honk_value, min_value, min_mapped_value, min_honk_value):
+        column = numpy.where(column > 500, column, 500)
+        column = numpy.where(discoverer, column * 2.6, column)
+        columns.append(numpy.rint(column).astype(numpy.int64).tolist())
+    return tuple(columns)
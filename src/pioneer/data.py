@@ -28,4 +28,49 @@ class BodyValueData:
 
     def set_honk_values(self, value: int, min_value: int) -> Self:
         self.honk_value = (value, min_value)
-        return self
\ No newline at end of file
+        return self
+
+
+class BodyCounter:
+    """
+    Running totals of per-body state flags. Each body's flags are stored so a change to a single body adjusts the
+    totals without walking the rest of the system.
+    """
+
+    def __init__(self):
+        self.undiscovered: int = 0
+        self.nav_beacon: int = 0
+        self.planets: int = 0
+        self.mapped: int = 0
+        self._bodies: dict[str, tuple[bool, bool, bool, bool]] = {}
+
+    def clear(self) -> None:
+        self.undiscovered = 0
+        self.nav_beacon = 0
+        self.planets = 0
+        self.mapped = 0
+        self._bodies = {}
+
+    def update(self, name: str, flags: tuple[bool, bool, bool, bool]) -> None:
+        """
+        Set the flags of a body, adjusting the totals by the difference from its previous flags.
+
+        :param name: Body name
+        :param flags: Tuple of undiscovered, nav beacon only, planet and mapped flags
+        """
+
+        previous = self._bodies.get(name, (False, False, False, False))
+        if previous == flags:
+            return
+        self._bodies[name] = flags
+        self.undiscovered += flags[0] - previous[0]
+        self.nav_beacon += flags[1] - previous[1]
+        self.planets += flags[2] - previous[2]
+        self.mapped += flags[3] - previous[3]
+
+    def get_totals(self) -> tuple[int, int, int, int]:
+        """
+        :return: Tuple of undiscovered, nav beacon only, planet and mapped body counts
+        """
+
+        return self.undiscovered, self.nav_beacon, self.planets, self.mapped
@@ -0,0 +1,133 @@
+import tkinter as tk
+from enum import Flag, auto
+from typing import Callable
+
+
+class DisplayChange(Flag):
+    """
+    Inputs to the display which may change between refreshes. Used to limit a refresh to the stages affected.
+    """
+
+    NONE = 0
+    BODIES = auto()  # Body set, scan, map or honk state
+    SALES = auto()  # Data sales and data loss
+    SETTINGS = auto()  # Plugin preferences
+    CURRENT_BODY = auto()  # Targeted or nearby body
+    OVERLAY = auto()  # Overlay visibility: analysis mode, flight, GUI focus, jumps
+    LAYOUT = auto()  # Widget visibility
+
+    VALUATION = BODIES | SALES | SETTINGS
+    ALL = BODIES | SALES | SETTINGS | CURRENT_BODY | OVERLAY | LAYOUT
+
+
+class DisplayScheduler:
+    """
+    Coalesces display refresh requests. The first request schedules a refresh on the Tk event loop after a short
+    delay; any requests arriving before it runs are merged into it, so a burst of scan events causes one refresh.
+    """
+
+    def __init__(self, delay: int = 50):
+        """
+        :param delay: Milliseconds to wait for further requests before refreshing
+        """
+
+        self.delay: int = delay
+        self.merged: int = 0  # Total number of requests merged into an already scheduled refresh
+        self._widget: tk.Misc | None = None
+        self._callback: Callable[[DisplayChange], None] | None = None
+        self._job: str | None = None
+        self._pending: DisplayChange = DisplayChange.NONE
+
+    def bind(self, widget: tk.Misc, callback: Callable[[DisplayChange], None]) -> None:
+        """
+        :param widget: Any widget, used to access the Tk event loop
+        :param callback: Refresh function, called with the merged changes
+        """
+
+        self._widget = widget
+        self._callback = callback
+
+    def schedule(self, changes: DisplayChange = DisplayChange.ALL) -> None:
+        """
+        Request a refresh for the given changes.
+
+        :param changes: The display inputs which have changed
+        """
+
+        if not self._callback:
+            return
+        self._pending |= changes
+        if self._job:
+            self.merged += 1
+            return
+        try:
+            self._job = self._widget.after(self.delay, self.flush)
+        except tk.TclError:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Run any pending refresh immediately.
+        """
+
+        if self._job:
+            try:
+                self._widget.after_cancel(self._job)
+            except tk.TclError:
+                pass
+            self._job = None
+        changes = self._pending
+        self._pending = DisplayChange.NONE
+        if changes and self._callback:
+            self._callback(changes)
+
+    def cancel(self) -> None:
+        """
+        Drop any pending refresh, typically on shutdown.
+        """
+
+        if self._job:
+            try:
+                self._widget.after_cancel(self._job)
+            except tk.TclError:
+                pass
+            self._job = None
+        self._pending = DisplayChange.NONE
+
+
+class FragmentCache:
+    """
+    Cache of rendered text fragments, keyed by an ID and validated against a signature of the state they were
+    rendered from. A fragment is only re-rendered when its signature changes.
+    """
+
+    def __init__(self):
+        self.hits: int = 0
+        self.misses: int = 0
+        self._fragments: dict[int, tuple[tuple, str]] = {}
+
+    def get(self, key: int, signature: tuple) -> str | None:
+        """
+        :param key: Fragment ID
+        :param signature: State the fragment must have been rendered from
+        :return: The cached fragment, or None if it is missing or stale
+        """
+
+        fragment = self._fragments.get(key)
+        if fragment and fragment[0] == signature:
+            self.hits += 1
+            return fragment[1]
+        self.misses += 1
+        return None
+
+    def set(self, key: int, signature: tuple, text: str) -> None:
+        """
+        :param key: Fragment ID
+        :param signature: State the fragment was rendered from
+        :param text: Rendered fragment
+        """
+
+        self._fragments[key] = (signature, text)
+
+    def clear(self) -> None:
+        self._fragments = {}
@@ -1,28 +1,72 @@
 import locale
+from functools import lru_cache
+from typing import Iterator
 
 
 class Formatter:
+    """
+    Number formatter producing the same output as ``locale.format_string`` with monetary grouping, but using
+    separators captured once at startup instead of querying the locale on every call. Results are memoized, as the
+    same values are formatted on every display refresh.
+    """
 
     def __init__(self, shorten=True):
-        try:
-            locale.setlocale(locale.LC_ALL, '')
-        except locale.Error:
-            locale.setlocale(locale.LC_ALL, 'C')
         self.shorten: bool = shorten
+        conventions = get_locale_conventions()
+        self.thousands_sep: str = conventions['mon_thousands_sep']
+        self.decimal_point: str = conventions['mon_decimal_point']
+        self.grouping: list[int] = list(conventions['mon_grouping'])
+        self._unit_cache = lru_cache(maxsize=4096)(self._format_unit)
+        self._credits_cache = lru_cache(maxsize=1024)(self._format_credits)
 
     def set_shorten(self, value: bool):
         self.shorten = value
 
-    def format_unit(self, num, unit, space=True):
+    def group(self, digits: str) -> str:
+        """
+        Insert thousands separators into a formatted integer, following ``locale._group``.
+
+        :param digits: Formatted integer, optionally signed
+        :return: Grouped integer
+        """
+
+        if not self.grouping:
+            return digits
+        sign = ''
+        groups = []
+        for interval in self._grouping_intervals():
+            if not digits or digits[-1] not in '0123456789':
+                sign = digits
+                digits = ''
+                break
+            groups.append(digits[-interval:])
+            digits = digits[:-interval]
+        if digits:
+            groups.append(digits)
+        groups.reverse()
+        return sign + self.thousands_sep.join(groups)
+
+    def localize(self, formatted: str) -> str:
+        """
+        :param formatted: Number formatted with '.' as the decimal point
+        :return: The number with locale grouping and decimal point applied
+        """
+
+        if '.' in formatted:
+            whole, fraction = formatted.split('.', 1)
+            return self.group(whole) + self.decimal_point + fraction
+        return self.group(formatted)
+
+    def _format_unit(self, num, unit, space=True):
         if num > 999999:
             # 1.3 Mu
-            s = locale.format_string('%.1f M', num / 1000000.0, grouping=True, monetary=True)
+            s = self.localize('%.1f' % (num / 1000000.0)) + ' M'
         elif num > 999:
             # 456 ku
-            s = locale.format_string('%.1f k', num / 1000.0, grouping=True, monetary=True)
+            s = self.localize('%.1f' % (num / 1000.0)) + ' k'
         else:
             # 789 u
-            s = locale.format_string('%.0f ', num, grouping=True, monetary=True)
+            s = self.localize('%.0f' % num) + ' '
 
         if not space:
             s = s.replace(' ', '')
@@ -31,10 +75,50 @@ class Formatter:
 
         return s
 
+    def _format_credits(self, credits):
+        return self.localize('%d' % credits) + ' Cr'
+
+    def format_unit(self, num, unit, space=True):
+        return self._unit_cache(num, unit, space)
+
     def format_credits(self, credits, space=True):
         if self.shorten:
             return self.format_unit(credits, 'Cr', space)
-        return locale.format_string('%d Cr', credits, grouping=True, monetary=True)
+        return self._credits_cache(credits)
 
     def format_ls(self, ls, space=True):
         return self.format_unit(ls, 'ls', space)
+
+    def _grouping_intervals(self) -> Iterator[int]:
+        last_interval = None
+        for interval in self.grouping:
+            if interval == locale.CHAR_MAX:
+                return
+            if interval == 0:
+                if last_interval is None:
+                    raise ValueError('invalid grouping')
+                while True:
+                    yield last_interval
+            yield interval
+            last_interval = interval
+
+
+def get_locale_conventions() -> dict[str, str | list[int]]:
+    """
+    Get the user's monetary formatting conventions. EDMC configures the locale at startup, in which case it is used
+    as is; otherwise the user's default locale is read and the process locale restored afterwards.
+
+    :return: Locale conventions, as returned by ``locale.localeconv``
+    """
+
+    if locale.setlocale(locale.LC_MONETARY) not in ('C', 'POSIX'):
+        return locale.localeconv()
+
+    previous = locale.setlocale(locale.LC_ALL)
+    try:
+        locale.setlocale(locale.LC_ALL, '')
+        return locale.localeconv()
+    except locale.Error:
+        return locale.localeconv()
+    finally:
+        locale.setlocale(locale.LC_ALL, previous)
@@ -1,3 +1,5 @@
+from datetime import datetime
+
 import semantic_version
 
 # TKinter imports
@@ -7,14 +9,21 @@ from tkinter import ttk
 # Database objects
 from sqlalchemy.orm import Session
 
-from ExploData.explo_data.db import Commander, System, SystemStatus
+from ExploData.explo_data.db import Commander, Star, System, SystemStatus
 from ExploData.explo_data.body_data.struct import PlanetData, StarData, NonBodyData
 
 # Local imports
 import pioneer.const
 import pioneer.overlay as overlay
-from pioneer.data import BodyValueData
+from pioneer.data import BodyCounter, BodyValueData
+from pioneer.display import DisplayChange, DisplayScheduler, FragmentCache
 from pioneer.format_util import Formatter
+from pioneer.ledger import UnsoldLedger
+from pioneer.query_counter import QueryCounter
+from pioneer.timeline import LossTimeline, SaleIndex
+from pioneer.timing import SpanTimer
+from pioneer.valuation import SystemValuation
+from pioneer.worker import DatabaseWorker
 
 # EDMC imports
 from ttkHyperlinkLabel import HyperlinkLabel
@@ -25,6 +34,10 @@ class Globals:
     def __init__(self):
         self.NAME = pioneer.const.plugin_name
         self.VERSION = semantic_version.Version(pioneer.const.plugin_version)
+        self.latest_version: semantic_version.Version | None = None
+        self.startup_timings: dict[str, float] = {}  # Startup stage: seconds
+        self.span_timer = SpanTimer()
+        self.query_counter = QueryCounter()
         self.formatter = Formatter()
         self.overlay = overlay.Overlay()
         self.started = False
@@ -45,6 +58,7 @@ class Globals:
         self.update_button: HyperlinkLabel | None = None
         self.journal_label: tk.Label | None = None
         self.view_button: tk.Button | None = None
+        self.canvas_width: int = 0
         self.display_hidden: bool = False
 
         # DB
@@ -58,11 +72,20 @@ class Globals:
         self.commander: Commander | None = None
         self.system: System | None = None
         self.system_status: SystemStatus | None = None
+        self.system_status_key: tuple[int, int] | None = None  # System and commander IDs of system_status
         self.system_was_scanned: bool = False
         self.system_was_mapped: bool = False
         self.system_has_undiscovered: bool = False
         self.current_body_name: str | None = None
-        self.overlay_local_text: str | None = None
+        self.star_text: str = ''
+        self.body_texts: dict[str, str] = {}
+        self.display_text: str = ''
+        self.total_text: str = ''
+        self.system_totals: tuple[int, int, int, int] = (0, 0, 0, 0)
+        self.display_changes: DisplayChange = DisplayChange.ALL
+        self.display_scheduler = DisplayScheduler()
+        self.db_worker = DatabaseWorker()
+        self.body_fragments = FragmentCache()
         self.is_nav_beacon: bool = False
         self.analysis_mode: bool = True
         self.in_flight: bool = False
@@ -70,16 +93,25 @@ class Globals:
         self.bodies: dict[str, PlanetData | StarData] = {}
         self.non_bodies: dict[str, NonBodyData] = {}
         self.body_values: dict[str, BodyValueData] = {}
-        self.body_sale_status: dict[str, tuple[bool, bool, bool, bool]] = {}
-        self.unsold_systems: dict[int, tuple[int, int] | bool] = {}
+        self.body_sale_status: dict[int, tuple[bool, bool, bool, bool]] = {}
+        self.valuation: SystemValuation | None = None
+        self.unsold_ledger = UnsoldLedger()
         self.recalculate_unsold: bool = True
+        self.loss_timeline = LossTimeline()
+        self.sale_index = SaleIndex()
         self.scans = set()
         self.main_star_value: int = 0
+        self.main_star: Star | None = None
+        self.main_star_scanned_at: datetime | None = None
+        self.main_star_loaded: bool = False
         self.main_star_name = ''
         self.main_star_type = 'Star'
         self.map_count: int = 0
+        self.lost_map_count: int = 0
+        self.body_counter = BodyCounter()
         self.planet_count: int = 0
         self.non_body_count: int = 0
+        self.belts: dict[str, bool] = {}  # Belt name prefix: any cluster found
         self.belt_count: int = 0
         self.belts_found: int = 0
         self.gui_focus: int = 0
@@ -97,5 +129,7 @@ class Globals:
         self.overlay_color: tk.StringVar | None = None
         self.overlay_anchor_x: tk.IntVar | None = None
         self.overlay_anchor_y: tk.IntVar | None = None
+        self.record_timings: tk.BooleanVar | None = None
+        self.query_budget: tk.IntVar | None = None
 
 pioneer_globals = Globals()
\ No newline at end of file
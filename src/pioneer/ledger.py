@@ -0,0 +1,234 @@
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+from EDMCLogging import get_plugin_logger
+from pioneer import const
+
+logger = get_plugin_logger(const.plugin_name)
+
+ledger_version = 1
+
+
+class UnsoldSystem:
+    def __init__(self, name: str, last_scan: datetime | None, value: int = 0, min_value: int = 0,
+                 dirty: bool = True):
+        self.name: str = name
+        self.last_scan: datetime | None = last_scan
+        self.value: int = value
+        self.min_value: int = min_value
+        self.dirty: bool = dirty
+        self.changed: int = 0  # Ledger change count at the last mark_changed
+
+
+class UnsoldLedger:
+    """
+    Persisted, per-commander record of unsold system values. Entries are added or flagged for revaluation as scans
+    come in and dropped as systems are sold or their data is lost, so the full database scan is only needed when
+    the ledger is missing or invalidated.
+    """
+
+    def __init__(self):
+        self.path: Path | None = None
+        self._commanders: dict[str, dict] = {}
+        self._commander_id: int | None = None
+        self._systems: dict[int, UnsoldSystem] = {}
+        self._names: dict[str, int] = {}
+        self._watermark: datetime | None = None
+        self._max_sell_events: int | None = None
+        self._changes: int = 0
+        self.generation: int = 0  # Incremented whenever the ledger is cleared
+
+    def load(self, commander_id: int, max_sell_events: int) -> None:
+        """
+        Load the stored ledger for a commander. The ledger is discarded if it was built with a different sell event
+        cutoff.
+
+        :param commander_id: Commander DB ID
+        :param max_sell_events: Current sell event cutoff setting
+        """
+
+        self._commanders = {}
+        if self.path and self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as file:
+                    data = json.load(file)
+                if data.get('version') == ledger_version:
+                    self._commanders = data.get('commanders', {})
+            except (OSError, ValueError) as ex:
+                logger.warning('Unable to read unsold ledger, rebuilding', exc_info=ex)
+
+        self._commander_id = commander_id
+        self.invalidate()
+        self._max_sell_events = max_sell_events
+        stored = self._commanders.get(str(commander_id))
+        if not stored or stored.get('max_sell_events') != max_sell_events:
+            return
+
+        self._watermark = datetime.fromisoformat(stored['watermark']) if stored.get('watermark') else None
+        for system_id, (name, value, min_value, last_scan, dirty) in stored.get('systems', {}).items():
+            self._systems[int(system_id)] = UnsoldSystem(
+                name, datetime.fromisoformat(last_scan) if last_scan else None, value, min_value, dirty
+            )
+            self._names[name] = int(system_id)
+
+    def save(self) -> None:
+        """
+        Write the current commander's ledger to disk alongside any other stored commanders.
+        """
+
+        if not self.path or self._commander_id is None:
+            return
+
+        self._commanders[str(self._commander_id)] = {
+            'max_sell_events': self._max_sell_events,
+            'watermark': self._watermark.isoformat() if self._watermark else None,
+            'systems': {
+                str(system_id): [
+                    system.name, system.value, system.min_value,
+                    system.last_scan.isoformat() if system.last_scan else None, system.dirty
+                ] for system_id, system in self._systems.items()
+            }
+        }
+        try:
+            temp_path = self.path.with_suffix('.tmp')
+            with open(temp_path, 'w', encoding='utf-8') as file:
+                json.dump({'version': ledger_version, 'commanders': self._commanders}, file)
+            os.replace(temp_path, self.path)
+        except OSError as ex:
+            logger.warning('Unable to save unsold ledger', exc_info=ex)
+
+    def invalidate(self) -> None:
+        """
+        Clear all entries, forcing a full rebuild on the next sync.
+        """
+
+        self._systems = {}
+        self._names = {}
+        self._watermark = None
+        self.generation += 1
+
+    def get_watermark(self) -> datetime | None:
+        """
+        :return: Latest scan or map time reflected in the ledger, or None if the ledger must be rebuilt
+        """
+
+        return self._watermark
+
+    def advance_watermark(self, time: datetime | None) -> None:
+        if time and (not self._watermark or time > self._watermark):
+            self._watermark = time
+
+    def mark_changed(self, system_id: int, name: str, scanned_at: datetime | None) -> None:
+        """
+        Flag a system for revaluation after a scan or map event.
+
+        :param system_id: System DB ID
+        :param name: System name
+        :param scanned_at: Time of the latest body scan in the system
+        """
+
+        self._changes += 1
+        system = self._systems.get(system_id)
+        if system:
+            system.dirty = True
+            if scanned_at and (not system.last_scan or scanned_at > system.last_scan):
+                system.last_scan = scanned_at
+        else:
+            system = self._systems[system_id] = UnsoldSystem(name, scanned_at)
+            self._names[name] = system_id
+        system.changed = self._changes
+
+    def get_change_count(self) -> int:
+        """
+        :return: Number of mark_changed calls so far, used to detect changes made while a value was being computed
+        """
+
+        return self._changes
+
+    def set_value(self, system_id: int, name: str, values: tuple[int, int],
+                  last_scan: datetime | None = None, since: int | None = None) -> None:
+        """
+        Store the current value of an unsold system.
+
+        :param system_id: System DB ID
+        :param name: System name
+        :param values: Tuple of max and min system values
+        :param last_scan: Time of the latest body scan in the system, if known
+        :param since: Change count when the value was computed. The system stays flagged for revaluation if it has
+                      changed since then.
+        """
+
+        system = self._systems.get(system_id)
+        if not system:
+            system = self._systems[system_id] = UnsoldSystem(name, last_scan)
+            self._names[name] = system_id
+        elif last_scan and (not system.last_scan or last_scan > system.last_scan):
+            system.last_scan = last_scan
+        system.value, system.min_value = values
+        system.dirty = since is not None and system.changed > since
+
+    def remove(self, system_id: int) -> None:
+        """
+        Drop a single system from the ledger.
+
+        :param system_id: System DB ID
+        """
+
+        system = self._systems.pop(system_id, None)
+        if system:
+            self._names.pop(system.name, None)
+
+    def remove_names(self, names: list[str]) -> None:
+        """
+        Drop systems that have been sold.
+
+        :param names: Names of the sold systems
+        """
+
+        for name in names:
+            system_id = self._names.pop(name, None)
+            if system_id is not None:
+                self._systems.pop(system_id, None)
+
+    def prune(self, cutoff: datetime | None, was_sold: Callable[[str], bool] | None = None) -> None:
+        """
+        Drop systems scanned before a data loss or the sell event cutoff, and optionally any that have been sold.
+
+        :param cutoff: Systems with no scans after this time are dropped
+        :param was_sold: Callback returning True if a system name has been sold
+        """
+
+        for system_id, system in list(self._systems.items()):
+            if (cutoff and system.last_scan and system.last_scan <= cutoff) or (was_sold and was_sold(system.name)):
+                self._systems.pop(system_id)
+                self._names.pop(system.name, None)
+
+    def get_dirty(self) -> list[int]:
+        """
+        :return: IDs of systems awaiting revaluation
+        """
+
+        return [system_id for system_id, system in self._systems.items() if system.dirty]
+
+    def get_count(self) -> int:
+        """
+        :return: Number of unsold systems
+        """
+
+        return len(self._systems)
+
+    def get_totals(self) -> tuple[int, int]:
+        """
+        :return: Tuple of total max and min unsold values. Systems awaiting revaluation count at their last known
+                 value, so the totals don't drop while the worker revalues them.
+        """
+
+        value_sum = 0
+        min_value_sum = 0
+        for system in self._systems.values():
+            value_sum += system.value
+            min_value_sum += system.min_value
+        return value_sum, min_value_sum
@@ -67,17 +67,27 @@ class Overlay:
     """
 
     def __init__(self):
-        if edmcoverlay:
-            self._overlay: edmcoverlay.Overlay | None = edmcoverlay.Overlay()
-        else:
-            self._overlay: edmcoverlay.Overlay | None = None
+        self._overlay: edmcoverlay.Overlay | None = None
         self._text_blocks: dict[str, TextBlock] = {}
-        self._redraw_timer = self.redraw()
-        self._scroll_timer = self.scroll()
+        self._redraw_timer: threading.Event | None = None
+        self._scroll_timer: threading.Event | None = None
+
+    def start(self) -> None:
+        """
+        Start the redraw and scroll threads, if not already running. Deferred until the overlay is first used so
+        the threads don't run while the overlay is disabled.
+        """
+
+        if not self._redraw_timer:
+            self._redraw_timer = self.redraw()
+            self._scroll_timer = self.scroll()
 
     def disconnect(self) -> None:
-        self._redraw_timer.set()
-        self._scroll_timer.set()
+        if self._redraw_timer:
+            self._redraw_timer.set()
+            self._scroll_timer.set()
+            self._redraw_timer = None
+            self._scroll_timer = None
 
     def display(self, message_id: str, text: str, x: int = 0, y: int = 0, color: str = "#ffffff", size: str = "normal",
                 scrolled: bool = False, limit: int = 0, delay: float = 10) -> None:
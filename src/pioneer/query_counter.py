@@ -0,0 +1,129 @@
+import threading
+import time
+from functools import wraps
+from typing import Any, Callable, NamedTuple
+
+from sqlalchemy import Engine, event
+
+from EDMCLogging import get_plugin_logger
+from pioneer import const
+
+logger = get_plugin_logger(const.plugin_name)
+
+
+class QueryStats(NamedTuple):
+    """
+    Statements executed within a counted scope and the time spent executing them, in seconds.
+    """
+
+    statements: int
+    seconds: float
+
+
+class QueryCounter:
+    """
+    Counts the SQL statements executed by an engine within named scopes, such as a display refresh or a journal
+    event, and logs scopes which exceed the query budget. Only statements run on the scope's own thread are counted,
+    so work done by the database worker is not attributed to the main thread.
+    """
+
+    def __init__(self, budget: int = 100):
+        """
+        :param budget: Maximum number of statements per scope before a warning is logged, or 0 for no limit
+        """
+
+        self.budget: int = budget
+        self.last: dict[str, QueryStats] = {}  # Scope name: stats of its most recent run
+        self.overruns: int = 0
+        self._engine: Engine | None = None
+        self._local = threading.local()
+
+    def attach(self, engine: Engine) -> None:
+        """
+        :param engine: Engine to count the statements of
+        """
+
+        if self._engine:
+            return
+        self._engine = engine
+        event.listen(engine, 'before_cursor_execute', self._before_execute)
+        event.listen(engine, 'after_cursor_execute', self._after_execute)
+
+    def detach(self) -> None:
+        if not self._engine:
+            return
+        event.remove(self._engine, 'before_cursor_execute', self._before_execute)
+        event.remove(self._engine, 'after_cursor_execute', self._after_execute)
+        self._engine = None
+
+    def counted(self, name: str, detail: Callable[..., str] | None = None) -> Callable:
+        """
+        Decorator counting the statements executed by each call of a function.
+
+        :param name: Scope name
+        :param detail: Returns a description of the call for budget warnings, called with the function's arguments
+        """
+
+        def decorator(function: Callable) -> Callable:
+            @wraps(function)
+            def wrapper(*args, **kwargs) -> Any:
+                if not self._engine:
+                    return function(*args, **kwargs)
+                scopes = self._get_scopes()
+                scopes.append([0, 0.0])
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    statements, seconds = scopes.pop()
+                    self.finish(name, QueryStats(statements, seconds),
+                                detail(*args, **kwargs) if detail else None)
+
+            return wrapper
+
+        return decorator
+
+    def finish(self, name: str, stats: QueryStats, detail: str | None = None) -> None:
+        """
+        Record the stats of a completed scope, logging a warning if it went over budget.
+
+        :param name: Scope name
+        :param stats: Statements executed in the scope
+        :param detail: Description of the scope's work
+        """
+
+        self.last[name] = stats
+        if self.budget and stats.statements > self.budget:
+            self.overruns += 1
+            logger.warning(f'{name}{f" ({detail})" if detail else ""} executed {stats.statements} queries '
+                           f'in {stats.seconds * 1000:.1f} ms, over the budget of {self.budget}')
+
+    def format_stats(self) -> str:
+        """
+        :return: Stats of the most recent run of each scope
+        """
+
+        if not self.last:
+            return 'No queries counted'
+        return '\n'.join(f'{name}: {stats.statements} queries, {stats.seconds * 1000:.1f} ms'
+                         for name, stats in sorted(self.last.items()))
+
+    def _get_scopes(self) -> list[list[int | float]]:
+        scopes = getattr(self._local, 'scopes', None)
+        if scopes is None:
+            scopes = self._local.scopes = []
+        return scopes
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        if getattr(self._local, 'scopes', None):
+            conn.info.setdefault('pioneer_query_start', []).append(time.perf_counter())
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        scopes = getattr(self._local, 'scopes', None)
+        starts = conn.info.get('pioneer_query_start')
+        if not scopes or not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+        # Nested scopes each include the statements of their inner scopes
+        for scope in scopes:
+            scope[0] += 1
+            scope[1] += elapsed
@@ -0,0 +1,179 @@
+from bisect import bisect_right, insort
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ExploData.explo_data.db import Death, Resurrection, SystemSale
+
+# Resurrection types which don't cost the commander their exploration data
+SAFE_RESURRECTIONS = ['escape', 'rejoin', 'handin', 'recover']
+
+
+class LossTimeline:
+    """
+    Sorted timeline of the events which cost a commander their exploration data: in-ship deaths and any
+    resurrection other than the 'safe' types. Loaded once per commander and extended as new losses arrive, so
+    'first loss after' lookups are a binary search instead of a pair of database queries.
+    """
+
+    def __init__(self):
+        self._commander_id: int | None = None
+        self._losses: list[datetime] = []
+        self._last_death: datetime | None = None
+        self._last_resurrection: datetime | None = None
+
+    def load(self, commander_id: int, session: Session) -> None:
+        """
+        Rebuild the timeline for the given commander.
+
+        :param commander_id: Commander DB ID
+        :param session: Active SQLAlchemy session
+        """
+
+        self._commander_id = commander_id
+        self._losses = []
+        self._last_death = None
+        self._last_resurrection = None
+        self.update(session)
+
+    def update(self, session: Session) -> None:
+        """
+        Add any losses recorded since the last load or update.
+
+        :param session: Active SQLAlchemy session
+        """
+
+        if self._commander_id is None:
+            return
+
+        death_query = select(Death.died_at).where(Death.commander_id == self._commander_id).where(Death.in_ship)
+        if self._last_death:
+            death_query = death_query.where(Death.died_at > self._last_death)
+        for died_at in session.scalars(death_query):
+            insort(self._losses, died_at)
+            if not self._last_death or died_at > self._last_death:
+                self._last_death = died_at
+
+        resurrection_query = select(Resurrection.resurrected_at) \
+            .where(Resurrection.commander_id == self._commander_id) \
+            .where(Resurrection.type.not_in(SAFE_RESURRECTIONS))
+        if self._last_resurrection:
+            resurrection_query = resurrection_query.where(Resurrection.resurrected_at > self._last_resurrection)
+        for resurrected_at in session.scalars(resurrection_query):
+            insort(self._losses, resurrected_at)
+            if not self._last_resurrection or resurrected_at > self._last_resurrection:
+                self._last_resurrection = resurrected_at
+
+    def first_loss_after(self, time: datetime) -> datetime | None:
+        """
+        Find the earliest data loss strictly after the given time.
+
+        :param time: Start time, typically a scan or map timestamp
+        :return: Time of the first subsequent loss, or None
+        """
+
+        index = bisect_right(self._losses, time)
+        return self._losses[index] if index < len(self._losses) else None
+
+    def last_loss(self) -> datetime | None:
+        """
+        :return: Time of the most recent data loss, or None
+        """
+
+        return self._losses[-1] if self._losses else None
+
+
+class SaleIndex:
+    """
+    Index of a commander's exploration data sales, keyed by exact system name. Replaces substring searches of the
+    SystemSale table, which were slow and matched any system whose name contained another system's name.
+    """
+
+    def __init__(self):
+        self._commander_id: int | None = None
+        self._sales: dict[str, list[datetime]] = {}
+        self._sale_times: list[datetime] = []
+        self._last_sale_id: int = 0
+
+    def load(self, commander_id: int, session: Session) -> None:
+        """
+        Rebuild the index for the given commander.
+
+        :param commander_id: Commander DB ID
+        :param session: Active SQLAlchemy session
+        """
+
+        self._commander_id = commander_id
+        self._sales = {}
+        self._sale_times = []
+        self._last_sale_id = 0
+        self.update(session)
+
+    def update(self, session: Session) -> None:
+        """
+        Add any sales recorded since the last load or update.
+
+        :param session: Active SQLAlchemy session
+        """
+
+        if self._commander_id is None:
+            return
+
+        sales = session.execute(
+            select(SystemSale.id, SystemSale.systems, SystemSale.sold_at)
+            .where(SystemSale.commander_id == self._commander_id)
+            .where(SystemSale.id > self._last_sale_id)
+            .order_by(SystemSale.id)
+        )
+        for sale_id, systems, sold_at in sales:
+            insort(self._sale_times, sold_at)
+            for system_name in split_sale_systems(systems):
+                insort(self._sales.setdefault(system_name, []), sold_at)
+            self._last_sale_id = sale_id
+
+    def first_sale_after(self, system_name: str, time: datetime) -> datetime | None:
+        """
+        Find the earliest sale of a system's data strictly after the given time.
+
+        :param system_name: Full system name
+        :param time: Start time, typically a scan or map timestamp
+        :return: Time of the first subsequent sale, or None
+        """
+
+        sales = self._sales.get(system_name)
+        if not sales:
+            return None
+        index = bisect_right(sales, time)
+        return sales[index] if index < len(sales) else None
+
+    def was_sold(self, system_name: str) -> bool:
+        """
+        :param system_name: Full system name
+        :return: True if the system's data has ever been sold
+        """
+
+        return system_name in self._sales
+
+    def get_sale_cutoff(self, sale_count: int) -> datetime | None:
+        """
+        Get the time of the Nth most recent sale event.
+
+        :param sale_count: Number of sale events to count back
+        :return: Time of that sale, or None if there have been fewer sales
+        """
+
+        if sale_count <= 0 or len(self._sale_times) < sale_count:
+            return None
+        return self._sale_times[-sale_count]
+
+
+def split_sale_systems(systems: str) -> list[str]:
+    """
+    Split the stored system list of a SystemSale into individual system names.
+
+    :param systems: Comma-separated system names as stored by ExploData
+    :return: List of system names
+    """
+
+    return [name.strip() for name in systems.split(',') if name.strip()]
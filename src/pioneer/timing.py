@@ -0,0 +1,144 @@
+import time
+from collections import deque
+from functools import wraps
+from typing import Any, Callable, NamedTuple
+
+# Upper bounds of the system size classes, in bodies
+size_classes = (10, 50, 100, 250)
+
+
+class SpanStats(NamedTuple):
+    """
+    Latency statistics of a span over its recent samples, in seconds.
+    """
+
+    name: str
+    size_class: str
+    count: int
+    p50: float
+    p95: float
+    max: float
+
+
+def get_size_class(size: int | None) -> str:
+    """
+    :param size: Number of bodies in the system, or None if not applicable
+    :return: Label of the size class, e.g. '10-49'
+    """
+
+    if size is None:
+        return 'all'
+    lower = 0
+    for upper in size_classes:
+        if size < upper:
+            return f'{lower}-{upper - 1}'
+        lower = upper
+    return f'{lower}+'
+
+
+def get_percentile(samples: list[float], percentile: float) -> float:
+    """
+    :param samples: Sorted samples
+    :param percentile: Percentile, from 0 to 100
+    :return: Nearest-rank percentile of the samples
+    """
+
+    if not samples:
+        return 0.0
+    rank = max(1, -(-len(samples) * percentile // 100))
+    return samples[int(rank) - 1]
+
+
+class SpanTimer:
+    """
+    Times named spans of code, keeping a rolling window of recent durations per span and per system size class.
+    When disabled, a timed function costs one attribute check per call.
+    """
+
+    def __init__(self, window: int = 500):
+        """
+        :param window: Number of recent samples kept per span and size class
+        """
+
+        self.enabled: bool = False
+        self.window: int = window
+        self._samples: dict[tuple[str, str], deque[float]] = {}
+
+    def timed(self, name: str, size: Callable[..., int] | None = None) -> Callable:
+        """
+        Decorator timing each call of a function as a span.
+
+        :param name: Span name
+        :param size: Returns the system size in bodies, called with the function's arguments. If None, samples are
+                     only recorded for the span as a whole.
+        """
+
+        def decorator(function: Callable) -> Callable:
+            @wraps(function)
+            def wrapper(*args, **kwargs) -> Any:
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                start_time = time.perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self.record(name, time.perf_counter() - start_time,
+                                size(*args, **kwargs) if size else None)
+
+            return wrapper
+
+        return decorator
+
+    def record(self, name: str, seconds: float, size: int | None = None) -> None:
+        """
+        :param name: Span name
+        :param seconds: Duration of the span
+        :param size: Number of bodies in the system, or None if not applicable
+        """
+
+        keys = [(name, 'all')]
+        if size is not None:
+            keys.append((name, get_size_class(size)))
+        for key in keys:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def get_stats(self) -> list[SpanStats]:
+        """
+        :return: Statistics of each span and size class, ordered by span name
+        """
+
+        stats = []
+        # Copied first, as spans may be recorded on worker threads
+        for (name, size_class), samples in sorted(list(self._samples.items()), key=self._sort_key):
+            ordered = sorted(list(samples))
+            stats.append(SpanStats(name, size_class, len(ordered), get_percentile(ordered, 50),
+                                   get_percentile(ordered, 95), ordered[-1] if ordered else 0.0))
+        return stats
+
+    def format_stats(self) -> str:
+        """
+        :return: Statistics as a table, with durations in milliseconds
+        """
+
+        stats = self.get_stats()
+        if not stats:
+            return 'No timings recorded'
+        width = max(len(span.name) for span in stats)
+        lines = [f'{"Span":<{width}} {"Bodies":<7} {"Count":>6} {"p50 ms":>8} {"p95 ms":>8} {"max ms":>8}']
+        for span in stats:
+            lines.append(f'{span.name:<{width}} {span.size_class:<7} {span.count:>6} {span.p50 * 1000:>8.2f} '
+                         f'{span.p95 * 1000:>8.2f} {span.max * 1000:>8.2f}')
+        return '\n'.join(lines)
+
+    def clear(self) -> None:
+        self._samples = {}
+
+    @staticmethod
+    def _sort_key(item: tuple[tuple[str, str], deque[float]]) -> tuple[str, int]:
+        name, size_class = item[0]
+        if size_class == 'all':
+            return name, -1
+        return name, int(size_class.rstrip('+').split('-')[0])
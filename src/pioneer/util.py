@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 from ExploData.explo_data.body_data.struct import PlanetData
 
 
@@ -53,7 +55,13 @@ def get_body_shorthand(body: PlanetData, commander_id) -> str:
     )
 
 
+@lru_cache(maxsize=1024)
 def get_star_label(star_class: str = '', subclass: int = 0, luminosity: str = '', show_descriptors: bool = False) -> str:
+    """
+    Build the display label of a star. Memoized, as the set of distinct star types is small; the cache is cleared
+    when the star descriptor setting changes.
+    """
+
     name = 'Star'
     star_type = ''
     star_icon = ''
@@ -0,0 +1,242 @@
+from datetime import datetime
+from typing import Callable, NamedTuple
+
+from pioneer.data import BodyValueData
+
+efficiency_bonus = 1.25
+
+
+class BodyInput(NamedTuple):
+    """
+    Snapshot of the commander-specific state of a single body, as needed for valuation.
+    """
+
+    name: str
+    body_id: int
+    is_planet: bool
+    scan_state: int
+    discovered: bool
+    mapped: bool
+    efficient: bool
+    scanned_at: datetime | None
+    mapped_at: datetime | None
+    values: BodyValueData
+
+
+class SystemInput(NamedTuple):
+    """
+    Snapshot of the system-wide state needed for valuation.
+    """
+
+    main_star_value: int
+    main_star_scanned_at: datetime | None
+    honked: bool
+    fully_scanned: bool
+    have_belts: bool
+    was_scanned: bool
+    was_mapped: bool
+    is_nav_beacon: bool
+    has_undiscovered: bool
+    total_bodies: int
+
+
+class BodyValuation(NamedTuple):
+    """
+    Valuation of a single body. Value pairs are ordered (max, min).
+    """
+
+    name: str
+    body_id: int
+    is_planet: bool
+    mapped: bool
+    efficient: bool
+    sold: bool
+    lost: bool
+    map_sold: bool
+    map_lost: bool
+    is_range: bool
+    value: tuple[float, float]
+    max_value: tuple[float, float]
+    honk_value: tuple[int, int]
+
+    def get_lost_value(self) -> tuple[float, float]:
+        """
+        :return: Value lost with the mapping data, if the map was lost
+        """
+
+        return self.max_value[0] - self.value[0], self.max_value[1] - self.value[1]
+
+
+class SystemValuation(NamedTuple):
+    """
+    Valuation of a system for the current commander. Totals are the estimated current value and the maximum
+    obtainable value, each with its minimum for bodies whose value is a range.
+    """
+
+    bodies: tuple[BodyValuation, ...]
+    main_star_value: int
+    main_star_sold: bool
+    main_star_lost: bool
+    honk_sum: int
+    min_honk_sum: int
+    bodies_sold: int
+    bodies_lost: int
+    planet_count: int
+    map_count: int
+    scan_bonus: int
+    scan_bonus_earned: bool
+    map_bonus: int
+    map_bonus_earned: bool
+    value: float
+    min_value: float
+    max_value: float
+    min_max_value: float
+
+    def get_totals(self) -> tuple[float, float, float, float]:
+        """
+        :return: Tuple of value, min value, max value and min max value
+        """
+
+        return self.value, self.min_value, self.max_value, self.min_max_value
+
+    def get_sale_status(self) -> dict[int, tuple[bool, bool, bool, bool]]:
+        """
+        :return: Dict of body ID to tuple of sold, lost, map sold and map lost flags
+        """
+
+        return {body.body_id: (body.sold, body.lost, body.map_sold, body.map_lost) for body in self.bodies}
+
+
+def classify_data(time: datetime | None, first_sale_after: Callable[[datetime], datetime | None],
+                  first_loss_after: Callable[[datetime], datetime | None]) -> tuple[bool, bool]:
+    """
+    Determine whether data gathered at the given time has since been sold or lost. Data is lost if it was not sold
+    before the commander's next data loss.
+
+    :param time: Time the data was gathered, or None if it never was
+    :param first_sale_after: Returns the first sale of the system's data after a given time
+    :param first_loss_after: Returns the first data loss after a given time
+    :return: Tuple of sold and lost flags
+    """
+
+    if not time:
+        return False, False
+    sold = first_sale_after(time) is not None
+    lost = not sold and first_loss_after(time) is not None
+    return sold, lost
+
+
+def value_body(body: BodyInput, first_sale_after: Callable[[datetime], datetime | None],
+               first_loss_after: Callable[[datetime], datetime | None]) -> BodyValuation:
+    """
+    Value a single body and classify its scan and mapping data.
+
+    :param body: Body snapshot
+    :param first_sale_after: Returns the first sale of the system's data after a given time
+    :param first_loss_after: Returns the first data loss after a given time
+    :return: Body valuation
+    """
+
+    sold, lost = classify_data(body.scanned_at, first_sale_after, first_loss_after)
+    map_sold, map_lost = classify_data(body.mapped_at, first_sale_after, first_loss_after) \
+        if body.is_planet and body.mapped else (False, False)
+    mapped_values = body.values.get_mapped_values()
+    scanned = body.scan_state > 1 and body.discovered
+    base_value = body.values.get_base_values() if scanned else (0, 0)
+    honk_value = body.values.get_honk_values() if scanned else (0, 0)
+
+    if body.is_planet and body.mapped and not map_lost:
+        efficiency = efficiency_bonus if body.efficient else 1
+        value = (mapped_values[0] * efficiency, mapped_values[1] * efficiency)
+        max_value = value
+    elif body.is_planet:
+        value = base_value
+        max_value = (int(mapped_values[0] * efficiency_bonus), int(mapped_values[1] * efficiency_bonus))
+    else:
+        value = base_value
+        max_value = base_value
+
+    return BodyValuation(
+        name=body.name, body_id=body.body_id, is_planet=body.is_planet, mapped=body.is_planet and body.mapped,
+        efficient=body.efficient, sold=sold, lost=lost, map_sold=map_sold, map_lost=map_lost,
+        is_range=mapped_values[1] != mapped_values[0], value=value, max_value=max_value, honk_value=honk_value
+    )
+
+
+def value_system(system: SystemInput, bodies: list[BodyInput],
+                 first_sale_after: Callable[[datetime], datetime | None],
+                 first_loss_after: Callable[[datetime], datetime | None]) -> SystemValuation:
+    """
+    Value a system from snapshots of its bodies. Has no UI or database dependencies, so it can be run and profiled
+    outside of EDMC.
+
+    :param system: System snapshot
+    :param bodies: Body snapshots, in display order
+    :param first_sale_after: Returns the first sale of the system's data after a given time
+    :param first_loss_after: Returns the first data loss after a given time
+    :return: System valuation
+    """
+
+    bodies_sold = 0
+    bodies_lost = 0
+    main_star_sold, main_star_lost = classify_data(system.main_star_scanned_at, first_sale_after, first_loss_after)
+    bodies_sold += main_star_sold
+    bodies_lost += main_star_lost
+
+    star_value = system.main_star_value if not main_star_lost else 0
+    value_sum, min_value_sum, max_value_sum, min_max_value_sum = star_value, star_value, star_value, star_value
+    honk_sum, min_honk_sum = 0, 0
+    planet_count, map_count = 0, 0
+    results: list[BodyValuation] = []
+    for body in bodies:
+        result = value_body(body, first_sale_after, first_loss_after)
+        results.append(result)
+        bodies_sold += result.sold
+        bodies_lost += result.lost
+        if result.is_planet:
+            planet_count += 1
+            if result.mapped and not result.map_lost:
+                map_count += 1
+
+        # Intact mapping data is counted even if the scan data was lost
+        if not result.lost or (result.mapped and not result.map_lost):
+            value_sum += result.value[0]
+            min_value_sum += result.value[1]
+            max_value_sum += result.max_value[0]
+            min_max_value_sum += result.max_value[1]
+        if not result.lost:
+            if system.honked:
+                value_sum += result.honk_value[0] if system.main_star_value else 0
+                min_value_sum += result.honk_value[1] if system.main_star_value else 0
+                honk_sum += result.honk_value[0]
+                min_honk_sum += result.honk_value[1]
+            max_value_sum += result.honk_value[0] if system.main_star_value else 0
+            min_max_value_sum += result.honk_value[1] if system.main_star_value else 0
+
+    scan_bonus, scan_bonus_earned = 0, False
+    if not system.was_scanned and not system.is_nav_beacon and not system.has_undiscovered and not bodies_lost:
+        scan_bonus = system.total_bodies * 1000
+        scan_bonus_earned = system.fully_scanned and system.have_belts
+        if scan_bonus_earned:
+            value_sum += scan_bonus
+            min_value_sum += scan_bonus
+        max_value_sum += scan_bonus
+        min_max_value_sum += scan_bonus
+
+    map_bonus, map_bonus_earned = 0, False
+    if not system.was_mapped and planet_count > 0 and not bodies_lost:
+        map_bonus = planet_count * 10000
+        map_bonus_earned = system.fully_scanned and planet_count == map_count
+        if map_bonus_earned:
+            value_sum += map_bonus
+            min_value_sum += map_bonus
+        max_value_sum += map_bonus
+        min_max_value_sum += map_bonus
+
+    return SystemValuation(
+        bodies=tuple(results), main_star_value=system.main_star_value, main_star_sold=main_star_sold,
+        main_star_lost=main_star_lost, honk_sum=honk_sum, min_honk_sum=min_honk_sum, bodies_sold=bodies_sold,
+        bodies_lost=bodies_lost, planet_count=planet_count, map_count=map_count, scan_bonus=scan_bonus,
+        scan_bonus_earned=scan_bonus_earned, map_bonus=map_bonus, map_bonus_earned=map_bonus_earned,
+        value=value_sum, min_value=min_value_sum, max_value=max_value_sum, min_max_value=min_max_value_sum
+    )
@@ -0,0 +1,60 @@
+import json
+import os
+import time
+from pathlib import Path
+
+import requests
+import semantic_version
+
+from EDMCLogging import get_plugin_logger
+from pioneer import const
+
+logger = get_plugin_logger(const.plugin_name)
+
+release_url = 'https://api.github.com/repos/Silarn/EDMC-Pioneer/releases/latest'
+
+
+def get_latest_version(url: str = release_url, timeout: float = 5.0, cache_path: Path | None = None,
+                       ttl: float = 6 * 60 * 60) -> semantic_version.Version | None:
+    """
+    Get the latest released plugin version. A cached result younger than the TTL is used without a request; if the
+    request fails, any cached result is used regardless of age. Blocking, so run it off the main thread.
+
+    :param url: Release API URL, returning JSON with a 'tag_name' of the form 'v1.2.3'
+    :param timeout: Request timeout in seconds
+    :param cache_path: File to cache the result in, or None to disable caching
+    :param ttl: Maximum age of a cached result in seconds
+    :return: The latest version, or None if it couldn't be determined
+    """
+
+    cached: dict = {}
+    if cache_path and cache_path.exists():
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as file:
+                cached = json.load(file)
+            if cached.get('url') == url and time.time() - cached.get('checked_at', 0) < ttl:
+                return semantic_version.Version(cached['version'])
+        except (OSError, ValueError, KeyError) as ex:
+            logger.debug('Unable to read version cache', exc_info=ex)
+            cached = {}
+
+    try:
+        req = requests.get(url=url, timeout=timeout)
+        if req.status_code != requests.codes.ok:
+            raise requests.RequestException(f'Status {req.status_code}')
+        version = semantic_version.Version(req.json()['tag_name'][1:])
+    except (requests.RequestException, ValueError, KeyError) as ex:
+        logger.warning(f'Unable to check for plugin updates: {ex}')
+        if cached.get('url') == url and cached.get('version'):
+            return semantic_version.Version(cached['version'])
+        return None
+
+    if cache_path:
+        try:
+            temp_path = cache_path.with_suffix('.tmp')
+            with open(temp_path, 'w', encoding='utf-8') as file:
+                json.dump({'url': url, 'checked_at': time.time(), 'version': str(version)}, file)
+            os.replace(temp_path, cache_path)
+        except OSError as ex:
+            logger.debug('Unable to write version cache', exc_info=ex)
+    return version
@@ -0,0 +1,115 @@
+import queue
+import threading
+import tkinter as tk
+from typing import Any, Callable
+
+from sqlalchemy import Engine
+from sqlalchemy.orm import Session
+
+from EDMCLogging import get_plugin_logger
+from pioneer import const
+
+logger = get_plugin_logger(const.plugin_name)
+
+
+class DatabaseWorker:
+    """
+    Runs database jobs on a dedicated thread with its own session, so slow queries don't block the Tk event loop.
+    Results are handed back to the main thread through a Tk virtual event, where the job's callback is run.
+    """
+
+    event_name = '<<PioneerWorkerResult>>'
+
+    def __init__(self):
+        self._jobs: queue.Queue = queue.Queue()
+        self._results: queue.Queue = queue.Queue()
+        self._pending: set[str] = set()
+        self._thread: threading.Thread | None = None
+        self._widget: tk.Misc | None = None
+
+    def start(self, widget: tk.Misc, engine: Engine) -> None:
+        """
+        :param widget: Any widget, used to post result events to the Tk event loop
+        :param engine: Database engine for the worker's session
+        """
+
+        if self._thread:
+            return
+        self._widget = widget
+        self._widget.bind(self.event_name, lambda event: self.process_results())
+        self._thread = threading.Thread(target=self._run, args=(engine,), name='Pioneer DB worker', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop the worker after its current job. Queued jobs are dropped.
+        """
+
+        if not self._thread:
+            return
+        self._jobs.put(None)
+        self._thread.join(timeout=5)
+        self._thread = None
+
+    def is_running(self) -> bool:
+        return self._thread is not None
+
+    def is_pending(self, name: str) -> bool:
+        """
+        :param name: Job name
+        :return: True if a job of this name is queued or running
+        """
+
+        return name in self._pending
+
+    def submit(self, name: str, job: Callable[[Session], Any], callback: Callable[[Any], None]) -> bool:
+        """
+        Queue a job, unless one of the same name is already pending.
+
+        :param name: Job name
+        :param job: Function run on the worker thread with the worker's session
+        :param callback: Function run on the main thread with the job's return value
+        :return: True if the job was queued
+        """
+
+        if not self._thread or name in self._pending:
+            return False
+        self._pending.add(name)
+        self._jobs.put((name, job, callback))
+        return True
+
+    def process_results(self) -> None:
+        """
+        Run the callbacks of any finished jobs. Called on the main thread.
+        """
+
+        while True:
+            try:
+                name, result, callback = self._results.get_nowait()
+            except queue.Empty:
+                return
+            self._pending.discard(name)
+            if isinstance(result, Exception):
+                logger.error(f'Database job {name} failed', exc_info=result)
+                continue
+            callback(result)
+
+    def _run(self, engine: Engine) -> None:
+        with Session(engine) as session:
+            while True:
+                item = self._jobs.get()
+                if item is None:
+                    return
+                name, job, callback = item
+                try:
+                    result = job(session)
+                    session.commit()
+                except Exception as ex:
+                    session.rollback()
+                    result = ex
+                self._results.put((name, result, callback))
+                try:
+                    self._widget.event_generate(self.event_name, when='tail')
+                except (tk.TclError, RuntimeError):
+                    # The Tk event loop has shut down
+                    return
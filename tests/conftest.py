@@ -0,0 +1,15 @@
+"""
+Makes Pioneer's modules importable outside EDMC: adds src to the path and registers a stand-in for EDMCLogging, the
+only EDMC module imported by the modules under test.
+"""
+import logging
+import sys
+import types
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+if 'EDMCLogging' not in sys.modules:
+    edmc_logging = types.ModuleType('EDMCLogging')
+    edmc_logging.get_plugin_logger = lambda plugin_name, loglevel=logging.DEBUG: logging.getLogger(plugin_name)
+    sys.modules['EDMCLogging'] = edmc_logging
@@ -0,0 +1,88 @@
+import threading
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from pioneer.query_counter import QueryCounter
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f'sqlite:///{tmp_path / "test.db"}')
+    with engine.begin() as conn:
+        conn.execute(text('CREATE TABLE body (id INTEGER PRIMARY KEY, system_id INTEGER)'))
+        conn.execute(text('INSERT INTO body (system_id) VALUES (1), (1), (2)'))
+    yield engine
+    engine.dispose()
+
+
+def run_queries(engine, count: int) -> None:
+    with engine.connect() as conn:
+        for _ in range(count):
+            conn.execute(text('SELECT id FROM body WHERE system_id = 1')).all()
+
+
+def test_counts_statements_per_scope(engine):
+    counter = QueryCounter()
+    counter.attach(engine)
+    counter.counted('refresh')(run_queries)(engine, 3)
+
+    assert counter.last['refresh'].statements == 3
+    assert counter.last['refresh'].seconds >= 0
+
+
+def test_nested_scopes_include_inner_statements(engine):
+    counter = QueryCounter()
+    counter.attach(engine)
+
+    @counter.counted('outer')
+    def outer() -> None:
+        run_queries(engine, 1)
+        counter.counted('inner')(run_queries)(engine, 2)
+
+    outer()
+    assert counter.last['inner'].statements == 2
+    assert counter.last['outer'].statements == 3
+
+
+def test_ignores_other_threads(engine):
+    counter = QueryCounter()
+    counter.attach(engine)
+
+    worker_done = []
+
+    def worker() -> None:
+        run_queries(engine, 5)
+        worker_done.append(True)
+
+    @counter.counted('refresh')
+    def refresh() -> None:
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+        run_queries(engine, 1)
+
+    refresh()
+    assert worker_done
+    assert counter.last['refresh'].statements == 1
+
+
+def test_budget_overrun_is_logged(engine, caplog):
+    counter = QueryCounter(budget=2)
+    counter.attach(engine)
+    counted = counter.counted('journal_entry', lambda engine, count: f'{count} queries')
+
+    counted(run_queries)(engine, 2)
+    assert counter.overruns == 0
+    counted(run_queries)(engine, 3)
+    assert counter.overruns == 1
+    assert 'journal_entry (3 queries) executed 3 queries' in caplog.text
+
+
+def test_detached_counter_counts_nothing(engine):
+    counter = QueryCounter()
+    counter.attach(engine)
+    counter.detach()
+    counter.counted('refresh')(run_queries)(engine, 2)
+
+    assert 'refresh' not in counter.last
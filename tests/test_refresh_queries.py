@@ -0,0 +1,45 @@
+"""
+Checks that a display refresh runs a constant number of queries however many bodies the system has. Runs ExploData
+and Pioneer through the benchmark harness, so it needs an ExploData plugin folder in EXPLODATA_PATH.
+"""
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'benchmarks'))
+
+import harness  # noqa: E402
+
+pytestmark = pytest.mark.skipif(not os.environ.get('EXPLODATA_PATH'), reason='EXPLODATA_PATH is not set')
+
+
+def explore_and_count(host: harness.PluginHost, journal: harness.SyntheticJournal, size: int) -> int | None:
+    """
+    :param host: Plugin host
+    :param journal: Event generator
+    :param size: Number of bodies in the system
+    :return: Statements executed by a full refresh of the explored system
+    """
+
+    host.replay(journal.jump(journal.make_system(size)))
+    host.replay(journal.explore())
+    host.full_refresh()  # Warm refresh, so the count excludes one-off work such as loading the unsold ledger
+    return host.full_refresh()
+
+
+def test_refresh_queries_constant(tmp_path):
+    host = harness.PluginHost(harness.get_explodata_path(None), tmp_path)
+    try:
+        host.recorder.enabled = True
+        journal = harness.SyntheticJournal()
+        host.replay(journal.start_session(journal.make_system(5)))
+
+        small = explore_and_count(host, journal, 10)
+        large = explore_and_count(host, journal, 100)
+    finally:
+        host.stop()
+
+    assert small is not None
+    assert large == small
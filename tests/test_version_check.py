@@ -0,0 +1,106 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import semantic_version
+
+from pioneer.version_check import get_latest_version
+
+
+class ReleaseServer(ThreadingHTTPServer):
+    """
+    Local stand-in for the GitHub release API, serving a configurable response and counting requests.
+    """
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), ReleaseHandler)
+        self.tag = 'v2.5.0'
+        self.status = 200
+        self.delay = 0.0
+        self.requests = 0
+
+    @property
+    def url(self) -> str:
+        return f'http://127.0.0.1:{self.server_port}/releases/latest'
+
+
+class ReleaseHandler(BaseHTTPRequestHandler):
+    server: ReleaseServer
+
+    def do_GET(self) -> None:
+        self.server.requests += 1
+        time.sleep(self.server.delay)
+        body = json.dumps({'tag_name': self.server.tag}).encode()
+        self.send_response(self.server.status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ReleaseServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_fresh_fetch(server, tmp_path):
+    cache_path = tmp_path / 'version.json'
+
+    assert get_latest_version(server.url, cache_path=cache_path) == semantic_version.Version('2.5.0')
+    assert server.requests == 1
+    with open(cache_path, 'r', encoding='utf-8') as file:
+        cached = json.load(file)
+    assert cached['url'] == server.url
+    assert cached['version'] == '2.5.0'
+
+
+def test_cache_hit_within_ttl(server, tmp_path):
+    cache_path = tmp_path / 'version.json'
+    get_latest_version(server.url, cache_path=cache_path)
+    server.tag = 'v2.6.0'
+
+    assert get_latest_version(server.url, cache_path=cache_path) == semantic_version.Version('2.5.0')
+    assert server.requests == 1
+
+
+def test_expired_cache_refetches(server, tmp_path):
+    cache_path = tmp_path / 'version.json'
+    get_latest_version(server.url, cache_path=cache_path)
+    server.tag = 'v2.6.0'
+
+    assert get_latest_version(server.url, cache_path=cache_path, ttl=0) == semantic_version.Version('2.6.0')
+    assert server.requests == 2
+
+
+def test_stale_cache_on_error(server, tmp_path):
+    cache_path = tmp_path / 'version.json'
+    get_latest_version(server.url, cache_path=cache_path)
+    server.status = 500
+
+    assert get_latest_version(server.url, cache_path=cache_path, ttl=0) == semantic_version.Version('2.5.0')
+    assert server.requests == 2
+
+
+def test_stale_cache_on_timeout(server, tmp_path):
+    cache_path = tmp_path / 'version.json'
+    get_latest_version(server.url, cache_path=cache_path)
+    server.delay = 1.0
+
+    assert get_latest_version(server.url, timeout=0.2, cache_path=cache_path, ttl=0) == \
+        semantic_version.Version('2.5.0')
+
+
+def test_error_without_cache(server, tmp_path):
+    server.status = 500
+
+    assert get_latest_version(server.url, cache_path=tmp_path / 'version.json') is None